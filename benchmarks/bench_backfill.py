@@ -0,0 +1,120 @@
+"""
+Runs a 3-day --backfill through ApiHackerNewsCrawler and CrawlListCrawler against fakes (a
+local Algolia server, an in-memory Jina and Sheets) and checks that every daily window gets
+its share of items, not just the newest day: MAX_ITEMS_PER_SOURCE and Max_Items are caps per
+window, not per run.
+
+    python -m benchmarks.bench_backfill [--days N] [--per-day N]
+
+Prints items per window for each crawler and exits non-zero if a window comes back short.
+"""
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+
+from aiohttp import ClientSession, web
+
+import crawlers.api_hackernews as hn
+from benchmarks.bench_hn_discovery import FakeHN, _Transport
+from core.time_filter import get_backfill_windows
+from crawlers.api_hackernews import ApiHackerNewsCrawler, MAX_ITEMS_PER_SOURCE
+from crawlers.crawl_list import CrawlListCrawler
+
+def body(url: str) -> str:
+    # Distinct per page, or the learned boilerplate model would strip it after a few pages
+    return "\n\n".join(f"Paragraph {i} of {url}, long enough for MIN_TEXT_LEN." for i in range(20))
+
+LIST_URL = "https://blog.example.com/news"
+MAX_ITEMS = 8
+
+class FakeSheets:
+    def __init__(self):
+        self.rows = []
+
+    async def log_event(self, *args):
+        pass
+
+    async def upsert_raw_by_url(self, sheet, headers, url_map, row_obj):
+        self.rows.append(row_obj)
+        return "new"
+
+class FakeJina:
+    """List page of dated posts, newest first; each post page carries its own date."""
+
+    def __init__(self, posts: list[tuple[str, datetime.date]]):
+        self.posts = dict(posts)
+        self.list_md = "# News\n\n" + "\n".join(f"* [Post {i}]({url})" for i, (url, _) in enumerate(posts))
+
+    async def read_markdown(self, url, session, **kwargs):
+        if url == LIST_URL:
+            return self.list_md
+        day = self.posts.get(url)
+        return f"# Post\n\nPublished: {day.isoformat()}\n\n{body(url)}" if day else f"# Story\n\n{body(url)}"
+
+def per_window(crawler, windows) -> list[int]:
+    return [crawler.backfill_counts[end.timestamp()] for _, end in windows]
+
+async def run_hn(windows, per_day: int) -> list[int]:
+    stories = []
+    for d, (start, end) in enumerate(windows):
+        span = end.timestamp() - start.timestamp()
+        for i in range(per_day):
+            stories.append({
+                "id": 41000000 + d * 1000 + i, "type": "story", "title": f"Story {d}-{i}",
+                "url": f"https://example.com/{d}/{i}", "score": 200 + i,
+                "time": int(start.timestamp() + span * (i + 0.5) / per_day),
+            })
+    fake = FakeHN(stories, 0)
+    app = web.Application()
+    app.router.add_get("/api/v1/search_by_date", fake.search_by_date)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    hn.HN_ALGOLIA_BASE = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api/v1"
+    hn.HN_DISCOVERY_BACKEND = "algolia"
+    try:
+        async with ClientSession() as session:
+            crawler = ApiHackerNewsCrawler(FakeSheets(), FakeJina([]), _Transport(session))
+            crawler.set_backfill_windows(windows)
+            source = {"Source_ID": "hn_bench", "Min_Score": "150", "Min_Relevance": "0"}
+            await crawler.crawl(source, (None, [], {}), (windows[0][0], windows[-1][1]))
+            return per_window(crawler, windows)
+    finally:
+        await runner.cleanup()
+
+async def run_list(windows, per_day: int) -> list[int]:
+    posts = []
+    for d, (_, end) in reversed(list(enumerate(windows))):
+        posts.extend((f"https://blog.example.com/post/{d}-{i}", end.date()) for i in range(per_day))
+    crawler = CrawlListCrawler(FakeSheets(), FakeJina(posts), _Transport(None))
+    crawler.set_backfill_windows(windows)
+    source = {"Source_ID": "list_bench", "Target_URL": LIST_URL, "Max_Items": str(MAX_ITEMS)}
+    await crawler.crawl(source, (None, [], {}), (windows[0][0], windows[-1][1]))
+    return per_window(crawler, windows)
+
+async def run(args) -> int:
+    last = datetime.date.today() - datetime.timedelta(days=1)
+    windows = get_backfill_windows(last - datetime.timedelta(days=args.days - 1), last)
+    failures = 0
+    for name, runner, cap in (("hn", run_hn, MAX_ITEMS_PER_SOURCE), ("crawl_list", run_list, MAX_ITEMS)):
+        t0 = time.perf_counter()
+        counts = await runner(windows, args.per_day)
+        expected = min(cap, args.per_day)
+        ok = all(c == expected for c in counts)
+        failures += 0 if ok else 1
+        days = ", ".join(f"{end.strftime('%m-%d')}: {c}" for (_, end), c in zip(windows, counts))
+        print(f"{name:10} {days}  (want {expected}/day) {'ok' if ok else 'SHORT'}  {time.perf_counter() - t0:.2f}s")
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=3)
+    ap.add_argument("--per-day", type=int, default=40, help="items available in each daily window")
+    args = ap.parse_args()
+    sys.exit(1 if asyncio.run(run(args)) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmarks core.dates.parse_date against the dateutil-only parser it replaced.
+
+    python -m benchmarks.bench_dates [--rounds N]
+
+The corpus is date strings as they appear in our sources' feeds and pages. Reports
+cold (memo cleared) and warm cost per string, and any string where the results differ.
+"""
+import argparse
+import datetime
+import timeit
+import warnings
+
+from dateutil import parser as dateutil_parser
+
+from core.dates import parse_date
+from core.time_filter import window_bounds, within_bounds, is_within_window, get_collection_window
+
+CORPUS = [
+    # RSS 2.0 pubDate (RFC 822)
+    "Tue, 14 May 2024 17:00:00 GMT",
+    "Wed, 15 May 2024 09:30:12 +0000",
+    "Thu, 16 May 2024 02:11:45 -0700",
+    "Fri, 17 May 2024 10:00:00 +0900",
+    "Mon, 20 May 2024 00:00:00 EST",
+    "20 May 2024 08:15:00 +0100",
+    "Tue, 4 Jun 2024 13:05:00 Z",
+    # Atom / JSON feed (ISO 8601)
+    "2024-05-14T17:00:00Z",
+    "2024-05-14T17:00:00.000Z",
+    "2024-05-15T09:30:12+00:00",
+    "2024-05-16T11:11:45.123456+09:00",
+    "2024-05-17T10:00:00-07:00",
+    "2024-05-17 10:00:00",
+    "2024-05-17",
+    # Korean gov / research pages (CRAWL_LIST, kisa_notice)
+    "2024.05.01",
+    "2024-05-01",
+    "2024. 5. 1.",
+    "2024년 5월 1일",
+    "2024.05.01 14:30",
+    "2024/05/01",
+    # English list pages
+    "Oct 12, 2023",
+    "May 1 2024",
+    "September 3, 2024",
+    # Rare shapes that go to dateutil
+    "05/01/2024",
+    "1 May 2024",
+    "Sunday, May 19, 2024 at 4:00 PM",
+    "",
+]
+
+def _dateutil_only(s):
+    if not s:
+        return None
+    try:
+        dt = dateutil_parser.parse(s)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=500)
+    args = ap.parse_args()
+    warnings.simplefilter("ignore")  # dateutil warns on "EST"; the fast path handles it
+
+    mismatches = []
+    for s in CORPUS:
+        a, b = _dateutil_only(s), parse_date(s)
+        if a != b:
+            mismatches.append((s, a, b))
+
+    n = len(CORPUS) * args.rounds
+
+    def cold():
+        parse_date.cache_clear()
+        for s in CORPUS:
+            parse_date(s)
+
+    t_dateutil = timeit.timeit(lambda: [_dateutil_only(s) for s in CORPUS], number=args.rounds)
+    t_cold = timeit.timeit(cold, number=args.rounds)
+    t_warm = timeit.timeit(lambda: [parse_date(s) for s in CORPUS], number=args.rounds)
+
+    start, end = get_collection_window()
+    bounds = window_bounds(start, end)
+    dates = [d for d in (parse_date(s) for s in CORPUS) if d]
+    stamps = [d.timestamp() for d in dates]
+    t_window_dt = timeit.timeit(lambda: [is_within_window(d, start, end) for d in dates], number=args.rounds)
+    t_window_ts = timeit.timeit(lambda: [within_bounds(t, bounds) for t in stamps], number=args.rounds)
+    nw = len(dates) * args.rounds
+
+    print(f"strings parsed:          {n}")
+    print(f"dateutil only:           {t_dateutil / n * 1e6:8.2f} us/string")
+    print(f"parse_date (cold memo):  {t_cold / n * 1e6:8.2f} us/string")
+    print(f"parse_date (warm memo):  {t_warm / n * 1e6:8.2f} us/string")
+    print(f"is_within_window:        {t_window_dt / nw * 1e6:8.2f} us/check")
+    print(f"within_bounds (epoch):   {t_window_ts / nw * 1e6:8.2f} us/check")
+    print(f"mismatches vs dateutil:  {len(mismatches)}")
+    for s, a, b in mismatches:
+        print(f"  {s!r}: dateutil={a} fast={b}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Compares the two Hacker News discovery backends of crawlers.api_hackernews against a local
+fake server that speaks both the Firebase and the Algolia search API.
+
+    python -m benchmarks.bench_hn_discovery [--stories N] [--latency-ms MS]
+
+Reports requests and wall time per backend, checks that every in-window story above
+Min_Score that Firebase finds among the top stories is also found by Algolia (which sees the
+whole window, not just topstories), and that a failing Algolia endpoint falls back to Firebase.
+Exits non-zero on any mismatch.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from aiohttp import ClientSession, web
+
+import crawlers.api_hackernews as hn
+from crawlers.api_hackernews import ApiHackerNewsCrawler
+
+MIN_SCORE = 150
+
+def make_stories(n: int, now: int) -> list[dict]:
+    rng = random.Random(3)
+    return [{
+        "id": 40000000 + i,
+        "type": "story",
+        "title": f"Story {i}",
+        "url": f"https://example.com/{i}" if rng.random() > 0.1 else "",
+        "score": rng.randint(1, 600),
+        "time": now - rng.randint(0, 3 * 86400),
+    } for i in range(n)]
+
+class FakeHN:
+    def __init__(self, stories: list[dict], latency: float):
+        self.stories = {s["id"]: s for s in stories}
+        self.latency = latency
+        self.requests = 0
+        self.algolia_down = False
+
+    async def _delay(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    async def topstories(self, request):
+        await self._delay()
+        ranked = sorted(self.stories.values(), key=lambda s: s["score"], reverse=True)
+        return web.json_response([s["id"] for s in ranked[:500]])
+
+    async def item(self, request):
+        await self._delay()
+        story = self.stories.get(int(request.match_info["id"]))
+        return web.json_response(story) if story else web.Response(status=404)
+
+    async def search_by_date(self, request):
+        await self._delay()
+        if self.algolia_down:
+            return web.Response(status=503)
+        filters = {}
+        for f in request.query["numericFilters"].split(","):
+            for op in (">=", "<="):
+                if op in f:
+                    field, value = f.split(op)
+                    filters[(field, op)] = int(value)
+        lo, hi = filters[("created_at_i", ">=")], filters[("created_at_i", "<=")]
+        points = filters.get(("points", ">="), 0)
+        hits = sorted(
+            (s for s in self.stories.values() if lo <= s["time"] <= hi and s["score"] >= points),
+            key=lambda s: s["time"], reverse=True
+        )
+        per_page, page = int(request.query["hitsPerPage"]), int(request.query.get("page", 0))
+        return web.json_response({
+            "hits": [{"objectID": str(s["id"]), "title": s["title"], "url": s["url"] or None,
+                      "points": s["score"], "created_at_i": s["time"]}
+                     for s in hits[page * per_page:(page + 1) * per_page]],
+            "nbPages": (len(hits) + per_page - 1) // per_page,
+            "page": page,
+        })
+
+class _Transport:
+    def __init__(self, session):
+        self._session = session
+
+    def session(self, kind):
+        return self._session
+
+def in_window(stories, bounds):
+    return {s["id"] for s in stories
+            if s and s.get("type") == "story" and bounds[0] <= s.get("time", 0) <= bounds[1] and s.get("score", 0) >= MIN_SCORE}
+
+async def run(args) -> int:
+    now = int(time.time())
+    fake = FakeHN(make_stories(args.stories, now), args.latency_ms / 1000)
+    app = web.Application()
+    app.router.add_get("/v0/topstories.json", fake.topstories)
+    app.router.add_get("/v0/item/{id}.json", fake.item)
+    app.router.add_get("/api/v1/search_by_date", fake.search_by_date)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    hn.HN_API_BASE = f"http://127.0.0.1:{port}/v0"
+    hn.HN_ALGOLIA_BASE = f"http://127.0.0.1:{port}/api/v1"
+
+    bounds = (now - 86400, now)
+    failures = 0
+    try:
+        async with ClientSession() as session:
+            crawler = ApiHackerNewsCrawler(None, None, _Transport(session))
+            found = {}
+            for backend in ("firebase", "algolia"):
+                hn.HN_DISCOVERY_BACKEND = backend
+                fake.requests = 0
+                t0 = time.perf_counter()
+                stories = await crawler.discover(bounds, MIN_SCORE)
+                elapsed = time.perf_counter() - t0
+                found[backend] = in_window(stories, bounds)
+                print(f"{backend:9}: {fake.requests:4d} requests, {elapsed * 1000:7.1f} ms, {len(found[backend])} stories in window")
+
+            # Firebase only sees the first FIREBASE_SCAN_LIMIT top stories; Algolia sees them all
+            top_ids = set(sorted(fake.stories, key=lambda i: fake.stories[i]["score"], reverse=True)[:500][:hn.FIREBASE_SCAN_LIMIT])
+            if found["firebase"] != found["algolia"] & top_ids:
+                failures += 1
+                print("mismatch: Firebase stories are not the top-story subset of Algolia's")
+
+            hn.HN_DISCOVERY_BACKEND = "algolia"
+            fake.algolia_down = True
+            fake.requests = 0
+            stories = await crawler.discover(bounds, MIN_SCORE)
+            fell_back = in_window(stories, bounds) == found["firebase"]
+            print(f"fallback : {fake.requests:4d} requests, {'ok' if fell_back else 'FAILED'}")
+            failures += 0 if fell_back else 1
+    finally:
+        await runner.cleanup()
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stories", type=int, default=1000)
+    ap.add_argument("--latency-ms", type=float, default=40)
+    args = ap.parse_args()
+    sys.exit(1 if asyncio.run(run(args)) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Micro-benchmarks for the per-item helpers in core.utils and core.time_filter, on the
+inputs in benchmarks/fixtures plus bench_dates' corpus. The fixtures reproduce the shape
+and size of what Jina / feeds return for our heaviest sources: a 400-row Korean gov notice
+board, the arXiv-heavy Hugging Face papers page and a 170 KB RSS content:encoded body.
+
+    python -m benchmarks.bench_hot                      # compare against the baseline
+    python -m benchmarks.bench_hot --update-baseline    # record a new baseline
+    python -m benchmarks.bench_hot --only strip_html --threshold 0.15
+
+Reports calls/sec (process CPU time, best of --repeat, median of --runs) and the peak memory allocated by one
+call for each function. Speeds are stored relative to a fixed pure-Python calibration loop
+timed next to each function, so a baseline recorded on one machine stays usable on another. Exits non-zero if any function got slower (or allocates
+more) than the baseline by more than --threshold.
+
+Sub-microsecond functions swing by 30-40% between single runs on a shared VM, more than any
+threshold worth gating on. So each function also gets a noise floor: the largest deviation
+of one run from the median, in this run and as recorded with the baseline. A slowdown fails
+only past max(--threshold, NOISE_MARGIN x floor), and fewer than MIN_GATE_RUNS runs only
+report numbers without gating.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+
+from benchmarks.bench_dates import CORPUS as DATE_CORPUS
+from benchmarks.bench_strip_html import feed_body
+from core.dates import parse_date
+from core.time_filter import parse_date_robust, is_within_window, get_collection_window
+from core.utils import (
+    normalize_url, make_item_uuid, strip_html, extract_title_from_md,
+    extract_links, extract_urls, get_host
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINE_PATH = os.path.join(HERE, "baseline_hot.json")
+
+# Allocation growth below this many bytes is noise, not a regression
+ALLOC_SLACK_BYTES = 1024
+# A function's allowed slowdown is at least this multiple of its noise floor
+NOISE_MARGIN = 1.5
+# Noise floors need a spread of runs; with fewer, results are reported but not gated
+MIN_GATE_RUNS = 3
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def _clear_memos():
+    normalize_url.cache_clear()
+    parse_date.cache_clear()
+
+def build_cases() -> dict:
+    """name -> (function, list of argument tuples). One call per tuple is one op."""
+    pages = [load_fixture("kr_gov_list.md"), load_fixture("hf_papers.md")]
+    rss_body = load_fixture("rss_body.html")
+    urls = [u for page in pages for u in extract_urls(page)]
+    normalized = [normalize_url(u) for u in urls]
+    start, end = get_collection_window(datetime.datetime(2024, 5, 15, 17, tzinfo=datetime.timezone.utc))
+    dates = [d for d in (parse_date(s) for s in DATE_CORPUS) if d]
+
+    return {
+        "normalize_url": (normalize_url, [(u,) for u in urls]),
+        "make_item_uuid": (make_item_uuid, [(u,) for u in normalized]),
+        "get_host": (get_host, [(u,) for u in normalized]),
+        "strip_html": (strip_html, [(rss_body,)]),
+        "strip_html_max4000": (strip_html, [(rss_body, 4000)]),
+        # The common RSS_FULL case: a few KB of content:encoded, legacy regex fast path
+        "strip_html_small": (strip_html, [(feed_body(10), 4000)]),
+        "extract_title_from_md": (extract_title_from_md, [(p,) for p in pages]),
+        "extract_links": (extract_links, [(p,) for p in pages]),
+        "extract_urls": (extract_urls, [(p,) for p in pages]),
+        "parse_date_robust": (parse_date_robust, [(s,) for s in DATE_CORPUS]),
+        "is_within_window": (is_within_window, [(d, start, end) for d in dates]),
+    }
+
+def _pass(fn, calls):
+    for args in calls:
+        fn(*args)
+
+def time_case(fn, calls, min_time: float, repeat: int) -> float:
+    """Best-of-repeat calls/sec, with memos cleared before every pass (first-seen inputs)."""
+    def one_pass():
+        _clear_memos()
+        _pass(fn, calls)
+
+    timer = timeit.Timer(one_pass, timer=time.process_time)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return len(calls) / best
+
+def peak_alloc(fn, calls) -> int:
+    """Largest peak of traced memory over single calls, in bytes."""
+    worst = 0
+    tracemalloc.start()
+    try:
+        for args in calls:
+            _clear_memos()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            worst = max(worst, peak - base)
+    finally:
+        tracemalloc.stop()
+    return worst
+
+def _calibration_workload():
+    d = {}
+    for i in range(2000):
+        d[str(i)] = i * i
+    return sorted(d.items(), key=lambda kv: kv[1] % 97)
+
+def calibrate(repeat: int) -> float:
+    return 50 / min(timeit.repeat(_calibration_workload, repeat=repeat, number=50, timer=time.process_time))
+
+def run(names: list[str], min_time: float, repeat: int, runs: int = 1) -> dict:
+    cases = build_cases()
+    calibrations = []
+    samples = {name: [] for name in names}
+    for _ in range(runs):
+        for name in names:
+            fn, calls = cases[name]
+            # Calibrate next to each case so CPU frequency / neighbour load drift cancels out
+            calibration = calibrate(repeat)
+            ops = time_case(fn, calls, min_time, repeat)
+            calibrations.append(calibration)
+            samples[name].append((ops / calibration, ops))
+
+    results = {}
+    for name in names:
+        relative, ops = sorted(samples[name])[len(samples[name]) // 2]
+        results[name] = {
+            "ops_per_sec": round(ops, 1),
+            "relative": relative,
+            # Largest deviation of a single run from the median (0 with one run)
+            "noise": round(max(abs(r - relative) for r, _ in samples[name]) / relative, 3),
+            "peak_bytes": peak_alloc(*cases[name]),
+        }
+    return {"calibration_ops_per_sec": round(statistics.median(calibrations), 1), "functions": results}
+
+def allowed_slowdown(cur: dict, base: dict, threshold: float) -> float:
+    floor = max(cur.get("noise", 0.0), base.get("noise", 0.0))
+    return max(threshold, NOISE_MARGIN * floor)
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    failures = []
+    for name, cur in current["functions"].items():
+        base = baseline.get("functions", {}).get(name)
+        if not base:
+            continue
+        allowed = allowed_slowdown(cur, base, threshold)
+        if cur["relative"] < base["relative"] * (1 - allowed):
+            failures.append(f"{name}: {cur['relative'] / base['relative'] - 1:+.0%} speed vs baseline (allowed -{allowed:.0%})")
+        grown = cur["peak_bytes"] - base["peak_bytes"]
+        if grown > ALLOC_SLACK_BYTES and cur["peak_bytes"] > base["peak_bytes"] * (1 + threshold):
+            failures.append(f"{name}: peak allocation {base['peak_bytes']} -> {cur['peak_bytes']} bytes")
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", nargs="+", metavar="NAME", help="benchmark only these functions")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown / allocation growth (0.25 = 25%%)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.1, help="seconds per timing repeat")
+    ap.add_argument("--runs", type=int, default=5, help="passes over the suite; each function reports its median")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args()
+
+    names = args.only or list(build_cases())
+    unknown = [n for n in names if n not in build_cases()]
+    if unknown:
+        ap.error(f"unknown function(s): {', '.join(unknown)}")
+
+    current = run(names, args.min_time, args.repeat, args.runs)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    base_funcs = baseline.get("functions", {})
+
+    print(f"calibration: {current['calibration_ops_per_sec']:.0f} loops/s")
+    print(f"{'function':24} {'calls/s':>12} {'vs base':>8} {'allowed':>8} {'peak alloc':>12}")
+    for name, cur in current["functions"].items():
+        base = base_funcs.get(name)
+        delta = f"{cur['relative'] / base['relative'] - 1:+.0%}" if base else "-"
+        allowed = f"-{allowed_slowdown(cur, base, args.threshold):.0%}" if base else "-"
+        print(f"{name:24} {cur['ops_per_sec']:12,.0f} {delta:>8} {allowed:>8} {cur['peak_bytes'] / 1024:10.1f} KB")
+
+    if args.update_baseline:
+        if args.runs < MIN_GATE_RUNS:
+            ap.error(f"--update-baseline needs --runs {MIN_GATE_RUNS} or more to record noise floors")
+        merged = dict(base_funcs, **current["functions"])
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"calibration_ops_per_sec": current["calibration_ops_per_sec"], "functions": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if args.runs < MIN_GATE_RUNS:
+        print(f"--runs {args.runs} < {MIN_GATE_RUNS}: too few runs to tell a regression from noise, not gating")
+        return
+
+    failures = compare(current, baseline, args.threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares core.md_scan.scan_markdown against the two-scan extract_links it replaced.
+
+    python -m benchmarks.bench_md_scan [--rounds N] [--fuzz N]
+
+Times both on a synthetic links-summary list page, then checks link_map and title
+compatibility on N random markdown fragments. Exits non-zero on any mismatch.
+"""
+import argparse
+import random
+import re
+import sys
+import timeit
+
+from core.md_scan import scan_markdown
+from core.utils import extract_title_from_md
+
+def legacy_extract_links(text: str) -> dict:
+    """The original core.utils.extract_links, kept verbatim as the reference."""
+    s = str(text or "")
+    link_map = {}
+
+    md_links = re.findall(r'\[([^\]]+)\]\((https?://[^\s<>()\]]+)[^\)]*\)', s)
+    for title, url in md_links:
+        url = re.sub(r'[),.\]]+$', '', url)
+        title_clean = title.strip()
+        if re.match(r'^!\[|read more|click|here|link', title_clean, re.IGNORECASE):
+            continue
+        if url not in link_map or len(title_clean) > len(link_map.get(url, "")):
+            link_map[url] = title_clean
+
+    bare_urls = re.findall(r'https?://[^\s<>()\]]+', s)
+    for url in bare_urls:
+        url = re.sub(r'[),.\]]+$', '', url)
+        if url not in link_map:
+            link_map[url] = ""
+
+    return link_map
+
+def list_page(n_items: int = 400) -> str:
+    """Jina-style list page: nav, article cards with images, then a Links/Buttons summary."""
+    rng = random.Random(7)
+    parts = ["Title: Blog\n\nURL Source: https://example.com/blog\n\nMarkdown Content:\n# Blog\n"]
+    parts += [f"*   [Nav {i}](https://example.com/section/{i})\n" for i in range(40)]
+    for i in range(n_items):
+        slug = f"post-{i}-" + "-".join(rng.choice(["ai", "model", "agents", "release", "update"]) for _ in range(4))
+        parts.append(
+            f"\n[![Image {i}: cover](https://cdn.example.com/img/{i}.png)](https://example.com/blog/{slug})\n"
+            f"### [{slug.replace('-', ' ').title()}](https://example.com/blog/{slug})\n"
+            f"Published 2024-05-{i % 28 + 1:02d} · {'word ' * 30}[Read more](https://example.com/blog/{slug}).\n"
+        )
+    parts.append("\nLinks/Buttons:\n")
+    parts += [f"- [Link {i}](https://example.com/blog/post-{i})\n" for i in range(n_items)]
+    return "".join(parts)
+
+_ATOMS = ["[", "]", "(", ")", "http://a.com", "https://b.org/x", "https://c.io/p?q=1", ".", ",", "\n",
+          "# ", "#", "Title", " ", "read more", "![", "img", "here", "Link", "\n# Head\n", "x",
+          "[t](https://d.net/y)", "\"", "https://a.com"]
+
+def fuzz(n: int) -> int:
+    rng = random.Random(1)
+    mismatches = 0
+    for _ in range(n):
+        text = "".join(rng.choice(_ATOMS) for _ in range(rng.randint(0, 25)))
+        scan = scan_markdown(text)
+        if list(scan.link_map.items()) != list(legacy_extract_links(text).items()):
+            mismatches += 1
+            print(f"link_map mismatch: {text!r}")
+        elif scan.title != extract_title_from_md(text):
+            mismatches += 1
+            print(f"title mismatch: {text!r}")
+    return mismatches
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--fuzz", type=int, default=50000)
+    args = ap.parse_args()
+
+    page = list_page()
+    legacy = timeit.timeit(lambda: (legacy_extract_links(page), extract_title_from_md(page)), number=args.rounds) / args.rounds
+    def scan_once():
+        result = scan_markdown(page)
+        return result.link_map, result.title
+
+    scan = timeit.timeit(scan_once, number=args.rounds) / args.rounds
+    print(f"list page: {len(page) / 1024:.0f} KB, {len(legacy_extract_links(page))} links")
+    print(f"legacy extract_links + title : {legacy * 1000:8.2f} ms")
+    print(f"scan_markdown                : {scan * 1000:8.2f} ms  ({legacy / scan:.1f}x)")
+
+    mismatches = fuzz(args.fuzz)
+    print(f"fuzz: {args.fuzz} fragments, {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compares RelevanceEngine against the RELEVANCE_PATTERN regex it replaced.
+
+    python -m benchmarks.bench_relevance [--rounds N]
+
+Prints per-title cost for both matchers and lists every title where they disagree.
+"""
+import argparse
+import re
+import timeit
+
+from core.relevance import RelevanceEngine
+
+# The original api_hackernews.RELEVANCE_KEYWORDS, kept verbatim as the reference.
+LEGACY_KEYWORDS = [
+    r'\bai\b', r'\bartificial.intelligence\b', r'\bmachine.learning\b', r'\bml\b',
+    r'\bdeep.learning\b', r'\bneural.net', r'\btransformer', r'\bllm\b', r'\bgpt\b',
+    r'\bchatgpt\b', r'\bopenai\b', r'\banthropic\b', r'\bclaude\b', r'\bgemini\b',
+    r'\bgemma\b', r'\bllama\b', r'\bmistral\b', r'\bdiffusion\b', r'\bstable.diffusion\b',
+    r'\bagen(t|tic)\b', r'\brag\b', r'\bfine.?tun', r'\bprompt', r'\bembedding',
+    r'\bvector.?(db|database|store|search)\b', r'\bnlp\b', r'\bcomputer.vision\b',
+    r'\breinforcement.learning\b', r'\brlhf\b', r'\bdpo\b',
+    r'\brobot', r'\bautonomous\b', r'\bself.driving\b',
+    r'\bgenerat(ive|ion)\b', r'\bfoundation.model\b', r'\bopen.?source.?model\b',
+    r'\bmultimodal\b', r'\bspeech', r'\btts\b', r'\bstt\b', r'\bocr\b',
+    r'\bimage.gen', r'\bvideo.gen', r'\btext.to',
+    r'\bpython\b', r'\brust\b', r'\btypescript\b', r'\bjavascript\b',
+    r'\bgolang\b', r'\bkubernetes\b', r'\bdocker\b', r'\bwasm\b',
+    r'\bapi\b', r'\bsdk\b', r'\bopen.?source\b', r'\bgithub\b',
+    r'\bcompiler\b', r'\bkernel\b', r'\blinux\b',
+    r'\bcloud\b', r'\baws\b', r'\bgcp\b', r'\bazure\b',
+    r'\bdatabase\b', r'\bpostgres', r'\bsqlite\b', r'\bredis\b',
+    r'\bgpu\b', r'\bnvidia\b', r'\bcuda\b', r'\btpu\b',
+    r'\bserverless\b', r'\bedge.comput',
+    r'\bstartup\b', r'\bfunding\b', r'\bseries.[a-d]\b', r'\bipo\b',
+    r'\bgoogle\b', r'\bmeta\b', r'\bmicrosoft\b', r'\bapple\b', r'\bamazon\b',
+    r'\bdeepseek\b', r'\bdeep.?mind\b', r'\bhugging.?face\b',
+    r'\bcyber', r'\bsecurity\b', r'\bprivacy\b', r'\bencrypt',
+    r'\bdata.?(science|engineer|pipeline)\b', r'\bmlops\b',
+    r'\bscal(e|ing|ability)\b', r'\bperformance\b', r'\bbenchmark\b',
+]
+LEGACY_PATTERN = re.compile('|'.join(LEGACY_KEYWORDS), re.IGNORECASE)
+
+# HN front-page style titles, relevant and not.
+TITLES = [
+    "Show HN: I built an open-source LLM router in Rust",
+    "OpenAI's new reasoning model beats GPT-4o on math benchmarks",
+    "Fine-tuning Llama 3 on a single GPU",
+    "Finetuning embeddings for RAG pipelines",
+    "The unreasonable effectiveness of SQLite",
+    "Hugging Face releases a new multimodal dataset",
+    "HuggingFace acquires a robotics startup",
+    "DeepMind's AlphaFold 3 is now open source",
+    "Why I still write Perl in 2024",
+    "A visual history of the Roman aqueducts",
+    "Ask HN: How do you organize your home office?",
+    "Apple announces new privacy features for iOS",
+    "Postgres 17 released",
+    "PostgreSQL performance tuning in practice",
+    "Text-to-speech that runs in the browser",
+    "Vector databases are a feature, not a product",
+    "The Series B trap",
+    "Self-driving trucks start hauling freight in Texas",
+    "Stable Diffusion 3 weights released",
+    "Agentic workflows with Claude and MCP",
+    "Building a compiler for a toy language",
+    "The Linux kernel's new scheduler",
+    "A love letter to the humble spreadsheet",
+    "Cybersecurity firm discloses zero-day in VPN appliances",
+    "Scaling laws for neural language models",
+    "Data engineering without the hype",
+    "Edge computing at the cell tower",
+    "How we cut our AWS bill in half",
+    "Prompt injection is not solved",
+    "The case for boring technology",
+    "Meta open-sources a 400B model",
+    "Microsoft and Nvidia announce new partnership",
+    "My grandmother's recipe for kimchi",
+    "Speech recognition on a microcontroller",
+    "Encrypting backups with age",
+    "Ocean currents are slowing down",
+    "Generative art with WebAssembly",
+    "WASM components explained",
+    "An interview with the creator of Redis",
+    "Tiny OCR model beats Tesseract",
+]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=2000)
+    args = ap.parse_args()
+
+    engine = RelevanceEngine.default()
+
+    disagreements = []
+    for t in TITLES:
+        legacy = bool(LEGACY_PATTERN.search(t))
+        res = engine.score(t)
+        if legacy != (res.score >= 1.0):
+            disagreements.append((t, legacy, res))
+
+    n = len(TITLES) * args.rounds
+    t_legacy = timeit.timeit(lambda: [LEGACY_PATTERN.search(t) for t in TITLES], number=args.rounds)
+    t_engine = timeit.timeit(lambda: [engine.score(t) for t in TITLES], number=args.rounds)
+    t_build = timeit.timeit(RelevanceEngine.default, number=100) / 100
+
+    print(f"titles scored:       {n}")
+    print(f"legacy regex search: {t_legacy / n * 1e6:8.2f} us/title (yes/no only)")
+    print(f"RelevanceEngine:     {t_engine / n * 1e6:8.2f} us/title (score + matched terms)")
+    print(f"engine build:        {t_build * 1e3:8.2f} ms")
+    print(f"disagreements:       {len(disagreements)}")
+    for t, legacy, res in disagreements:
+        print(f"  legacy={legacy!s:5} engine={res.score:.1f} {res.matched} | {t}")
+
+if __name__ == "__main__":
+    main()
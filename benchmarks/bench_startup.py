@@ -0,0 +1,70 @@
+"""
+Cold-start benchmark for main.py, based on `python -X importtime`.
+
+    python -m benchmarks.bench_startup [--runs N] [--budget-ms MS]
+
+Reports the median cumulative import time of `main` and its heaviest imports, and
+exits non-zero if any module in DEFERRED is imported eagerly or the median goes over
+the budget. Suitable as a CI step.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules that must only load on first use (after gs.init() / per active Fetch_Type).
+DEFERRED = [
+    "gspread", "gspread_asyncio", "google.oauth2.service_account", "core.sheets_scheduler",
+    "feedparser", "dateutil.parser", "pytz",
+    "crawlers.rss_full", "crawlers.rss_deep", "crawlers.crawl_list", "crawlers.api_hackernews",
+]
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+def import_profile(target: str = "main") -> dict[str, tuple[int, int]]:
+    """Returns {module: (self_us, cumulative_us)} for one fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            out[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=0, help="fail if median import time exceeds this")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    totals = [p["main"][1] / 1000 for p in profiles]
+    median = statistics.median(totals)
+    last = profiles[-1]
+
+    print(f"import main: median {median:.1f} ms over {args.runs} runs (min {min(totals):.1f}, max {max(totals):.1f})")
+    print("heaviest top-level imports (cumulative):")
+    top_level = [
+        (mod, cum) for mod, (_, cum) in last.items()
+        if mod != "main" and "." not in mod
+    ]
+    for mod, cum in sorted(top_level, key=lambda x: -x[1])[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {mod}")
+
+    failed = False
+    eager = [m for m in DEFERRED if m in last]
+    if eager:
+        failed = True
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+    if args.budget_ms and median > args.budget_ms:
+        failed = True
+        print(f"FAIL: median {median:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares core.html_text.html_to_text against the regex strip_html it replaced.
+
+    python -m benchmarks.bench_strip_html [--rounds N] [--max-length N]
+
+Times both on synthetic content:encoded bodies of increasing size, with and without a
+Max_Length budget. "full" and the 3 KB body take html_to_text's fast path, the legacy
+pipeline itself, and must match legacy_strip_html byte for byte (existing rows keep their
+content hash); "budget" above FAST_PATH_MAX_CHARS takes the html.parser path that stops at
+the budget. Exits non-zero if a fast-path output differs from the legacy one.
+"""
+import argparse
+import re
+import sys
+import timeit
+
+from core.html_text import FAST_PATH_MAX_CHARS, html_to_text
+
+def legacy_strip_html(html: str) -> str:
+    """The original core.utils.strip_html, kept verbatim as the reference."""
+    if not html:
+        return ""
+    text = str(html)
+    text = re.sub(r'<script[\s\S]*?</script>', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'<style[\s\S]*?</style>', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = text.replace('&nbsp;', ' ')\
+               .replace('&amp;', '&')\
+               .replace('&lt;', '<')\
+               .replace('&gt;', '>')\
+               .replace('&#39;', "'")\
+               .replace('&quot;', '"')
+    return re.sub(r'\s+', ' ', text).strip()
+
+PARAGRAPH = (
+    "<p>OpenAI&#8217;s new model &mdash; announced today &hellip; beats the previous "
+    "<a href=\"https://example.com/x?a=1&amp;b=2\">state of the art</a> on <strong>12</strong> of 14 "
+    "benchmarks. &#54620;&#44397;&#50612; &amp; English results are in the table below.</p>\n"
+    "<ul><li>Latency: 120&nbsp;ms</li><li>Context: 128k tokens</li></ul>\n"
+)
+SCRIPT = "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>\n"
+
+def feed_body(paragraphs: int) -> str:
+    return "<div class=\"entry\">" + SCRIPT + "".join(PARAGRAPH for _ in range(paragraphs)) + "</div>"
+
+def best(fn, rounds: int) -> float:
+    """Seconds per call, best of 5 repeats so the columns compare with the noise removed."""
+    return min(timeit.repeat(fn, number=rounds, repeat=5)) / rounds
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=50)
+    ap.add_argument("--max-length", type=int, default=4000)
+    args = ap.parse_args()
+
+    print(f"{'body':>8} {'legacy':>10} {'full':>10} {'budget':>10}   (ms per body, budget = max_chars={args.max_length})")
+    mismatches = 0
+    for paragraphs in (10, 100, 1000):
+        body = feed_body(paragraphs)
+        legacy = best(lambda: legacy_strip_html(body), args.rounds)
+        full = best(lambda: html_to_text(body), args.rounds)
+        budget = best(lambda: html_to_text(body, args.max_length), args.rounds)
+        print(f"{len(body) // 1024:>6}KB {legacy * 1000:>10.3f} {full * 1000:>10.3f} {budget * 1000:>10.3f}")
+        mismatches += html_to_text(body) != legacy_strip_html(body)
+        if len(body) <= FAST_PATH_MAX_CHARS:
+            mismatches += html_to_text(body, args.max_length) != legacy_strip_html(body)
+
+    pre = feed_body(3) + "<pre>def f():\n    return 1</pre>"
+    print(f"html_to_text with <pre>: {html_to_text(pre)[-60:]!r}")
+    print(f"fast-path outputs differing from legacy: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ load_dotenv()
 
 # Google Sheets Config
 GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
+# Optional: reuse the service-account access token between runs (file is written 0600)
+GOOGLE_TOKEN_CACHE_FILE = os.getenv("GOOGLE_TOKEN_CACHE_FILE", "")
 SPREADSHEET_ID = os.getenv("SPREADSHEET_ID", "")  # Or use SPREADSHEET_NAME depends on preference
 SPREADSHEET_NAME = os.getenv("SPREADSHEET_NAME", "Crawler_Config") # Default name from previous setup if applicable
 
@@ -12,20 +14,144 @@ SPREADSHEET_NAME = os.getenv("SPREADSHEET_NAME", "Crawler_Config") # Default nam
 SHEET_RAW = "DATA_Raw"
 SHEET_CONF_SOURCE = "CONF_Sources"
 SHEET_LOG = "LOG_History"
+SHEET_CONF_KEYWORDS = "CONF_Keywords"  # Optional: Keyword / Weight / Status
+
+# Sheets API quota (per user per project: 60 reads and 60 writes per minute)
+SHEETS_READ_PER_MIN = 60
+SHEETS_WRITE_PER_MIN = 60
+SHEETS_BUCKET_BURST = 10          # calls allowed back-to-back before the per-minute rate applies
+SHEETS_BACKOFF_BASE_SEC = 2       # 429 retry: base * 2^attempt with jitter...
+SHEETS_BACKOFF_MAX_SEC = 64       # ...capped here
+SHEETS_MAX_COALESCE_ROWS = 500    # max rows per coalesced append_rows call
 
 # Jina API
 JINA_API_KEY = os.getenv("JINA_API_KEY", "")
+# Optional pool of keys (comma separated); requests go to the least-loaded key
+JINA_API_KEYS = [k.strip() for k in os.getenv("JINA_API_KEYS", "").split(",") if k.strip()] or ([JINA_API_KEY] if JINA_API_KEY else [])
+JINA_KEY_CONCURRENCY = 5          # concurrent requests per key
+JINA_KEY_RPM = 200                # request budget per key per minute
+JINA_ANON_RPM = 20                # budget without any key
+JINA_KEY_COOLDOWN_SEC = 60        # key set aside after a 429 (unless Retry-After says otherwise)
+JINA_KEY_QUOTA_COOLDOWN_SEC = 3600  # key set aside after a 402 (balance / quota exhausted)
 
 # Crawler Settings
 JINA_TIMEOUT_SEC = 25
 JINA_DELAY_MS = 650
 
+# Streaming reads: stop downloading once the decoded body is large enough to
+# survive source-specific cleaning and still fill Max_Length.
+JINA_STREAM_HEADROOM_RATIO = 4      # budget = Max_Length * ratio + chars
+JINA_STREAM_HEADROOM_CHARS = 20000  # nav-heavy pages (gov sites) need fixed slack
+JINA_STREAM_CHUNK_BYTES = 16384
+JINA_MAX_RESPONSE_BYTES = 5 * 1024 * 1024  # hard guard for any single Jina response
+
+# Canonical URL keys (dedup only; Raw_Url keeps the fetchable normalize_url form)
+CANONICAL_CACHE_SIZE = 16384
+CANONICAL_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok",
+    "ref", "ref_src", "ref_url", "referrer", "spm",
+}
+# Per-host overrides, keyed by host without "www.":
+#   keep_params: whitelist of query params (everything else is dropped)
+#   drop_params: extra params to drop for this host
+#   keep_www / keep_trailing_slash / keep_amp: opt out of the default folding
+#   path_sub: [(regex, replacement)] applied to the path
+CANONICAL_HOST_RULES = {
+    "news.ycombinator.com": {"keep_params": ["id"]},
+    "youtube.com": {"keep_params": ["v"]},
+    "arxiv.org": {"path_sub": [(r'v\d+$', '')]},
+    "huggingface.co": {"path_sub": [(r'^(/papers/\d{4}\.\d{5})v\d+$', r'\1')]},
+}
+
+# Relevance keywords (used when CONF_Keywords is missing or empty)
+RELEVANCE_KEYWORDS_FILE = os.getenv("RELEVANCE_KEYWORDS_FILE", "")
+
+# HTTP transport profiles, one aiohttp session each (see core/transport.py)
+#   jina:  r.jina.ai only; read_markdown sets its own per-request total timeout. The limits are
+#          a floor: Transport raises them to len(JINA_API_KEYS) * JINA_KEY_CONCURRENCY
+#   hn:    Firebase item fan-out, up to 200 small requests to one host
+#   feeds: RSS/Atom downloads from many different hosts
+TRANSPORT_PROFILES = {
+    "jina": {"limit": 10, "limit_per_host": 5, "dns_ttl_sec": 600, "keepalive_sec": 30,
+             "total_timeout_sec": None, "connect_timeout_sec": 10},
+    "hn": {"limit": 20, "limit_per_host": 10, "dns_ttl_sec": 600, "keepalive_sec": 30,
+           "total_timeout_sec": 15, "connect_timeout_sec": 5},
+    "feeds": {"limit": 30, "limit_per_host": 4, "dns_ttl_sec": 300, "keepalive_sec": 15,
+              "total_timeout_sec": 30, "connect_timeout_sec": 10},
+}
+
 # Thresholds
 MIN_TEXT_LEN = 120 # Reverting to most conservative limit, though deep requires 200
 
+# RSS_DEEP hybrid: store the feed's own content:encoded / Atom content instead of calling
+# Jina when it looks like the full article
+FEED_CONTENT_MIN_RATIO = 0.5     # stripped text must reach this share of Max_Length...
+FEED_CONTENT_FULL_CHARS = 2000   # ...or this many characters, whichever is smaller
+FEED_CONTENT_MIN_BLOCKS = 3      # and contain at least this many paragraphs/headings/list items
+
+# Hacker News discovery (crawlers.api_hackernews): "algolia" asks the search API for exactly
+# the window and score range and falls back to "firebase" (topstories + one request per item)
+# if it fails. Base URLs are configurable so a local fake server can stand in for either.
+HN_DISCOVERY_BACKEND = os.getenv("HN_DISCOVERY_BACKEND", "algolia")
+HN_ALGOLIA_BASE = os.getenv("HN_ALGOLIA_BASE", "https://hn.algolia.com/api/v1")
+HN_FIREBASE_BASE = os.getenv("HN_FIREBASE_BASE", "https://hacker-news.firebaseio.com/v0")
+HN_ALGOLIA_HITS_PER_PAGE = 100
+HN_ALGOLIA_MAX_PAGES = 5
+
 # Constants
 TARGET_PHASE = 1
 
+# Local state that persists between runs (poll schedule, health, ...)
+STATE_DIR = os.getenv("CRAWLER_STATE_DIR", ".crawler_state")
+
+# Optional: keep full Full_Text bodies in a local SQLite blob store (core.blob_store);
+# DATA_Raw then holds a preview plus a pointer. Empty = bodies stay in the sheet.
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "")
+BLOB_PREVIEW_CHARS = 500
+
+# Optional: append-only SQLite log of DATA_Raw upserts for downstream consumers
+# (core.change_log). Empty = disabled.
+CHANGE_LOG_PATH = os.getenv("CHANGE_LOG_PATH", "")
+
+# Archival (main.py --archive, core.archive): rows older than the retention horizon move out
+# of the hot sheets into monthly partitions. ARCHIVE_BACKEND "sheet" writes DATA_Raw_2024_05
+# style worksheets (into ARCHIVE_SPREADSHEET_ID if set, else the main spreadsheet); "jsonl"
+# writes gzip JSONL files under ARCHIVE_DIR. Archived URLs stay in ARCHIVE_INDEX_PATH for dedup.
+ARCHIVE_BACKEND = os.getenv("ARCHIVE_BACKEND", "sheet")
+ARCHIVE_SPREADSHEET_ID = os.getenv("ARCHIVE_SPREADSHEET_ID", "")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(STATE_DIR, "archive"))
+ARCHIVE_INDEX_PATH = os.path.join(ARCHIVE_DIR, "archived_urls.txt.gz")
+ARCHIVE_RAW_RETENTION_DAYS = 30
+ARCHIVE_LOG_RETENTION_DAYS = 14
+# Held by --serve and --archive (core.archive.RowLock): archiving shifts DATA_Raw row numbers
+ROW_LOCK_PATH = os.path.join(STATE_DIR, "rows.lock")
+
+# Daemon mode (main.py --serve): adaptive per-source polling
+DAEMON_MIN_INTERVAL_MIN = 15
+DAEMON_MAX_INTERVAL_MIN = 360
+DAEMON_DEFAULT_INTERVAL_MIN = 60
+DAEMON_TARGET_ITEMS_PER_POLL = 1.0   # aim for about one new item per poll
+DAEMON_RATE_ALPHA = 0.3              # EWMA weight of the latest observation
+DAEMON_SOURCES_REFRESH_MIN = 30      # re-read CONF_Sources
+DAEMON_INDEX_REFRESH_HOURS = 6       # rebuild the DATA_Raw index from the sheet
+
+# Source / host health (core.health)
+HEALTH_BREAKER_THRESHOLD = 3         # consecutive failures before a host's breaker opens
+HEALTH_SOURCE_FAIL_RUNS = 3          # consecutive failed days (KST) before a source is backed off
+HEALTH_SOURCE_MAX_BACKOFF_DAYS = 7
+HEALTH_LATENCY_ALPHA = 0.3           # EWMA weight of the latest latency sample
+
+# Learned per-host boilerplate (core.boilerplate): lines seen on more than LINE_SHARE of a
+# host's pages are dropped once the host has MIN_DOCS pages
+BOILERPLATE_MIN_DOCS = 8
+BOILERPLATE_LINE_SHARE = 0.6
+BOILERPLATE_WINDOW_DOCS = 200        # counts are halved every this many pages per host
+BOILERPLATE_SEEN_DOCS = 500          # recent URLs per host remembered to avoid double counting
+BOILERPLATE_MAX_LINES = 5000         # line counts kept per host; the rarest (article text) go first
+BOILERPLATE_HOST_TTL_DAYS = 30       # hosts not fetched for this long are forgotten...
+BOILERPLATE_YOUNG_HOST_TTL_DAYS = 3  # ...or this long while still below MIN_DOCS (one-off HN hosts)
+
 # List Crawler Host Rules (Copied from 12_Crawler_CRAWL_LIST.gs)
 CRAWLLIST_RULES = {
     "deepmind_blog": {
@@ -0,0 +1,193 @@
+import datetime
+import glob
+import gzip
+import json
+import logging
+import os
+import socket
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from core.canonical import canonical_url
+from config import SHEET_RAW
+
+logger = logging.getLogger("Archive")
+
+# url_map value for URLs whose DATA_Raw row has been archived: known, but no hot-sheet row
+ARCHIVED_ROW = 0
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def parse_row_time(value) -> Optional[datetime.datetime]:
+    """Collected_At / Timestamp cell -> naive datetime, or None if it isn't one."""
+    s = str(value or "").strip()
+    for fmt, width in ((TIMESTAMP_FORMAT, 19), ("%Y-%m-%d", 10)):
+        try:
+            return datetime.datetime.strptime(s[:width], fmt)
+        except ValueError:
+            continue
+    return None
+
+def split_by_month(headers: list[str], rows: list[tuple[int, list]], date_header: str,
+                   cutoff: datetime.datetime) -> dict[str, list[tuple[int, list]]]:
+    """(row_idx, row) pairs dated before cutoff, grouped by "YYYY-MM". Undated rows stay hot."""
+    try:
+        col = headers.index(date_header)
+    except ValueError:
+        raise ValueError(f"Cannot find '{date_header}' in headers")
+    months = defaultdict(list)
+    for row_idx, row in rows:
+        ts = parse_row_time(row[col]) if len(row) > col else None
+        if ts is not None and ts < cutoff:
+            months[ts.strftime("%Y-%m")].append((row_idx, row))
+    return dict(sorted(months.items()))
+
+class RowLockHeld(Exception):
+    """Another process holds the DATA_Raw row lock."""
+
+class RowLock:
+    """
+    Pid file guarding DATA_Raw row numbers. --archive deletes rows, which shifts every row
+    below them, while --serve keeps url_map / raw_rows keyed by row number for up to
+    DAEMON_INDEX_REFRESH_HOURS and would then write cell updates into the wrong rows. Both
+    take this lock and refuse to start while the other holds it. A lock left by a dead
+    process (or another host, via the cached state dir) is taken over.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.owner = f"{os.getpid()} {socket.gethostname()} {mode}"
+
+    def acquire(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self._live_holder()
+                if holder:
+                    raise RowLockHeld(f"{self.path} is held by {holder}")
+                logger.warning(f"Taking over stale row lock {self.path}")
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(self.owner + "\n")
+            return
+        raise RowLockHeld(f"{self.path} could not be taken")
+
+    def release(self):
+        try:
+            with open(self.path) as f:
+                if f.read().strip() != self.owner:
+                    return
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _live_holder(self) -> Optional[str]:
+        """'pid host mode' of the holder if it is a running process on this host."""
+        try:
+            with open(self.path) as f:
+                holder = f.read().strip()
+            pid, host, mode = holder.split(" ", 2)
+            if host != socket.gethostname():
+                return None
+            os.kill(int(pid), 0)
+        except (FileNotFoundError, ValueError, ProcessLookupError):
+            return None
+        except PermissionError:
+            pass  # alive, owned by another user
+        return f"{mode} (pid {pid})"
+
+class ArchiveIndex:
+    """
+    Canonical URLs of archived DATA_Raw rows, one per line in a gzip file. build_raw_url_index
+    merges them into url_map so archived items are still never collected twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.urls: set[str] = set()
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.urls = {line.rstrip("\n") for line in f if line.strip()}
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add(self, urls: Iterable[str]) -> int:
+        before = len(self.urls)
+        self.urls.update(canonical_url(u) for u in urls if u)
+        return len(self.urls) - before
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.writelines(u + "\n" for u in sorted(self.urls))
+        os.replace(tmp, self.path)
+
+class JsonlPartitions:
+    """Monthly partitions as <dir>/<sheet>/<YYYY-MM>.jsonl.gz, one JSON object per row."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, sheet_name: str, month: str) -> str:
+        return os.path.join(self.directory, sheet_name, f"{month}.jsonl.gz")
+
+    async def write(self, sheet_name: str, month: str, headers: list[str], rows: list[list]):
+        path = self._path(sheet_name, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Appending a new gzip member keeps earlier runs' rows readable as one stream
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def archived_urls(self) -> list[str]:
+        urls = []
+        for path in sorted(glob.glob(self._path(SHEET_RAW, "*"))):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                urls.extend(json.loads(line).get("Raw_Url", "") for line in f if line.strip())
+        return urls
+
+class SheetPartitions:
+    """Monthly partitions as worksheets named <sheet>_<YYYY_MM> in doc (the main spreadsheet
+    or a separate archive one, which also keeps them out of the main cell cap)."""
+
+    def __init__(self, doc):
+        self.doc = doc
+
+    @staticmethod
+    def _title(sheet_name: str, month: str) -> str:
+        return f"{sheet_name}_{month.replace('-', '_')}"
+
+    async def write(self, sheet_name: str, month: str, headers: list[str], rows: list[list]):
+        from gspread.exceptions import WorksheetNotFound
+        title = self._title(sheet_name, month)
+        try:
+            worksheet = await self.doc.worksheet(title)
+        except WorksheetNotFound:
+            worksheet = await self.doc.add_worksheet(title=title, rows=str(len(rows) + 1), cols=str(len(headers)))
+            await worksheet.append_row(headers)
+        width = len(headers)
+        await worksheet.append_rows([(list(row) + [""] * width)[:width] for row in rows])
+
+    async def archived_urls(self) -> list[str]:
+        urls = []
+        prefix = f"{SHEET_RAW}_"
+        for worksheet in await self.doc.worksheets():
+            if not worksheet.title.startswith(prefix):
+                continue
+            headers = [str(h).strip() for h in await worksheet.row_values(1)]
+            if "Raw_Url" in headers:
+                urls.extend((await worksheet.col_values(headers.index("Raw_Url") + 1))[1:])
+        return urls
@@ -0,0 +1,153 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from typing import Iterable, Optional
+
+from config import BLOB_PREVIEW_CHARS
+
+logger = logging.getLogger("BlobStore")
+
+try:
+    import zstandard
+    _ZSTD_C = zstandard.ZstdCompressor(level=10)
+    _ZSTD_D = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    item_uuid  TEXT PRIMARY KEY,
+    sha256     TEXT NOT NULL,
+    codec      TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    data       BLOB NOT NULL,
+    updated_at TEXT NOT NULL
+)
+"""
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_IN_CHUNK = 500
+
+def _compress(text: str) -> tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", _ZSTD_C.compress(raw)
+    return "zlib", zlib.compress(raw, 9)
+
+def _decompress(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob was written with zstd but the zstandard package is not installed")
+        return _ZSTD_D.decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+def make_ref(item_uuid: str, sha256: str) -> str:
+    """Pointer stored in the sheet: identifies the item and the exact body version."""
+    return f"blob:{item_uuid}:{sha256[:12]}"
+
+def parse_ref(ref: str) -> Optional[str]:
+    """Returns the Item_UUID of a blob pointer, or None if ref is not one."""
+    parts = str(ref or "").split(":")
+    if len(parts) == 3 and parts[0] == "blob":
+        return parts[1]
+    return None
+
+def preview(text: str, limit: int = BLOB_PREVIEW_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit] + " ...[Full_Text in blob store]"
+
+class BlobStore:
+    """
+    Compressed Full_Text bodies keyed by Item_UUID, in a single SQLite file.
+
+    DATA_Raw keeps a preview in Full_Text and the pointer (make_ref) in Raw_JSON["blob"] and,
+    if the column exists, Blob_Ref. Downstream stages read bodies in bulk with get_many().
+    Bodies are zstd-compressed when the zstandard package is installed, zlib otherwise;
+    the codec is stored per row so both can be read back.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def put(self, item_uuid: str, text: str) -> str:
+        """Stores (or replaces) the body of item_uuid and returns its pointer."""
+        sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        row = self.conn.execute("SELECT sha256 FROM blobs WHERE item_uuid = ?", (item_uuid,)).fetchone()
+        if row and row[0] == sha:
+            return make_ref(item_uuid, sha)
+
+        codec, data = _compress(text)
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO blobs (item_uuid, sha256, codec, size, data, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (item_uuid, sha, codec, len(text), data, now)
+        )
+        self.conn.commit()
+        return make_ref(item_uuid, sha)
+
+    def get(self, item_uuid: str) -> Optional[str]:
+        return self.get_many([item_uuid]).get(item_uuid)
+
+    def get_many(self, item_uuids: Iterable[str]) -> dict[str, str]:
+        """Returns {Item_UUID: Full_Text} for the UUIDs present in the store."""
+        ids = list(dict.fromkeys(item_uuids))
+        out = {}
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i:i + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for item_uuid, codec, data in self.conn.execute(
+                f"SELECT item_uuid, codec, data FROM blobs WHERE item_uuid IN ({marks})", chunk
+            ):
+                out[item_uuid] = _decompress(codec, data)
+        return out
+
+    def offload(self, row_obj: dict) -> dict:
+        """Returns a copy of a DATA_Raw row with Full_Text moved to the store."""
+        text = str(row_obj.get("Full_Text", ""))
+        item_uuid = row_obj.get("Item_UUID")
+        if not item_uuid or len(text) <= BLOB_PREVIEW_CHARS:
+            return row_obj
+
+        ref = self.put(item_uuid, text)
+        row = dict(row_obj, Full_Text=preview(text), Blob_Ref=ref)
+        try:
+            raw_json = json.loads(row.get("Raw_JSON") or "{}")
+            raw_json["blob"] = ref
+            row["Raw_JSON"] = json.dumps(raw_json)
+        except (TypeError, ValueError):
+            pass
+        return row
+
+    def hydrate(self, rows: list[dict]) -> list[dict]:
+        """Replaces previews with the full bodies, for DATA_Raw records read by downstream stages."""
+        wanted = [r.get("Item_UUID") for r in rows if parse_ref(r.get("Blob_Ref")) or '"blob"' in str(r.get("Raw_JSON", ""))]
+        bodies = self.get_many(u for u in wanted if u)
+        return [dict(r, Full_Text=bodies[r["Item_UUID"]]) if r.get("Item_UUID") in bodies else r for r in rows]
+
+    def stats(self) -> dict:
+        count, size, stored = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+        ).fetchone()
+        return {"items": count, "chars": size, "bytes": stored}
+
+def open_blob_store(path: str) -> Optional[BlobStore]:
+    """Opens the store at path, or returns None when offloading is disabled (empty path)."""
+    if not path:
+        return None
+    store = BlobStore(path)
+    logger.info(f"Offloading Full_Text to {path} ({'zstd' if zstandard is not None else 'zlib'})")
+    return store
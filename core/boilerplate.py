@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+from config import (
+    BOILERPLATE_MIN_DOCS, BOILERPLATE_LINE_SHARE,
+    BOILERPLATE_WINDOW_DOCS, BOILERPLATE_SEEN_DOCS, BOILERPLATE_MAX_LINES,
+    BOILERPLATE_HOST_TTL_DAYS, BOILERPLATE_YOUNG_HOST_TTL_DAYS
+)
+
+logger = logging.getLogger("Boilerplate")
+
+_HAS_WORD = re.compile(r'\w')
+
+def line_key(line: str) -> Optional[str]:
+    """Stable 64-bit hash of a line with whitespace collapsed; None for lines never counted
+    (blank lines and pure punctuation such as "---" or "* * *")."""
+    norm = " ".join(line.split())
+    if not norm or not _HAS_WORD.search(norm):
+        return None
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=8).hexdigest()
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+class BoilerplateModel:
+    """
+    Per-host frequency of hashed lines across fetched documents, persisted across runs.
+
+    learn() counts each distinct line once per document. Nav menus, share buttons and
+    footers appear on nearly every page of a host, article text on one, so once a host has
+    BOILERPLATE_MIN_DOCS documents, clean() drops every line seen on more than
+    BOILERPLATE_LINE_SHARE of them: one hash lookup per line, no site-specific patterns.
+    Counts are halved every BOILERPLATE_WINDOW_DOCS documents, so after a redesign the old
+    template fades out and the new one is learned.
+
+    State stays bounded: a host keeps at most BOILERPLATE_MAX_LINES line counts, and save()
+    forgets hosts not fetched for BOILERPLATE_HOST_TTL_DAYS (BOILERPLATE_YOUNG_HOST_TTL_DAYS
+    while below MIN_DOCS, which is most of the one-off hosts HN links to).
+    """
+
+    def __init__(self, state_file: str = ""):
+        self.state_file = state_file
+        # host -> {"docs": n, "lines": {key: count}, "seen": [doc keys], "day": last learn (epoch day)}
+        self.hosts: dict[str, dict] = {}
+        self._load()
+
+    def learn(self, host: str, text: str, doc_id: str = ""):
+        if not host:
+            return
+        h = self.hosts.setdefault(host, {"docs": 0, "lines": {}, "seen": []})
+        h["day"] = _today()
+        if doc_id:
+            # The same URL fetched again (rerun, backfill) must not count twice
+            doc_key = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).hexdigest()
+            if doc_key in h["seen"]:
+                return
+            h["seen"].append(doc_key)
+            del h["seen"][:-BOILERPLATE_SEEN_DOCS]
+
+        lines = h["lines"]
+        for key in {line_key(line) for line in text.splitlines()}:
+            if key:
+                lines[key] = lines.get(key, 0) + 1
+        h["docs"] += 1
+
+        if h["docs"] >= BOILERPLATE_WINDOW_DOCS:
+            h["docs"] //= 2
+            h["lines"] = {k: c // 2 for k, c in lines.items() if c >= 2}
+        elif len(lines) > BOILERPLATE_MAX_LINES:
+            # Lines seen once or twice are article text; boilerplate counts are near "docs"
+            kept = sorted(lines.items(), key=lambda kv: kv[1], reverse=True)[:BOILERPLATE_MAX_LINES]
+            h["lines"] = dict(kept)
+
+    def ready(self, host: str) -> bool:
+        return self.hosts.get(host, {}).get("docs", 0) >= BOILERPLATE_MIN_DOCS
+
+    def clean(self, host: str, text: str) -> Optional[str]:
+        """text without the host's boilerplate lines, or None while the host has too few documents."""
+        h = self.hosts.get(host)
+        if not h or h["docs"] < BOILERPLATE_MIN_DOCS:
+            return None
+        limit = h["docs"] * BOILERPLATE_LINE_SHARE
+        lines = h["lines"]
+        kept = [line for line in text.splitlines() if lines.get(line_key(line), 0) <= limit]
+        return re.sub(r'\n{3,}', '\n\n', "\n".join(kept)).strip()
+
+    def prune(self) -> int:
+        """Forgets hosts idle past their TTL; returns how many were dropped."""
+        today = _today()
+        stale = [
+            host for host, h in self.hosts.items()
+            if today - h.get("day", today) > (
+                BOILERPLATE_HOST_TTL_DAYS if h["docs"] >= BOILERPLATE_MIN_DOCS else BOILERPLATE_YOUNG_HOST_TTL_DAYS
+            )
+        ]
+        for host in stale:
+            del self.hosts[host]
+        return len(stale)
+
+    def summary(self) -> str:
+        ready = sum(1 for host in self.hosts if self.ready(host))
+        return f"{len(self.hosts)} hosts, {ready} with a boilerplate model"
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                self.hosts = json.load(f).get("hosts", {})
+            # State written before hosts carried a day starts its TTL now
+            today = _today()
+            for h in self.hosts.values():
+                h.setdefault("day", today)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable boilerplate state {self.state_file}: {e}")
+
+    def save(self):
+        if not self.state_file:
+            return
+        self.prune()
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"hosts": self.hosts}, f, separators=(",", ":"))
+        os.replace(tmp, self.state_file)
@@ -0,0 +1,111 @@
+import re
+import logging
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from config import CANONICAL_TRACKING_PARAMS, CANONICAL_HOST_RULES, CANONICAL_CACHE_SIZE
+from core.utils import normalize_url
+
+logger = logging.getLogger("Canonical")
+
+_AMP_PATH = re.compile(r'(?:/amp/?|\.amp)$', re.IGNORECASE)
+_AMP_PARAMS = {"amp", "outputtype"}
+_compiled_path_rules: dict[str, list] = {}
+
+def _host_rule(host: str) -> dict:
+    rule = CANONICAL_HOST_RULES.get(host)
+    if rule is None and host.startswith("www."):
+        rule = CANONICAL_HOST_RULES.get(host[4:])
+    return rule or {}
+
+def _path_rules(host: str, rule: dict) -> list:
+    if host not in _compiled_path_rules:
+        _compiled_path_rules[host] = [(re.compile(rx), repl) for rx, repl in rule.get("path_sub", [])]
+    return _compiled_path_rules[host]
+
+def _is_tracking(key: str, rule: dict) -> bool:
+    k = key.lower()
+    if k.startswith("utm_") or k in CANONICAL_TRACKING_PARAMS or k in _AMP_PARAMS:
+        return True
+    return k in rule.get("drop_params", ())
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def canonical_url(u: str) -> str:
+    """
+    Dedup key for a link. Folds variants that point at the same document: host case,
+    default ports, 'www.' and 'amp.' hosts, AMP paths, trailing slashes, tracking
+    params and query order, plus per-host rules from CANONICAL_HOST_RULES.
+
+    The result is only used as a url_map key; it is not guaranteed to be fetchable.
+    """
+    url = normalize_url(u)
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+
+    rule = _host_rule(host)
+    if host.startswith("www.") and not rule.get("keep_www"):
+        host = host[4:]
+    elif host.startswith("amp."):
+        host = host[4:]
+
+    # hostname drops the brackets around an IPv6 literal; put them back
+    netloc = f"[{host}]" if ":" in host else host
+    if port not in (None, 80, 443):
+        netloc = f"{netloc}:{port}"
+
+    path = parts.path or "/"
+    if not rule.get("keep_amp"):
+        path = _AMP_PATH.sub("", path) or "/"
+    for rx, repl in _path_rules(host, rule):
+        path = rx.sub(repl, path)
+    if len(path) > 1 and path.endswith("/") and not rule.get("keep_trailing_slash"):
+        path = path.rstrip("/") or "/"
+
+    query = ""
+    if parts.query:
+        keep_only = rule.get("keep_params")
+        params = [
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if (k in keep_only if keep_only else not _is_tracking(k, rule))
+        ]
+        if params:
+            query = "?" + urlencode(sorted(params))
+
+    return f"https://{netloc}{path}{query}"
+
+def canonicalize_url_map(url_map: dict) -> tuple[dict, dict]:
+    """
+    Re-keys a {Raw_Url: row_idx} index by canonical_url.
+
+    Returns (canonical_map, duplicates) where duplicates maps a canonical key to every
+    row that folded into it. The first row wins in canonical_map, matching the order
+    the sheet was written in.
+    """
+    canonical_map = {}
+    duplicates = {}
+    for url, row_idx in url_map.items():
+        key = canonical_url(url)
+        if key in canonical_map:
+            duplicates.setdefault(key, [canonical_map[key]]).append(row_idx)
+            continue
+        canonical_map[key] = row_idx
+    return canonical_map, duplicates
+
+def migrate_url_index(url_map: dict) -> dict:
+    """
+    Recomputes every key of an existing url_map after CANONICAL_HOST_RULES or the
+    tracking-param list changed, clearing the memo first. Keys may be raw or
+    previously canonicalized URLs; both fold to the new canonical form.
+    """
+    canonical_url.cache_clear()
+    _compiled_path_rules.clear()
+    canonical_map, duplicates = canonicalize_url_map(url_map)
+    for key, rows in duplicates.items():
+        logger.warning(f"{len(rows)} DATA_Raw rows share canonical URL {key}: rows {rows}")
+    return canonical_map
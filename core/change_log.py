@@ -0,0 +1,101 @@
+import datetime
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+logger = logging.getLogger("ChangeLog")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_uuid  TEXT NOT NULL,
+    op         TEXT NOT NULL,
+    source_id  TEXT,
+    raw_url    TEXT,
+    title      TEXT,
+    row_idx    INTEGER,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    consumer   TEXT PRIMARY KEY,
+    seq        INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+class ChangeLog:
+    """
+    Append-only log of DATA_Raw upserts with increasing sequence numbers, so downstream
+    consumers read only what changed since their cursor instead of scanning the sheet
+    for Processed_YN = "N".
+
+        changes = log.read_since(log.cursor("newsletter"), limit=200)
+        ...process...
+        await gs.ack_processed("newsletter", changes)   # one batch write + cursor advance
+
+    AUTOINCREMENT guarantees seq never goes backwards, even after old rows are pruned.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, op: str, row_obj: dict, row_idx: Optional[int] = None) -> int:
+        """Records an "insert" or "update" of a DATA_Raw row and returns its sequence number."""
+        cur = self.conn.execute(
+            "INSERT INTO changes (item_uuid, op, source_id, raw_url, title, row_idx, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (row_obj.get("Item_UUID", ""), op, row_obj.get("Source_ID"), row_obj.get("Raw_Url"),
+             row_obj.get("Title_Org"), row_idx, _now())
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def read_since(self, cursor: int, limit: int = 100) -> list[dict]:
+        """Changes with seq > cursor, oldest first, at most limit of them."""
+        rows = self.conn.execute(
+            "SELECT * FROM changes WHERE seq > ? ORDER BY seq LIMIT ?", (cursor, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def latest_seq(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def cursor(self, consumer: str) -> int:
+        row = self.conn.execute("SELECT seq FROM cursors WHERE consumer = ?", (consumer,)).fetchone()
+        return row[0] if row else 0
+
+    def ack(self, consumer: str, seq: int):
+        """Advances consumer's cursor to seq. Cursors never move backwards."""
+        self.conn.execute(
+            "INSERT INTO cursors (consumer, seq, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(consumer) DO UPDATE SET seq = MAX(seq, excluded.seq), updated_at = excluded.updated_at",
+            (consumer, seq, _now())
+        )
+        self.conn.commit()
+
+    def prune(self, before_seq: int) -> int:
+        """Deletes changes every consumer has acknowledged, up to before_seq."""
+        floor = self.conn.execute("SELECT MIN(seq) FROM cursors").fetchone()[0]
+        limit = min(before_seq, floor or 0)
+        cur = self.conn.execute("DELETE FROM changes WHERE seq <= ?", (limit,))
+        self.conn.commit()
+        return cur.rowcount
+
+def open_change_log(path: str) -> Optional[ChangeLog]:
+    """Opens the log at path, or returns None when the change log is disabled (empty path)."""
+    if not path:
+        return None
+    return ChangeLog(path)
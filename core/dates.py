@@ -0,0 +1,102 @@
+import datetime
+import re
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional
+
+UTC = datetime.timezone.utc
+
+# 2024.05.01 / 2024-05-01 / 2024/5/1 / 2024. 5. 1. / 2024년 5월 1일, optional HH:MM[:SS]
+_KOREAN_DATE = re.compile(
+    r'^(\d{4})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})\s*[일.]?'
+    r'(?:\s+(\d{1,2}):(\d{2})(?::(\d{2}))?)?$'
+)
+# Oct 12, 2023 / October 12 2023
+_MONTH_DAY_YEAR = re.compile(r'^([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2}),?\s+(\d{4})$')
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_RFC822_HINT = re.compile(r'^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s')
+
+def _as_utc(dt: datetime.datetime) -> datetime.datetime:
+    # Naive values are treated as UTC, as per most feed standards
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
+
+def _parse_iso(s: str) -> Optional[datetime.datetime]:
+    if len(s) < 10 or not s[:4].isdigit() or s[4] != "-":
+        return None
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    try:
+        return datetime.datetime.fromisoformat(s)
+    except ValueError:
+        return None
+
+def _parse_rfc822(s: str) -> Optional[datetime.datetime]:
+    if not _RFC822_HINT.match(s):
+        return None
+    try:
+        return parsedate_to_datetime(s)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def _parse_korean(s: str) -> Optional[datetime.datetime]:
+    m = _KOREAN_DATE.match(s)
+    if not m:
+        return None
+    y, mo, d, hh, mm, ss = m.groups()
+    try:
+        return datetime.datetime(int(y), int(mo), int(d), int(hh or 0), int(mm or 0), int(ss or 0))
+    except ValueError:
+        return None
+
+def _parse_month_day_year(s: str) -> Optional[datetime.datetime]:
+    m = _MONTH_DAY_YEAR.match(s)
+    if not m:
+        return None
+    month = _MONTHS.get(m.group(1).lower())
+    if not month:
+        return None
+    try:
+        return datetime.datetime(int(m.group(3)), month, int(m.group(2)))
+    except ValueError:
+        return None
+
+def _parse_dateutil(s: str) -> Optional[datetime.datetime]:
+    # Imported lazily: only strings none of the fast paths recognise get here
+    from dateutil import parser as dateutil_parser
+    try:
+        return dateutil_parser.parse(s)
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+_FAST_PATHS = (_parse_iso, _parse_rfc822, _parse_korean, _parse_month_day_year)
+
+@lru_cache(maxsize=4096)
+def parse_date(date_string: str) -> Optional[datetime.datetime]:
+    """
+    Parses a feed or page date into a UTC-aware datetime.
+
+    Tries ISO 8601, RFC 822, Korean YYYY.MM.DD forms and "Oct 12, 2023" before falling
+    back to dateutil. Results are memoized, since feeds repeat the same strings between
+    entries and between runs of the same process.
+    """
+    if not date_string:
+        return None
+    s = str(date_string).strip()
+    if not s:
+        return None
+
+    for fast_path in _FAST_PATHS:
+        dt = fast_path(s)
+        if dt is not None:
+            return _as_utc(dt)
+
+    dt = _parse_dateutil(s)
+    return _as_utc(dt) if dt is not None else None
+
+def parse_timestamp(date_string: str) -> Optional[float]:
+    """parse_date as a UTC epoch number, for comparing against window_bounds."""
+    dt = parse_date(date_string)
+    return dt.timestamp() if dt is not None else None
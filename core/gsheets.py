@@ -1,10 +1,11 @@
 import json
 import os
+import logging
 import uuid
 import datetime
-import gspread_asyncio
-from google.oauth2.service_account import Credentials
 from core.time_filter import KST
+from core.canonical import canonical_url, canonicalize_url_map
+from core.utils import content_hash
 
 from config import (
     GOOGLE_SERVICE_ACCOUNT_FILE, 
@@ -12,33 +13,158 @@ from config import (
     SPREADSHEET_NAME,
     SHEET_RAW, 
     SHEET_CONF_SOURCE, 
-    SHEET_LOG
+    SHEET_LOG,
+    SHEET_CONF_KEYWORDS,
+    GOOGLE_TOKEN_CACHE_FILE,
+    BLOB_STORE_PATH,
+    CHANGE_LOG_PATH,
+    ARCHIVE_BACKEND,
+    ARCHIVE_SPREADSHEET_ID,
+    ARCHIVE_DIR,
+    ARCHIVE_INDEX_PATH
 )
 
+logger = logging.getLogger("GoogleSheets")
+
+def _stored_hash(headers: list[str], row: list) -> str:
+    """Content hash of an indexed DATA_Raw row: the Content_Hash cell, Raw_JSON's
+    contentHash, or (older rows) a hash of the Title_Org and Full_Text cells."""
+    cells = dict(zip(headers, row))
+    if cells.get("Content_Hash"):
+        return cells["Content_Hash"]
+    try:
+        stored = json.loads(cells.get("Raw_JSON") or "{}").get("contentHash")
+    except (ValueError, AttributeError):
+        stored = None
+    return stored or content_hash(cells.get("Title_Org"), cells.get("Full_Text"))
+
+def _with_hash(row_obj: dict, digest: str) -> dict:
+    """Copy of row_obj carrying digest in Content_Hash and Raw_JSON, so the next index
+    build sees it even when Full_Text has been replaced by a blob preview."""
+    row = dict(row_obj, Content_Hash=digest)
+    try:
+        raw_json = json.loads(row.get("Raw_JSON") or "{}")
+        raw_json["contentHash"] = digest
+        row["Raw_JSON"] = json.dumps(raw_json)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return row
+
+def _cell_updates(row_idx: int, old_row: list, new_row: list[str]) -> list[dict]:
+    """batch_update ranges covering only the cells of new_row that differ from old_row,
+    one range per run of adjacent changed columns."""
+    from gspread.utils import rowcol_to_a1
+    old = list(old_row) + [""] * (len(new_row) - len(old_row))
+    updates = []
+    col = 0
+    while col < len(new_row):
+        if str(old[col]) == new_row[col]:
+            col += 1
+            continue
+        start = col
+        while col < len(new_row) and str(old[col]) != new_row[col]:
+            col += 1
+        updates.append({"range": rowcol_to_a1(row_idx, start + 1), "values": [new_row[start:col]]})
+    return updates
+
+# gspread / google-auth are imported on first use: together they are the bulk of
+# main.py's import time and nothing needs them before GoogleSheetsManager.init().
+_agcm = None
+_last_creds = None
+
 def get_creds():
+    global _last_creds
+    from google.oauth2.service_account import Credentials
+
     # Requires standard scopes for Sheets
     scopes = [
         'https://www.googleapis.com/auth/spreadsheets',
         'https://www.googleapis.com/auth/drive'
     ]
     if os.path.exists(GOOGLE_SERVICE_ACCOUNT_FILE):
-        return Credentials.from_service_account_file(GOOGLE_SERVICE_ACCOUNT_FILE, scopes=scopes)
+        creds = Credentials.from_service_account_file(GOOGLE_SERVICE_ACCOUNT_FILE, scopes=scopes)
+        _load_cached_token(creds)
+        _last_creds = creds
+        return creds
     else:
         raise FileNotFoundError(f"Service account file not found: {GOOGLE_SERVICE_ACCOUNT_FILE}")
 
-agcm = gspread_asyncio.AsyncioGspreadClientManager(get_creds)
+def _load_cached_token(creds):
+    """Seeds creds with a still-valid access token from GOOGLE_TOKEN_CACHE_FILE, if any."""
+    if not GOOGLE_TOKEN_CACHE_FILE or not os.path.exists(GOOGLE_TOKEN_CACHE_FILE):
+        return
+    try:
+        with open(GOOGLE_TOKEN_CACHE_FILE, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("client_email") != creds.service_account_email:
+            return
+        # google-auth compares expiry as naive UTC
+        expiry = datetime.datetime.fromisoformat(cached["expiry"])
+        now_utc = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        if expiry - datetime.timedelta(minutes=5) > now_utc:
+            creds.token = cached["token"]
+            creds.expiry = expiry
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable token cache: {e}")
+
+def _save_cached_token():
+    creds = _last_creds
+    if not GOOGLE_TOKEN_CACHE_FILE or creds is None or not creds.token or not creds.expiry:
+        return
+    try:
+        fd = os.open(GOOGLE_TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "client_email": creds.service_account_email,
+                "token": creds.token,
+                "expiry": creds.expiry.isoformat()
+            }, f)
+    except OSError as e:
+        logger.warning(f"Could not write token cache: {e}")
+
+def _get_agcm():
+    global _agcm
+    if _agcm is None:
+        from core.sheets_scheduler import QuotaClientManager
+        _agcm = QuotaClientManager(get_creds)
+    return _agcm
 
 class GoogleSheetsManager:
-    def __init__(self):
+    def __init__(self, blob_store_path: str = BLOB_STORE_PATH, change_log_path: str = CHANGE_LOG_PATH,
+                 archive_index_path: str = ARCHIVE_INDEX_PATH):
         self.client = None
         self.doc = None
+        self.blobs = None
+        self.changes = None
+        self.writes = None
+        # DATA_Raw cells and content hashes by row, filled by build_raw_url_index
+        self.raw_rows: dict[int, list[str]] = {}
+        self.raw_hashes: dict[int, str] = {}
+        self.archive_index_path = archive_index_path
+        if blob_store_path:
+            from core.blob_store import open_blob_store
+            self.blobs = open_blob_store(blob_store_path)
+        if change_log_path:
+            from core.change_log import open_change_log
+            self.changes = open_change_log(change_log_path)
 
     async def init(self):
-        self.client = await agcm.authorize()
+        from core.sheets_scheduler import WriteQueue
+        self.writes = WriteQueue()
+        self.client = await _get_agcm().authorize()
         if SPREADSHEET_ID:
             self.doc = await self.client.open_by_key(SPREADSHEET_ID)
         else:
             self.doc = await self.client.open(SPREADSHEET_NAME)
+        _save_cached_token()
+
+    async def flush(self):
+        """Waits for queued writes (upserts, logs) to reach the sheet."""
+        if self.writes:
+            await self.writes.flush()
+
+    def quota_summary(self) -> str:
+        return f"{_get_agcm().summary()}; {self.writes.summary() if self.writes else ''}"
 
     async def read_sources(self) -> list[dict]:
         """Reads CONF_SOURCE and returns list of dictionaries."""
@@ -46,8 +172,76 @@ class GoogleSheetsManager:
         records = await worksheet.get_all_records()
         return records
 
+    async def write_source_health(self, summaries: dict[str, str]):
+        """Writes one status line per source into the Health column of CONF_SOURCE (added if missing)."""
+        from gspread.utils import rowcol_to_a1
+        if not summaries:
+            return
+        worksheet = await self.doc.worksheet(SHEET_CONF_SOURCE)
+        all_values = await worksheet.get_all_values()
+        if not all_values:
+            return
+
+        headers = [str(h).strip() for h in all_values[0]]
+        try:
+            id_col = headers.index("Source_ID")
+        except ValueError:
+            logger.warning(f"Cannot find 'Source_ID' in headers of {SHEET_CONF_SOURCE}, skipping health write-back")
+            return
+
+        updates = []
+        if "Health" in headers:
+            health_col = headers.index("Health") + 1
+        else:
+            health_col = len(headers) + 1
+            if worksheet.col_count < health_col:
+                await worksheet.add_cols(health_col - worksheet.col_count)
+            updates.append({"range": rowcol_to_a1(1, health_col), "values": [["Health"]]})
+
+        for row_idx, row in enumerate(all_values[1:], start=2):
+            sid = str(row[id_col]).strip() if len(row) > id_col else ""
+            if sid in summaries:
+                updates.append({"range": rowcol_to_a1(row_idx, health_col), "values": [[summaries[sid]]]})
+
+        if updates:
+            await worksheet.batch_update(updates)
+
+    async def read_keywords(self) -> list[dict]:
+        """Reads CONF_Keywords if the sheet exists, otherwise returns an empty list."""
+        from gspread.exceptions import WorksheetNotFound
+        try:
+            worksheet = await self.doc.worksheet(SHEET_CONF_KEYWORDS)
+        except WorksheetNotFound:
+            return []
+        return await worksheet.get_all_records()
+
+    async def archive_partitions(self):
+        """Monthly partitions for ARCHIVE_BACKEND: gzip JSONL files under ARCHIVE_DIR, or
+        worksheets in ARCHIVE_SPREADSHEET_ID (the main spreadsheet if unset)."""
+        from core.archive import JsonlPartitions, SheetPartitions
+        if ARCHIVE_BACKEND == "jsonl":
+            return JsonlPartitions(ARCHIVE_DIR)
+        doc = await self.client.open_by_key(ARCHIVE_SPREADSHEET_ID) if ARCHIVE_SPREADSHEET_ID else self.doc
+        return SheetPartitions(doc)
+
+    async def load_archive_index(self, partitions=None):
+        """
+        The ArchiveIndex at archive_index_path. If the file is missing (state cache lost,
+        or never archived) it is rebuilt from the partitions, which hold every archived URL,
+        and saved, so archived items are not collected again.
+        """
+        from core.archive import ArchiveIndex
+        index = ArchiveIndex(self.archive_index_path)
+        if not os.path.exists(self.archive_index_path):
+            partitions = partitions or await self.archive_partitions()
+            restored = index.add(await partitions.archived_urls())
+            index.save()
+            if restored:
+                logger.info(f"Rebuilt archive index from partitions: {restored} URLs")
+        return index
+
     async def build_raw_url_index(self):
-        """Returns the worksheet, headers, and a dict mapped by Raw_Url"""
+        """Returns the worksheet, headers, and a dict mapped by canonical Raw_Url"""
         sheet = await self.doc.worksheet(SHEET_RAW)
         # get_all_values includes headers
         all_values = await sheet.get_all_values()
@@ -63,37 +257,146 @@ class GoogleSheetsManager:
             raise ValueError(f"Cannot find 'Raw_Url' in headers of {SHEET_RAW}")
             
         url_map = {}
+        self.raw_rows = {}
+        self.raw_hashes = {}
         for row_idx, row in enumerate(all_values[1:], start=2): # 1-based indexing in sheets, +1 for header
             if len(row) > url_col_idx:
                 url = str(row[url_col_idx]).strip()
                 if url:
                     url_map[url] = row_idx
+                    self.raw_rows[row_idx] = row
+                    self.raw_hashes[row_idx] = _stored_hash(headers, row)
+
+        url_map, duplicates = canonicalize_url_map(url_map)
+        if duplicates:
+            logger.warning(f"{len(duplicates)} canonical URLs map to more than one {SHEET_RAW} row; keeping the first")
+
+        # Archived rows are gone from the sheet but must still count as collected
+        if self.archive_index_path:
+            from core.archive import ARCHIVED_ROW
+            for url in (await self.load_archive_index()).urls:
+                url_map.setdefault(url, ARCHIVED_ROW)
                     
         return sheet, headers, url_map
 
-    async def upsert_raw_by_url(self, sheet, headers, url_map, data_obj: dict):
-        """Upserts a row into DATA_Raw based on Raw_Url."""
+    async def upsert_raw_by_url(self, sheet, headers, url_map, data_obj: dict) -> str:
+        """
+        Upserts a row into DATA_Raw based on Raw_Url. Returns "new", "changed" or
+        "unchanged": a known URL whose title and text hash to the same value as the indexed
+        row is not written at all, and a changed row is updated only in the cells that differ.
+        """
+        digest = content_hash(data_obj.get("Title_Org"), data_obj.get("Full_Text"))
+        data_obj = _with_hash(data_obj, digest)
+        key = canonical_url(data_obj.get("Raw_Url"))
+        row_idx = url_map.get(key)
+        if key in url_map and not row_idx:
+            # Archived row (core.archive.ARCHIVED_ROW): nothing to update in the hot sheet
+            return "unchanged"
+        if row_idx and self.raw_hashes.get(row_idx) == digest:
+            return "unchanged"
+
+        if self.blobs:
+            data_obj = self.blobs.offload(data_obj)
         row_data = [str(data_obj.get(h, "")) for h in headers]
-        key = data_obj.get("Raw_Url")
-        
-        if key in url_map:
-            row_idx = url_map[key]
-            # range: A{row_idx}:Z{row_idx}
-            end_col = chr(ord('A') + len(headers) - 1) if len(headers) <= 26 else 'Z' # simple approx
-            # Better to use proper col string generation if > 26 columns, but assuming basic for now.
-            # Using update for specific row
-            await sheet.update(f"A{row_idx}", [row_data])
+
+        if row_idx:
+            cached = self.raw_rows.get(row_idx)
+            if cached is None:
+                await self.writes.update(sheet, f"A{row_idx}", [row_data])
+            else:
+                updates = _cell_updates(row_idx, cached, row_data)
+                if updates:
+                    await self.writes.batch_update(sheet, updates)
+            op, status = "update", "changed"
         else:
-            await sheet.append_row(row_data)
-            # Rough update of map assuming append goes to last row + 1
-            # In highly concurrent scenarios, mapping might be slightly off. 
-            # If absolute strictness is needed, batch updates are better.
-            
+            # Queued appends to DATA_Raw are coalesced into one append_rows call
+            row_idx = await self.writes.append_row(sheet, row_data)
+            # Register the new row so later sources in this run treat the URL as collected
+            if row_idx:
+                url_map[key] = row_idx
+            op, status = "insert", "new"
+
+        if row_idx:
+            self.raw_rows[row_idx] = row_data
+            self.raw_hashes[row_idx] = digest
+        if self.changes:
+            self.changes.append(op, data_obj, row_idx or None)
+        return status
+
+    async def ack_processed(self, consumer: str, changes: list[dict]):
+        """
+        Marks the DATA_Raw rows of a batch of change-log records as Processed_YN = "Y" with a
+        single batch_update, then advances consumer's cursor past the batch. Rows are found
+        by Item_UUID, since archiving shifts row numbers; archived items are skipped.
+        Raises RuntimeError if the change log is disabled (change_log_path=None).
+        """
+        from gspread.utils import rowcol_to_a1
+        if self.changes is None:
+            raise RuntimeError("change log disabled")
+        if not changes:
+            return
+        sheet = await self.doc.worksheet(SHEET_RAW)
+        headers = [str(h).strip() for h in await sheet.row_values(1)]
+        try:
+            col = headers.index("Processed_YN") + 1
+            uuid_col = headers.index("Item_UUID") + 1
+        except ValueError:
+            raise ValueError(f"Cannot find 'Processed_YN' / 'Item_UUID' in headers of {SHEET_RAW}")
+
+        uuids = {c["item_uuid"] for c in changes if c.get("item_uuid")}
+        column = await sheet.col_values(uuid_col)
+        rows = [r for r, value in enumerate(column, start=1) if r > 1 and value in uuids]
+        if rows:
+            await self.writes.batch_update(sheet, [{"range": rowcol_to_a1(r, col), "values": [["Y"]]} for r in rows],
+                                           lane=self.writes.DATA)
+        self.changes.ack(consumer, max(c["seq"] for c in changes))
+
+    async def archive_sheet(self, sheet_name: str, date_header: str, cutoff: datetime.datetime, partitions,
+                            index=None) -> list[dict]:
+        """
+        Moves rows of sheet_name dated (date_header) before cutoff into monthly partitions,
+        then deletes them from the sheet in one batch_update. Partitions are written, and
+        the rows' Raw_Url values added to index (an ArchiveIndex) and saved, before anything
+        is deleted. Returns the archived rows as dicts.
+        """
+        from core.archive import split_by_month
+        worksheet = await self.doc.worksheet(sheet_name)
+        all_values = await worksheet.get_all_values()
+        if len(all_values) < 2:
+            return []
+        headers = [str(h).strip() for h in all_values[0]]
+        months = split_by_month(headers, list(enumerate(all_values[1:], start=2)), date_header, cutoff)
+        if not months:
+            return []
+
+        archived_rows = []
+        for month, rows in months.items():
+            await partitions.write(sheet_name, month, headers, [row for _, row in rows])
+            archived_rows.extend(rows)
+            logger.info(f"{sheet_name}: archived {len(rows)} rows to partition {month}")
+        if index is not None:
+            # A crash after the delete must not leave archived URLs out of the dedup index
+            index.add(dict(zip(headers, row)).get("Raw_Url") for _, row in archived_rows)
+            index.save()
+
+        # Delete bottom-up so earlier ranges keep their row numbers; adjacent rows share a request
+        requests = []
+        for row_idx in sorted((r for r, _ in archived_rows), reverse=True):
+            if requests and requests[-1]["deleteDimension"]["range"]["startIndex"] == row_idx:
+                requests[-1]["deleteDimension"]["range"]["startIndex"] = row_idx - 1
+            else:
+                requests.append({"deleteDimension": {"range": {
+                    "sheetId": worksheet.id, "dimension": "ROWS", "startIndex": row_idx - 1, "endIndex": row_idx
+                }}})
+        await self.doc.batch_update({"requests": requests})
+        return [dict(zip(headers, row)) for _, row in archived_rows]
+
     async def log_event(self, module_name: str, action_type: str, target_uuid: str, status: str, message: str):
         """Logs an event to LOG_History."""
+        from gspread.exceptions import WorksheetNotFound
         try:
             worksheet = await self.doc.worksheet(SHEET_LOG)
-        except gspread_asyncio.WorksheetNotFound:
+        except WorksheetNotFound:
             worksheet = await self.doc.add_worksheet(title=SHEET_LOG, rows="1000", cols="7")
             await worksheet.append_row(["Log_UUID", "Timestamp", "Module", "Action_Type", "Target_UUID", "Status", "Message"])
             
@@ -110,4 +413,5 @@ class GoogleSheetsManager:
             status,
             message or ""
         ]
-        await worksheet.append_row(row)
+        # Log rows wait behind data writes and go out in batches
+        await self.writes.append_row(worksheet, row, lane=self.writes.LOG)
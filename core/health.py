@@ -0,0 +1,155 @@
+import datetime
+import json
+import logging
+import os
+from collections import Counter
+
+from config import (
+    HEALTH_BREAKER_THRESHOLD, HEALTH_SOURCE_FAIL_RUNS,
+    HEALTH_SOURCE_MAX_BACKOFF_DAYS, HEALTH_LATENCY_ALPHA
+)
+from core.time_filter import KST
+
+logger = logging.getLogger("Health")
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request to a host whose breaker is open."""
+
+def _ewma(prev, value):
+    if prev is None:
+        return value
+    return HEALTH_LATENCY_ALPHA * value + (1 - HEALTH_LATENCY_ALPHA) * prev
+
+class HealthTracker:
+    """
+    Success rate and latency per host and per Source_ID, persisted across runs.
+
+    Hosts: after HEALTH_BREAKER_THRESHOLD consecutive failures the breaker opens and
+    allow() refuses the host for the rest of the run. A breaker that was open at the end
+    of the previous run starts half-open: requests go through, but the first failure
+    reopens it, while a success closes it.
+
+    Sources: a run fails when the source itself failed (feed/list HTTP error, crash) or
+    when every item it attempted failed. Failures count once per KST day, so a --serve
+    process polling every few minutes backs off exactly like the daily cron: after
+    HEALTH_SOURCE_FAIL_RUNS consecutive failed days the source is skipped for 1, 2, 4...
+    days, capped at HEALTH_SOURCE_MAX_BACKOFF_DAYS. Any successful run resets the count.
+    """
+
+    def __init__(self, state_file: str = ""):
+        self.state_file = state_file
+        self.hosts: dict[str, dict] = {}
+        self.sources: dict[str, dict] = {}
+        self.tripped: dict[str, str] = {}        # host -> last error, opened during this run
+        self._half_open: set[str] = set()
+        self._run: dict[str, Counter] = {}       # source_id -> this run's item/source counters
+        self._load()
+
+    def allow(self, host: str) -> bool:
+        return host not in self.tripped
+
+    def record_host(self, host: str, ok: bool, latency_sec: float, error: str = ""):
+        h = self.hosts.setdefault(host, {"ok": 0, "fail": 0, "consecutive_fail": 0, "latency": None, "last_error": ""})
+        h["latency"] = _ewma(h["latency"], latency_sec)
+        if ok:
+            h["ok"] += 1
+            h["consecutive_fail"] = 0
+            self._half_open.discard(host)
+            return
+        h["fail"] += 1
+        h["consecutive_fail"] += 1
+        h["last_error"] = error[:200]
+        threshold = 1 if host in self._half_open else HEALTH_BREAKER_THRESHOLD
+        if h["consecutive_fail"] >= threshold and host not in self.tripped:
+            self.tripped[host] = h["last_error"]
+            logger.warning(f"Circuit open for {host} after {h['consecutive_fail']} consecutive failures")
+
+    def reset_breakers(self):
+        """Starts a new run for long-lived processes: open breakers become half-open."""
+        self._half_open |= set(self.tripped)
+        self.tripped.clear()
+
+    def should_skip(self, source_id: str, today: datetime.date = None) -> tuple[bool, str]:
+        s = self.sources.get(source_id)
+        if not s or not s.get("skip_until"):
+            return False, ""
+        today = today or datetime.datetime.now(KST).date()
+        until = datetime.date.fromisoformat(s["skip_until"])
+        if today < until:
+            return True, f"{s['consecutive_failed_runs']} failed days in a row, backing off until {until}"
+        return False, ""
+
+    def source_failed(self, source_id: str, reason: str = ""):
+        self._run.setdefault(source_id, Counter())["source_fail"] += 1
+        self.sources.setdefault(source_id, {})["last_error"] = reason[:200]
+
+    def item_result(self, source_id: str, ok: bool):
+        self._run.setdefault(source_id, Counter())["item_ok" if ok else "item_fail"] += 1
+
+    def finish_source(self, source_id: str, elapsed_sec: float, today: datetime.date = None):
+        run = self._run.pop(source_id, Counter())
+        failed = bool(run["source_fail"]) or (run["item_fail"] > 0 and run["item_ok"] == 0)
+        today = today or datetime.datetime.now(KST).date()
+
+        s = self.sources.setdefault(source_id, {})
+        s["runs"] = s.get("runs", 0) + 1
+        s["failed_runs"] = s.get("failed_runs", 0) + int(failed)
+        s["items_ok"] = s.get("items_ok", 0) + run["item_ok"]
+        s["items_fail"] = s.get("items_fail", 0) + run["item_fail"]
+        s["latency"] = _ewma(s.get("latency"), elapsed_sec)
+        s["last_run"] = today.isoformat()
+
+        if failed:
+            if s.get("last_failed") == today.isoformat():
+                return  # this day already counts as failed
+            s["last_failed"] = today.isoformat()
+            s["consecutive_failed_runs"] = s.get("consecutive_failed_runs", 0) + 1
+            excess = s["consecutive_failed_runs"] - HEALTH_SOURCE_FAIL_RUNS
+            if excess >= 0:
+                days = min(2 ** excess, HEALTH_SOURCE_MAX_BACKOFF_DAYS)
+                s["skip_until"] = (today + datetime.timedelta(days=days)).isoformat()
+        else:
+            s["consecutive_failed_runs"] = 0
+            s["skip_until"] = ""
+            s["last_ok"] = today.isoformat()
+
+    def summary(self, source_id: str) -> str:
+        """One-line status for the CONF_Sources Health column."""
+        s = self.sources.get(source_id)
+        if not s or not s.get("runs"):
+            return ""
+        if s.get("skip_until"):
+            status = f"BACKOFF until {s['skip_until']}"
+        elif s.get("consecutive_failed_runs"):
+            status = f"FAILING x{s['consecutive_failed_runs']}"
+        else:
+            status = "OK"
+        items = s.get("items_ok", 0) + s.get("items_fail", 0)
+        item_rate = f"{s.get('items_ok', 0) / items:.0%}" if items else "-"
+        return (
+            f"{status} | runs {s['runs'] - s.get('failed_runs', 0)}/{s['runs']} ok"
+            f" | items {item_rate} | {s.get('latency') or 0:.1f}s | last ok {s.get('last_ok', '-')}"
+        )
+
+    def summaries(self) -> dict[str, str]:
+        return {sid: self.summary(sid) for sid in self.sources}
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+            self.hosts = state.get("hosts", {})
+            self.sources = state.get("sources", {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable health state {self.state_file}: {e}")
+        self._half_open = {h for h, st in self.hosts.items() if st.get("consecutive_fail", 0) >= HEALTH_BREAKER_THRESHOLD}
+
+    def save(self):
+        if not self.state_file:
+            return
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"hosts": self.hosts, "sources": self.sources}, f, ensure_ascii=False)
+        os.replace(tmp, self.state_file)
@@ -0,0 +1,137 @@
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+# Tags whose content is never text
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+# Block elements: a paragraph break (blank line) or a line break around them
+PARAGRAPH_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "table", "ul", "ol", "figure", "hr"}
+LINE_TAGS = {"br", "li", "tr", "div", "section", "article", "header", "footer", "figcaption", "dt", "dd", "td", "th"}
+
+FEED_CHUNK_CHARS = 8192
+# Bodies up to this size, or any size without a budget, go through the legacy regex
+# pipeline: it is 3-4x faster than html.parser, which only wins once a Max_Length budget
+# lets it stop early on a large body (crossover ~48 KB with a 4000-char budget)
+FAST_PATH_MAX_CHARS = 65536
+
+_PRE_OPEN = re.compile(r'<pre\b', re.I)
+# The original core.utils.strip_html, precompiled. Its output is what the content hashes of
+# existing DATA_Raw rows were taken from, so it must stay byte-identical
+_LEGACY_SCRIPT = re.compile(r'<script[\s\S]*?</script>', re.I)
+_LEGACY_STYLE = re.compile(r'<style[\s\S]*?</style>', re.I)
+_LEGACY_TAG = re.compile(r'<[^>]+>')
+_LEGACY_SPACE = re.compile(r'\s+')
+
+class _Budget(Exception):
+    pass
+
+class _TextExtractor(HTMLParser):
+    def __init__(self, max_chars: Optional[int]):
+        # convert_charrefs decodes every named and numeric entity (&hellip;, &#8217;, &#54620;...)
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: list[str] = []
+        self.length = 0
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.pending_break = 0   # 0, 1 (newline) or 2 (blank line) before the next text
+        self.pending_space = False
+
+    def _block(self, tag: str):
+        if tag in PARAGRAPH_TAGS:
+            self.pending_break = 2
+        elif tag in LINE_TAGS and self.pending_break < 1:
+            self.pending_break = 1
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag == "pre":
+            self.pre_depth += 1
+        self._block(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in SKIP_TAGS:
+            self._block(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag == "pre":
+            self.pre_depth = max(0, self.pre_depth - 1)
+        self._block(tag)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.pre_depth:
+            text = data.strip("\n")
+            leading_ws = trailing_ws = False
+        else:
+            words = data.split()
+            if not words:
+                self.pending_space = self.pending_space or bool(data)
+                return
+            text = " ".join(words)
+            leading_ws = data[0].isspace()
+            trailing_ws = data[-1].isspace()
+        if not text:
+            return
+
+        if self.parts:
+            if self.pending_break:
+                self._emit("\n" * self.pending_break)
+            elif self.pending_space or leading_ws:
+                self._emit(" ")
+        self.pending_break = 0
+        self.pending_space = trailing_ws
+        self._emit(text)
+
+    def _emit(self, s: str):
+        self.parts.append(s)
+        self.length += len(s)
+        if self.max_chars is not None and self.length > self.max_chars:
+            raise _Budget()
+
+def _legacy_to_text(html: str) -> str:
+    """script/style blocks and tags become spaces, six common entities are decoded and
+    whitespace collapses to single spaces: one line, exactly as strip_html always did."""
+    text = _LEGACY_SCRIPT.sub(' ', html)
+    text = _LEGACY_STYLE.sub(' ', text)
+    text = _LEGACY_TAG.sub(' ', text)
+    text = text.replace('&nbsp;', ' ')\
+               .replace('&amp;', '&')\
+               .replace('&lt;', '<')\
+               .replace('&gt;', '>')\
+               .replace('&#39;', "'")\
+               .replace('&quot;', '"')
+    return _LEGACY_SPACE.sub(' ', text).strip()
+
+def html_to_text(html: str, max_chars: Optional[int] = None) -> str:
+    """
+    Visible text of an HTML fragment.
+
+    Typical feed bodies go through the legacy regex pipeline (_legacy_to_text), so their
+    text, and the content hash stored for them, is the same as before. Two kinds of body
+    are parsed with html.parser instead, which decodes every entity and keeps paragraph
+    breaks: bodies with <pre>, whose text is kept verbatim, and bodies larger than
+    FAST_PATH_MAX_CHARS when max_chars is given, where parsing stops as soon as the output
+    is longer than max_chars. Either way a result longer than max_chars tells callers the
+    text was cut.
+    """
+    if not html:
+        return ""
+    html = str(html)
+    oversized = max_chars is not None and len(html) > FAST_PATH_MAX_CHARS
+    if not oversized and not _PRE_OPEN.search(html):
+        return _legacy_to_text(html)
+    parser = _TextExtractor(max_chars)
+    try:
+        for i in range(0, len(html), FEED_CHUNK_CHARS):
+            parser.feed(html[i:i + FEED_CHUNK_CHARS])
+        parser.close()
+    except _Budget:
+        pass
+    return "".join(parser.parts).strip()
@@ -1,46 +1,224 @@
 import aiohttp
 import asyncio
-from typing import Optional
+import codecs
+import logging
+import time
+from collections import Counter
+from typing import Optional, Union
 
-from config import JINA_API_KEY, JINA_TIMEOUT_SEC, JINA_DELAY_MS
-from core.utils import ensure_https
+from config import (
+    JINA_API_KEYS, JINA_TIMEOUT_SEC, JINA_DELAY_MS,
+    JINA_STREAM_HEADROOM_RATIO, JINA_STREAM_HEADROOM_CHARS,
+    JINA_STREAM_CHUNK_BYTES, JINA_MAX_RESPONSE_BYTES,
+    JINA_KEY_CONCURRENCY, JINA_KEY_RPM, JINA_ANON_RPM,
+    JINA_KEY_COOLDOWN_SEC, JINA_KEY_QUOTA_COOLDOWN_SEC
+)
+from core.utils import ensure_https, get_host
+from core.health import CircuitOpenError
+from core.rate_limit import TokenBucket
 
-class JinaClient:
-    def __init__(self, api_key: str = JINA_API_KEY):
+logger = logging.getLogger("JinaClient")
+
+def stream_budget(max_length: int) -> int:
+    """Number of decoded characters worth reading for a source with the given Max_Length."""
+    return int(max_length) * JINA_STREAM_HEADROOM_RATIO + JINA_STREAM_HEADROOM_CHARS
+
+class _KeyRejected(Exception):
+    """429 / 402 on one key: the request can be retried on another."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"[JINA_HTTP_{status}] {body[:250]}")
+        self.status = status
+
+class _KeySetAside(Exception):
+    """The key was set aside while this request waited for it: pick another."""
+
+class JinaKey:
+    """One API key (or the anonymous tier) with its own concurrency, rate budget and usage."""
+
+    def __init__(self, api_key: str, concurrency: int = JINA_KEY_CONCURRENCY, rpm: Optional[float] = None):
         self.api_key = api_key
-        # Limit concurrent Jina requests to avoid hammering the API
-        self.semaphore = asyncio.Semaphore(5)
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        rpm = rpm or (JINA_KEY_RPM if api_key else JINA_ANON_RPM)
+        self.bucket = TokenBucket(rpm, burst=concurrency)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.usage = Counter()
+
+    @property
+    def label(self) -> str:
+        return f"...{self.api_key[-4:]}" if self.api_key else "anonymous"
 
-    async def read_markdown(self, url: str, session: aiohttp.ClientSession, no_cache: bool = True, with_links_summary: bool = False, timeout_sec: int = JINA_TIMEOUT_SEC) -> str:
+    def load(self) -> float:
+        return self.in_flight / self.concurrency
+
+class JinaClient:
+    def __init__(self, api_keys: Union[list[str], str, None] = None, health=None):
+        if api_keys is None:
+            api_keys = JINA_API_KEYS
+        elif isinstance(api_keys, str):
+            api_keys = [api_keys] if api_keys else []
+        # No key at all still works, on the anonymous rate limit
+        self.keys = [JinaKey(k) for k in api_keys] or [JinaKey("")]
+        self.health = health  # optional HealthTracker: per-target-host stats and circuit breaker
+
+    @property
+    def max_connections(self) -> int:
+        """Concurrent requests the whole pool can have in flight; Transport sizes the jina connector with it."""
+        return sum(key.concurrency for key in self.keys)
+
+    async def read_markdown(self, url: str, session: aiohttp.ClientSession, no_cache: bool = True, with_links_summary: bool = False, timeout_sec: int = JINA_TIMEOUT_SEC, max_length: Optional[int] = None) -> str:
         """
         Reads a URL using Jina Reader and returns Markdown string asynchronously.
+
+        If max_length is given, the body is decoded incrementally and reading stops once
+        stream_budget(max_length) characters are available. Callers still apply their own
+        Max_Length cut after cleaning. Every read is capped at JINA_MAX_RESPONSE_BYTES.
+
+        The request goes to the least-loaded key; a key answering 429 or 402 is set aside
+        for a while and the request is retried on the next key.
         """
+        host = get_host(ensure_https(url))
+        self._check_circuit(host)
+
         await asyncio.sleep(JINA_DELAY_MS / 1000.0) # Respect delay per Jina guidelines
-        
+
         final_url = f"https://r.jina.ai/{ensure_https(url)}"
-        
+
         headers = {
             "User-Agent": "Mozilla/5.0 (Python Async Jina Reader)",
             "x-respond-with": "markdown",
             "x-timeout": str(timeout_sec)
         }
-        
+
         if no_cache:
             headers["x-no-cache"] = "true"
         if with_links_summary:
             headers["X-With-Links-Summary"] = "true"
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
 
         timeout = aiohttp.ClientTimeout(total=timeout_sec + 5) # add buffer for network wait
+        max_chars = stream_budget(max_length) if max_length else None
+
+        tried = []
+        while True:
+            key = await self._pick_key(tried, timeout_sec)
+            try:
+                return await self._read_with_key(key, session, final_url, headers, timeout, max_chars, url, host)
+            except _KeySetAside:
+                continue
+            except _KeyRejected as e:
+                tried.append(key)
+                if len(tried) >= len(self.keys):
+                    raise Exception(f"Jina Request Failed for {url}: {str(e)}")
+
+    async def _pick_key(self, exclude: list, timeout_sec: float) -> JinaKey:
+        """Least-loaded key that isn't set aside, waiting for a cooldown to end if needed."""
+        while True:
+            now = time.monotonic()
+            candidates = [k for k in self.keys if k not in exclude]
+            ready = [k for k in candidates if k.cooldown_until <= now]
+            if ready:
+                key = min(ready, key=lambda k: (k.load(), k.usage["requests"]))
+                key.in_flight += 1  # counted before any await so concurrent picks spread out
+                return key
+            wait = min(k.cooldown_until for k in candidates) - now
+            if wait > timeout_sec:
+                raise Exception(f"All Jina keys are set aside for at least {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    async def _read_with_key(self, key: JinaKey, session, final_url, headers, timeout, max_chars, url, host) -> str:
+        try:
+            async with key.semaphore:
+                await key.bucket.acquire()
+                if key.cooldown_until > time.monotonic():
+                    raise _KeySetAside()
+                # The breaker may have tripped while this task waited for a slot
+                self._check_circuit(host)
+                if key.api_key:
+                    headers = dict(headers, Authorization=f"Bearer {key.api_key}")
+                key.usage["requests"] += 1
+                started = time.monotonic()
+                try:
+                    async with session.get(final_url, headers=headers, timeout=timeout) as response:
+                        if response.status in (429, 402):
+                            body = await self._read_body(response, max_chars=250)
+                            self._set_aside(key, response.status, response.headers.get("Retry-After"))
+                            raise _KeyRejected(response.status, body)
+                        if response.status != 200:
+                            text = await self._read_body(response, max_chars=250)
+                            raise Exception(f"[JINA_HTTP_{response.status}] {text[:250]}")
+                        text = await self._read_body(response, max_chars=max_chars, url=url)
+                except _KeyRejected:
+                    # A key problem, not the target host's
+                    raise
+                except Exception as e:
+                    key.usage["failed"] += 1
+                    if self.health:
+                        self.health.record_host(host, False, time.monotonic() - started, str(e) or type(e).__name__)
+                    # Log or re-raise
+                    raise Exception(f"Jina Request Failed for {url}: {str(e)}")
+                key.usage["ok"] += 1
+                key.usage["chars"] += len(text)
+                if self.health:
+                    self.health.record_host(host, True, time.monotonic() - started)
+                return text
+        finally:
+            key.in_flight -= 1
 
-        async with self.semaphore:
+    def _set_aside(self, key: JinaKey, status: int, retry_after: Optional[str] = None):
+        if status == 402:
+            cooldown = JINA_KEY_QUOTA_COOLDOWN_SEC
+            key.usage["quota_exhausted"] += 1
+        else:
             try:
-                async with session.get(final_url, headers=headers, timeout=timeout) as response:
-                    text = await response.text()
-                    if response.status != 200:
-                        raise Exception(f"[JINA_HTTP_{response.status}] {text[:250]}")
-                    return text
-            except Exception as e:
-                # Log or re-raise
-                raise Exception(f"Jina Request Failed for {url}: {str(e)}")
+                cooldown = float(retry_after) if retry_after else JINA_KEY_COOLDOWN_SEC
+            except ValueError:
+                cooldown = JINA_KEY_COOLDOWN_SEC
+            key.usage["rate_limited"] += 1
+        key.cooldown_until = max(key.cooldown_until, time.monotonic() + cooldown)
+        key.bucket.drain()
+        logger.warning(f"Jina key {key.label} got HTTP {status}, set aside for {cooldown:.0f}s")
+
+    def summary(self) -> str:
+        """Per-key usage for this run."""
+        parts = []
+        for k in self.keys:
+            u = k.usage
+            extra = "".join(f", {name} {u[name]}" for name in ("rate_limited", "quota_exhausted") if u[name])
+            parts.append(f"{k.label}: {u['requests']} requests ({u['ok']} ok, {u['failed']} failed{extra}), {u['chars'] // 1000}k chars")
+        return "; ".join(parts)
+
+    def _check_circuit(self, host: str):
+        if self.health and not self.health.allow(host):
+            raise CircuitOpenError(f"Circuit open for {host}: {self.health.tripped.get(host, '')}")
+
+    async def _read_body(self, response: aiohttp.ClientResponse, max_chars: Optional[int] = None, url: str = "") -> str:
+        """
+        Decodes the response body chunk by chunk, stopping at max_chars decoded characters
+        or JINA_MAX_RESPONSE_BYTES raw bytes, whichever comes first.
+        """
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+        parts = []
+        n_chars = 0
+        n_bytes = 0
+
+        async for chunk in response.content.iter_chunked(JINA_STREAM_CHUNK_BYTES):
+            if n_bytes + len(chunk) > JINA_MAX_RESPONSE_BYTES:
+                chunk = chunk[:JINA_MAX_RESPONSE_BYTES - n_bytes]
+                parts.append(decoder.decode(chunk))
+                logger.warning(f"Jina response for {url} exceeded {JINA_MAX_RESPONSE_BYTES} bytes, truncated")
+                break
+            n_bytes += len(chunk)
+            piece = decoder.decode(chunk)
+            parts.append(piece)
+            n_chars += len(piece)
+            if max_chars is not None and n_chars >= max_chars:
+                break
+        else:
+            parts.append(decoder.decode(b"", final=True))
+
+        text = "".join(parts)
+        if max_chars is not None:
+            text = text[:max_chars]
+        return text
@@ -0,0 +1,168 @@
+import re
+from typing import NamedTuple, Optional
+
+# One alternation scanned left to right: markdown links and bare URLs. The leading [\[h]
+# class lets the regex engine skip ahead to candidate characters, which a plain alternation
+# of two groups does not. TOKEN_PATTERN adds a zero-width "# Heading" alternative (so a
+# heading's own links are still seen); once the first heading is found the scan continues
+# with LINK_TOKEN_PATTERN, so later line starts cost nothing.
+_LINK_TOKEN = (
+    r'[\[h](?:(?<=\[)(?P<text>[^\]]+)\]\((?P<url>https?://[^\s<>()\]]+)[^\)]*\)'
+    r'|(?<=h)(?P<bare>ttps?://[^\s<>()\]]+))'
+)
+LINK_TOKEN_PATTERN = re.compile(_LINK_TOKEN)
+TOKEN_PATTERN = re.compile(_LINK_TOKEN + r'|^(?=#\s+(?P<h1>.+)$)', re.MULTILINE)
+MD_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((https?://[^\s<>()\]]+)[^\)]*\)')
+BARE_URL_PATTERN = re.compile(r'https?://[^\s<>()\]]+')
+H1_PATTERN = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+HEAD_DATE_PATTERN = re.compile(r'\b(20[2-9][0-9][.\-][0-1][0-9][.\-][0-3][0-9])\b|\b([A-Z][a-z]{2}\s\d{1,2},?\s\d{4})\b')
+
+_SKIP_TITLE_PREFIXES = ("read more", "click", "here", "link")
+_URL_TRAILING = "),.]"
+
+class Link(NamedTuple):
+    url: str      # trailing ")", ",", ".", "]" stripped, as in the old extract_links
+    text: str     # anchor text, "" for bare URLs
+    start: int    # span of the markdown link / bare URL in the scanned text
+    end: int
+
+def _skip_title(title: str) -> bool:
+    return title.startswith("![") or title.lower().startswith(_SKIP_TITLE_PREFIXES)
+
+class MdScan:
+    """
+    Result of scan_markdown(). link_map matches the old extract_links exactly: titled
+    markdown links first (longest anchor text wins, "read more"/image anchors ignored), then
+    every other URL with "" in order of first appearance.
+    """
+
+    def __init__(self, text: str, titled: dict, bare: dict, h1: Optional[str], head_chars: int):
+        self.text = text
+        self.titled = titled    # url -> Link with the longest usable anchor text
+        self.bare = bare        # url -> first Link (any kind) at which the URL appeared
+        self._h1 = h1
+        self._head_chars = head_chars
+
+    @property
+    def link_map(self) -> dict:
+        out = {url: link.text for url, link in self.titled.items()}
+        for url in self.bare:
+            if url not in out:
+                out[url] = ""
+        return out
+
+    def links(self) -> list[Link]:
+        """One Link per URL, in link_map order, with anchor text when there is one."""
+        return list(self.titled.values()) + [link for url, link in self.bare.items() if url not in self.titled]
+
+    def context(self, link: Link, width: int = 120) -> str:
+        """Text around a link, e.g. the date or teaser next to it on a list page."""
+        return self.text[max(0, link.start - width):link.end + width]
+
+    @property
+    def title(self) -> str:
+        """Same result as extract_title_from_md, without rescanning when a "# " heading exists."""
+        if self._h1:
+            cleaned = self._h1.strip()
+            if cleaned and not cleaned.lower().startswith("warning: target url returned"):
+                return cleaned
+        from core.utils import extract_title_from_md
+        return extract_title_from_md(self.text)
+
+    def head_dates(self) -> list[str]:
+        """Date-like strings (2024-05-01, 2024.05.01, May 1, 2024) in the head of the document."""
+        return [a or b for a, b in HEAD_DATE_PATTERN.findall(self.text, 0, self._head_chars)]
+
+def scan_markdown(text: str, head_chars: int = 2000) -> MdScan:
+    """Single left-to-right pass over Jina markdown collecting links and the first heading."""
+    s = str(text or "")
+    titled: dict[str, Link] = {}
+    bare: dict[str, Link] = {}
+    h1 = None
+
+    def add_bare(url, start, end):
+        url = url.rstrip(_URL_TRAILING)
+        if url not in bare:
+            bare[url] = Link(url, "", start, end)
+
+    def add_bare_in(start, end):
+        for b in BARE_URL_PATTERN.finditer(s, start, end):
+            add_bare(b.group(0), b.start(), b.end())
+
+    def add_md(m, text_group, url_group, bare_from):
+        nonlocal h1
+        # Every URL inside the link (anchor text, target, title attribute) is also a bare URL;
+        # the target matches exactly what a bare scan would find at that position
+        url_start, url_end = m.span(url_group)
+        if bare_from > url_start:
+            add_bare_in(bare_from, m.end())
+        else:
+            if "://" in m.group(text_group) and bare_from < url_start:
+                add_bare_in(max(m.start(), bare_from), url_start)
+            add_bare(m.group(url_group), url_start, url_end)
+            if url_end + 1 < m.end():
+                add_bare_in(url_end, m.end())
+
+        title = m.group(text_group).strip()
+        if not _skip_title(title):
+            url = m.group(url_group).rstrip(_URL_TRAILING)
+            prev = titled.get(url)
+            if prev is None or len(title) > len(prev.text):
+                titled[url] = Link(url, title, m.start(), m.end())
+
+        # A link may span lines and hide a heading from the main scan
+        if h1 is None and "\n" in m.group(0):
+            hm = H1_PATTERN.search(s, m.start())
+            if hm and hm.start() < m.end():
+                h1 = hm.group(1)
+
+    pattern = TOKEN_PATTERN
+    pos = 0
+    skip_until = 0
+    while pattern is not None:
+        current, pattern = pattern, None
+        for m in current.finditer(s, pos):
+            start = m.start()
+            if start < skip_until:
+                continue  # inside a markdown link already handled below
+            kind = m.lastgroup
+            if kind == "url":
+                # Inlined add_md(m, "text", "url", start): the common case on list pages
+                md, link_text, url = m.group(0, "text", "url")
+                url_start, url_end = m.span("url")
+                end = start + len(md)
+                if "://" in link_text:
+                    add_bare_in(start, url_start)
+                key = url.rstrip(_URL_TRAILING)
+                if key not in bare:
+                    bare[key] = Link(key, "", url_start, url_end)
+                if url_end + 1 < end:
+                    add_bare_in(url_end, end)
+                title = link_text.strip()
+                if not _skip_title(title):
+                    prev = titled.get(key)
+                    if prev is None or len(title) > len(prev.text):
+                        titled[key] = Link(key, title, start, end)
+                if h1 is None and "\n" in md:
+                    hm = H1_PATTERN.search(s, start)
+                    if hm and hm.start() < end:
+                        h1 = hm.group(1)
+            elif kind == "bare":
+                url_text = m.group(0)
+                add_bare(url_text, start, m.end())
+                # A bare URL can run into a "[" that opens a markdown link; the link still counts
+                b = url_text.find("[")
+                while b >= 0:
+                    lm = MD_LINK_PATTERN.match(s, start + b)
+                    if lm:
+                        add_md(lm, 1, 2, m.end())
+                        skip_until = lm.end()
+                        break
+                    b = url_text.find("[", b + 1)
+            elif h1 is None:
+                h1 = m.group("h1")
+            if h1 is not None and current is TOKEN_PATTERN:
+                # Heading found: scan the rest without the per-line lookahead
+                pattern, pos = LINK_TOKEN_PATTERN, (start + 1 if kind == "h1" else max(m.end(), skip_until))
+                break
+    return MdScan(s, titled, bare, h1, head_chars)
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from config import (
+    DAEMON_MIN_INTERVAL_MIN, DAEMON_MAX_INTERVAL_MIN, DAEMON_DEFAULT_INTERVAL_MIN,
+    DAEMON_TARGET_ITEMS_PER_POLL, DAEMON_RATE_ALPHA
+)
+
+logger = logging.getLogger("PollSchedule")
+
+class SourceSchedule:
+    """Polling state for one source: an EWMA of new items per hour drives the interval."""
+
+    def __init__(self, source_id: str, interval_sec: float, rate_per_hour: Optional[float] = None, next_run: float = 0.0):
+        self.source_id = source_id
+        self.interval_sec = interval_sec
+        self.rate_per_hour = rate_per_hour  # None until the first observation
+        self.next_run = next_run
+        self.last_run = 0.0
+
+    def record(self, new_items: int, now: float):
+        if self.last_run:
+            hours = max((now - self.last_run) / 3600.0, 1e-3)
+            observed = new_items / hours
+            if self.rate_per_hour is None:
+                self.rate_per_hour = observed
+            else:
+                self.rate_per_hour = DAEMON_RATE_ALPHA * observed + (1 - DAEMON_RATE_ALPHA) * self.rate_per_hour
+
+        lo, hi = DAEMON_MIN_INTERVAL_MIN * 60, DAEMON_MAX_INTERVAL_MIN * 60
+        if self.rate_per_hour:
+            # Poll roughly once per DAEMON_TARGET_ITEMS_PER_POLL expected new items
+            interval = DAEMON_TARGET_ITEMS_PER_POLL / self.rate_per_hour * 3600.0
+        elif self.rate_per_hour is None:
+            # First poll: no rate to learn from yet
+            interval = self.interval_sec
+        else:
+            # Nothing published lately: back off geometrically
+            interval = self.interval_sec * 1.5
+        self.interval_sec = min(max(interval, lo), hi)
+        self.last_run = now
+        self.next_run = now + self.interval_sec
+
+class PollScheduler:
+    """
+    Per-source adaptive schedule for daemon mode. State is persisted to a JSON file so
+    a restarted daemon keeps each source's learned publish rate.
+    """
+
+    def __init__(self, state_file: str = ""):
+        self.state_file = state_file
+        self.schedules: dict[str, SourceSchedule] = {}
+        self._load()
+
+    def sync(self, source_ids: list[str]):
+        """Adds newly activated sources (due immediately) and drops deactivated ones."""
+        for sid in source_ids:
+            if sid not in self.schedules:
+                self.schedules[sid] = SourceSchedule(sid, DAEMON_DEFAULT_INTERVAL_MIN * 60)
+        for sid in list(self.schedules):
+            if sid not in source_ids:
+                del self.schedules[sid]
+
+    def due(self, now: float = None) -> list[str]:
+        now = time.time() if now is None else now
+        ready = [s for s in self.schedules.values() if s.next_run <= now]
+        return [s.source_id for s in sorted(ready, key=lambda s: s.next_run)]
+
+    def seconds_until_next(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        if not self.schedules:
+            return DAEMON_DEFAULT_INTERVAL_MIN * 60
+        return max(min(s.next_run for s in self.schedules.values()) - now, 0.0)
+
+    def record(self, source_id: str, new_items: int, now: float = None):
+        now = time.time() if now is None else now
+        sched = self.schedules.get(source_id)
+        if not sched:
+            return
+        sched.record(new_items, now)
+        rate = f"{sched.rate_per_hour:.2f}/h" if sched.rate_per_hour is not None else "n/a"
+        logger.info(f"{source_id}: {new_items} new, rate {rate}, next poll in {sched.interval_sec / 60:.0f} min")
+        self._save()
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                for sid, st in json.load(f).items():
+                    self.schedules[sid] = SourceSchedule(sid, st["interval_sec"], st.get("rate_per_hour"), st.get("next_run", 0.0))
+                    self.schedules[sid].last_run = st.get("last_run", 0.0)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable poll state {self.state_file}: {e}")
+
+    def _save(self):
+        if not self.state_file:
+            return
+        state = {
+            sid: {"interval_sec": s.interval_sec, "rate_per_hour": s.rate_per_hour,
+                  "next_run": s.next_run, "last_run": s.last_run}
+            for sid, s in self.schedules.items()
+        }
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
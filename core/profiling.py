@@ -0,0 +1,132 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger("Profiler")
+
+# Innermost frame of the event loop blocking on its selector: samples ending here are await time
+_IDLE_FUNCS = {"selectors:select"}
+
+def _safe_name(source_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", source_id) or "source"
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval_sec: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval_sec = interval_sec
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class SourceProfiler:
+    """
+    Profiles each crawler.crawl() call (main.py --profile). Per source it writes
+    <Source_ID>.pstats (cProfile, deterministic) and <Source_ID>.collapsed (sampled stacks,
+    flamegraph.pl / speedscope format), records wall vs CPU time, and report() writes the
+    hottest functions over the whole run to report.txt. Sources must run one at a time, as in batch mode,
+    since cProfile sees every task on the loop while it is enabled; for the same reason
+    main.py does not prefetch listings under --profile.
+    """
+
+    def __init__(self, out_dir: str = "profiles", sample_interval_ms: float = 5.0, top_n: int = 25):
+        self.out_dir = out_dir
+        self.sample_interval_sec = sample_interval_ms / 1000.0
+        self.top_n = top_n
+        self.timings: list[tuple[str, float, float, float]] = []  # (source_id, wall, cpu, idle share)
+        self.stats: pstats.Stats | None = None
+        self.stacks = Counter()
+        os.makedirs(out_dir, exist_ok=True)
+
+    @asynccontextmanager
+    async def profile(self, source_id: str):
+        prof = cProfile.Profile()
+        sampler = _StackSampler(threading.get_ident(), self.sample_interval_sec)
+        # A short GIL switch interval lets the sampler interrupt CPU-bound stretches instead
+        # of only catching the loop when it releases the GIL in select()
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, self.sample_interval_sec / 10))
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        sampler.start()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            sampler.stop()
+            sys.setswitchinterval(switch_interval)
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            self._collect(source_id, prof, sampler.stacks, wall, cpu)
+
+    def _collect(self, source_id: str, prof: cProfile.Profile, stacks: Counter, wall: float, cpu: float):
+        name = _safe_name(source_id)
+        prof.dump_stats(os.path.join(self.out_dir, f"{name}.pstats"))
+        with open(os.path.join(self.out_dir, f"{name}.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        samples = sum(stacks.values())
+        idle = sum(c for stack, c in stacks.items() if stack.rsplit(";", 1)[-1] in _IDLE_FUNCS)
+        idle_share = idle / samples if samples else 0.0
+        self.timings.append((source_id, wall, cpu, idle_share))
+        self.stacks.update({f"{name};{stack}": c for stack, c in stacks.items()})
+
+        stats = pstats.Stats(prof)
+        if self.stats is None:
+            self.stats = stats
+        else:
+            self.stats.add(stats)
+        logger.info(f"{source_id}: wall {wall:.2f}s, cpu {cpu:.2f}s, awaiting I/O {idle_share:.0%} of samples")
+
+    def report(self) -> str:
+        """Writes the merged profile, collapsed stacks and report.txt, and returns the summary tables."""
+        if self.stats is None:
+            return "No sources profiled."
+        self.stats.dump_stats(os.path.join(self.out_dir, "all.pstats"))
+        with open(os.path.join(self.out_dir, "all.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        lines = [f"{'Source_ID':<28} {'wall s':>8} {'cpu s':>8} {'await':>6}"]
+        for source_id, wall, cpu, idle_share in sorted(self.timings, key=lambda t: -t[1]):
+            lines.append(f"{source_id[:28]:<28} {wall:>8.2f} {cpu:>8.2f} {idle_share:>6.0%}")
+
+        buf = io.StringIO()
+        self.stats.stream = buf
+        self.stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+        lines.append("")
+        lines.append(f"Hottest functions by own time (top {self.top_n}):")
+        lines.append(buf.getvalue().split("\n", 1)[-1].strip("\n"))
+        lines.append(f"Profiles written to {self.out_dir}/ (*.pstats for snakeviz/pstats, *.collapsed for flamegraph.pl/speedscope)")
+        report = "\n".join(lines)
+        with open(os.path.join(self.out_dir, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        return report
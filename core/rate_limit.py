@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """Refills rate_per_min tokens per minute, holding at most burst."""
+
+    def __init__(self, rate_per_min: float, burst: int):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """Takes one token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def drain(self):
+        """Empties the bucket, e.g. after a 429, so the next call waits a full refill interval."""
+        self.tokens = 0.0
+        self.updated = time.monotonic()
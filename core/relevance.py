@@ -0,0 +1,199 @@
+import os
+import re
+import unicodedata
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+from config import RELEVANCE_KEYWORDS_FILE
+
+logger = logging.getLogger("Relevance")
+
+# Keyword syntax:
+#   "llm"                  single token, exact
+#   "prompt*"              single token, prefix ("prompts", "prompting")
+#   "machine learning"     phrase, tokens must be adjacent
+#   "fine tun*"            phrase whose last token is a prefix
+# Multi-token phrases also match their concatenated form ("open source" -> "opensource").
+# Weights: AI/ML terms count double so scores rank AI stories first; any single match
+# still clears the default Min_Relevance of 1.
+AI_WEIGHT = 2.0
+DEFAULT_KEYWORDS = [(k, AI_WEIGHT) for k in [
+    # AI / ML
+    "ai", "artificial intelligence", "machine learning", "ml",
+    "deep learning", "neural net*", "transformer*", "llm", "gpt",
+    "chatgpt", "openai", "anthropic", "claude", "gemini",
+    "gemma", "llama", "mistral", "diffusion", "stable diffusion",
+    "agent", "agentic", "rag", "fine tun*", "prompt*", "embedding*",
+    "vector db", "vector database", "vector store", "vector search", "nlp", "computer vision",
+    "reinforcement learning", "rlhf", "dpo",
+    "robot*", "autonomous", "self driving",
+    "generative", "generation", "foundation model", "open source model",
+    "multimodal", "speech*", "tts", "stt", "ocr",
+    "image gen*", "video gen*", "text to*",
+]] + [(k, 1.0) for k in [
+    # Software Engineering / Dev
+    "python", "rust", "typescript", "javascript",
+    "golang", "kubernetes", "docker", "wasm",
+    "api", "sdk", "open source", "github",
+    "compiler", "kernel", "linux",
+    "cloud", "aws", "gcp", "azure",
+    "database", "postgres*", "sqlite", "redis",
+    "gpu", "nvidia", "cuda", "tpu",
+    "serverless", "edge comput*",
+    # Tech Industry / Startups
+    "startup", "funding", "series a", "series b", "series c", "series d", "ipo",
+    "google", "meta", "microsoft", "apple", "amazon",
+    "deepseek", "deep mind", "hugging face",
+    # Data / Security / Infra
+    "cyber*", "security", "privacy", "encrypt*",
+    "data science", "data engineer", "data pipeline", "mlops",
+    "scale", "scaling", "scalability", "performance", "benchmark",
+]]
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+def tokenize(text: str) -> list[str]:
+    """NFKC-normalizes, lowercases and splits on anything that is not a letter or digit."""
+    s = str(text or "")
+    if not s.isascii():
+        s = unicodedata.normalize("NFKC", s)
+    return _TOKEN_RE.findall(s.lower())
+
+class RelevanceResult(NamedTuple):
+    score: float
+    matched: list[str]
+
+class _Term(NamedTuple):
+    keyword: str
+    parts: tuple
+    prefix: bool
+    weight: float
+
+class RelevanceEngine:
+    """
+    Hashed token-set matcher. Every term is indexed by its first token (or by the prefix
+    itself for single-token prefix terms), so scoring a title costs one dict lookup per
+    token plus one per distinct prefix length.
+    """
+
+    def __init__(self, keywords: Iterable[tuple[str, float]]):
+        self.exact: dict[str, list[_Term]] = {}
+        self.prefix: dict[str, list[_Term]] = {}
+        self.prefix_lens: list[int] = []
+        self.size = 0
+
+        for keyword, weight in keywords:
+            keyword = str(keyword).strip().lower()
+            if not keyword:
+                continue
+            is_prefix = keyword.endswith("*")
+            parts = tuple(tokenize(keyword.rstrip("*")))
+            if not parts:
+                continue
+            self.size += 1
+            variants = [parts]
+            if len(parts) > 1:
+                variants.append(("".join(parts),))
+            for v in variants:
+                term = _Term(keyword, v, is_prefix, float(weight))
+                if len(v) == 1 and is_prefix:
+                    self.prefix.setdefault(v[0], []).append(term)
+                else:
+                    self.exact.setdefault(v[0], []).append(term)
+
+        self.prefix_lens = sorted({len(p) for p in self.prefix})
+
+    def score(self, text: str) -> RelevanceResult:
+        tokens = tokenize(text)
+        n = len(tokens)
+        matched = {}
+        exact = self.exact
+        prefix = self.prefix
+
+        for i, tok in enumerate(tokens):
+            hits = exact.get(tok)
+            if hits:
+                self._collect(hits, tokens, n, i, matched)
+            for plen in self.prefix_lens:
+                if plen > len(tok):
+                    break
+                hits = prefix.get(tok[:plen])
+                if hits:
+                    self._collect(hits, tokens, n, i, matched)
+
+        return RelevanceResult(sum(matched.values()), list(matched))
+
+    @classmethod
+    def _collect(cls, terms: list[_Term], tokens: list[str], n: int, i: int, matched: dict):
+        for term in terms:
+            if term.keyword not in matched and cls._match_at(tokens, n, i, term):
+                matched[term.keyword] = term.weight
+
+    @staticmethod
+    def _match_at(tokens: list[str], n: int, i: int, term: _Term) -> bool:
+        parts = term.parts
+        k = len(parts)
+        if k == 1:
+            return True  # first token already matched through the index
+        if i + k > n:
+            return False
+        for j in range(1, k - 1):
+            if tokens[i + j] != parts[j]:
+                return False
+        last = tokens[i + k - 1]
+        return last.startswith(parts[-1]) if term.prefix else last == parts[-1]
+
+    @classmethod
+    def default(cls) -> "RelevanceEngine":
+        return cls(DEFAULT_KEYWORDS)
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "RelevanceEngine":
+        """Builds an engine from CONF_Keywords rows (Keyword, Weight, Status)."""
+        keywords = []
+        for r in records:
+            if str(r.get("Status", "active")).strip().lower() not in ("", "active"):
+                continue
+            weight = str(r.get("Weight", "")).strip()
+            keywords.append((r.get("Keyword", ""), float(weight) if weight else 1.0))
+        return cls(keywords)
+
+    @classmethod
+    def from_file(cls, path: str) -> "RelevanceEngine":
+        """
+        Reads one keyword per line, optionally followed by ",weight".
+        Blank lines and lines starting with '#' are ignored.
+        """
+        keywords = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                keyword, _, weight = line.partition(",")
+                keywords.append((keyword, float(weight) if weight.strip() else 1.0))
+        return cls(keywords)
+
+async def load_relevance_engine(gs_manager) -> RelevanceEngine:
+    """CONF_Keywords sheet first, then RELEVANCE_KEYWORDS_FILE, then the built-in list."""
+    try:
+        records = await gs_manager.read_keywords()
+        if records:
+            engine = RelevanceEngine.from_records(records)
+            if engine.size:
+                logger.info(f"Loaded {engine.size} relevance keywords from sheet")
+                return engine
+    except Exception as e:
+        logger.warning(f"Could not read keyword sheet, falling back: {e}")
+
+    if RELEVANCE_KEYWORDS_FILE and os.path.exists(RELEVANCE_KEYWORDS_FILE):
+        engine = RelevanceEngine.from_file(RELEVANCE_KEYWORDS_FILE)
+        logger.info(f"Loaded {engine.size} relevance keywords from {RELEVANCE_KEYWORDS_FILE}")
+        return engine
+
+    return RelevanceEngine.default()
+
+def parse_min_relevance(source: dict, default: Optional[float] = None) -> Optional[float]:
+    """Min_Relevance from CONF_Sources, or default when the column is missing or blank."""
+    raw = str(source.get("Min_Relevance", "")).strip()
+    return float(raw) if raw else default
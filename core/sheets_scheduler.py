@@ -0,0 +1,199 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import random
+import re
+from collections import Counter
+
+import gspread_asyncio
+
+from core.rate_limit import TokenBucket
+from config import (
+    SHEETS_READ_PER_MIN, SHEETS_WRITE_PER_MIN, SHEETS_BUCKET_BURST,
+    SHEETS_BACKOFF_BASE_SEC, SHEETS_BACKOFF_MAX_SEC, SHEETS_MAX_COALESCE_ROWS
+)
+
+logger = logging.getLogger("SheetsScheduler")
+
+# gspread methods that only read; everything else spends a write token
+_READ_METHOD = re.compile(r'^(get|batch_get|row_values|col_values|acell|cell|range|find|findall|worksheet|worksheets|open|open_by_key|fetch_sheet_metadata|list_)')
+
+_current_kind = contextvars.ContextVar("sheets_call_kind", default="read")
+_attempt = contextvars.ContextVar("sheets_call_attempt", default=0)
+
+class QuotaClientManager(gspread_asyncio.AsyncioGspreadClientManager):
+    """
+    Replaces gspread_asyncio's fixed gspread_delay between all calls with separate read and
+    write token buckets sized to the per-user Sheets quota, and retries 429s with truncated
+    exponential backoff plus jitter instead of a fixed 1.1 s sleep.
+    """
+
+    def __init__(self, credentials_fn, read_per_min: float = SHEETS_READ_PER_MIN,
+                 write_per_min: float = SHEETS_WRITE_PER_MIN, burst: int = SHEETS_BUCKET_BURST):
+        super().__init__(credentials_fn, gspread_delay=SHEETS_BACKOFF_BASE_SEC)
+        self.buckets = {
+            "read": TokenBucket(read_per_min, burst),
+            "write": TokenBucket(write_per_min, burst),
+        }
+        self.metrics = Counter()
+
+    async def _call(self, method, *args, **kwargs):
+        # Overrides gspread_asyncio 3.0's _call (pinned in requirements.txt). The token is
+        # taken before the base class's call_lock, so a call waiting for quota does not hold
+        # the lock and stall calls of the other kind, or the other WriteQueue lane
+        kind = "read" if _READ_METHOD.match(getattr(method, "__name__", "")) else "write"
+        await self._spend(kind, kwargs.get("api_call_count", 1))
+        kind_token = _current_kind.set(kind)
+        attempt_token = _attempt.set(0)
+        try:
+            return await super()._call(method, *args, **kwargs)
+        finally:
+            _current_kind.reset(kind_token)
+            _attempt.reset(attempt_token)
+
+    async def _spend(self, kind: str, tokens: int = 1):
+        for _ in range(tokens):
+            waited = await self.buckets[kind].acquire()
+            self.metrics[f"{kind}_calls"] += 1
+            self.metrics[f"{kind}_wait_ms"] += int(waited * 1000)
+
+    async def delay(self):
+        # Called under call_lock before every attempt. The first attempt's token was spent
+        # in _call; a retry after an error spends another one here
+        if _attempt.get():
+            await self._spend(_current_kind.get())
+
+    async def handle_gspread_error(self, e, method, args, kwargs):
+        code = e.response.status_code
+        attempt = _attempt.get()
+        _attempt.set(attempt + 1)
+        if code == 429:
+            kind = _current_kind.get()
+            self.buckets[kind].drain()
+            sleep = min(SHEETS_BACKOFF_BASE_SEC * 2 ** attempt, SHEETS_BACKOFF_MAX_SEC) * random.uniform(0.5, 1.0)
+            self.metrics["rate_limited"] += 1
+            self.metrics["backoff_ms"] += int(sleep * 1000)
+            logger.warning(f"Sheets {kind} quota hit on {method.__name__}, retry {attempt + 1} in {sleep:.1f}s")
+            await asyncio.sleep(sleep)
+            return
+        self.metrics["server_errors"] += 1
+        await super().handle_gspread_error(e, method, args, kwargs)
+
+    def summary(self) -> str:
+        m = self.metrics
+        return (
+            f"reads {m['read_calls']} (waited {m['read_wait_ms'] / 1000:.1f}s), "
+            f"writes {m['write_calls']} (waited {m['write_wait_ms'] / 1000:.1f}s), "
+            f"429s {m['rate_limited']} (backoff {m['backoff_ms'] / 1000:.1f}s), 5xx {m['server_errors']}"
+        )
+
+def row_from_range(response) -> int:
+    """Extracts the first row number from an append response ("DATA_Raw!A12:H14" -> 12)."""
+    try:
+        updated = response["updates"]["updatedRange"]
+    except (KeyError, TypeError):
+        return 0
+    m = re.search(r'![A-Z]+(\d+)', updated)
+    return int(m.group(1)) if m else 0
+
+class WriteQueue:
+    """
+    Serializes Sheets writes through one worker so data upserts (DATA lane) go out before
+    log rows (LOG lane), and appends queued for the same worksheet are sent as one
+    append_rows call. Callers await their own result as if they had made the call directly.
+    """
+
+    # Lanes: lower goes first
+    DATA = 0
+    LOG = 1
+
+    def __init__(self):
+        self._pending: list[tuple] = []  # (lane, seq, op, worksheet, payload, future)
+        self._seq = itertools.count()
+        self._worker: asyncio.Task | None = None
+        self.metrics = Counter()
+
+    def _submit(self, lane: int, op: str, worksheet, payload) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((lane, next(self._seq), op, worksheet, payload, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return future
+
+    async def append_row(self, worksheet, row: list, lane: int = DATA) -> int:
+        """Appends row and returns its 1-based row number (0 if the API didn't report it)."""
+        return await self._submit(lane, "append", worksheet, row)
+
+    async def update(self, worksheet, range_name: str, values: list, lane: int = DATA):
+        return await self._submit(lane, "update", worksheet, (range_name, values))
+
+    async def batch_update(self, worksheet, data: list[dict], lane: int = DATA):
+        """Several ranges of one worksheet ([{"range": "C5", "values": [[...]]}, ...]) in one call."""
+        return await self._submit(lane, "batch_update", worksheet, data)
+
+    async def flush(self):
+        """Waits until everything queued so far has been written."""
+        while self._worker and not self._worker.done():
+            await asyncio.wait([self._worker])
+
+    async def _run(self):
+        # Yield once so appends submitted in the same tick are coalesced
+        await asyncio.sleep(0)
+        while self._pending:
+            self._pending.sort(key=lambda p: (p[0], p[1]))
+            lane, _, op, worksheet, payload, future = self._pending.pop(0)
+            if op == "update":
+                await self._execute(worksheet.update(*payload), [future])
+                self.metrics[f"lane{lane}_updates"] += 1
+                continue
+            if op == "batch_update":
+                await self._execute(worksheet.batch_update(payload), [future])
+                self.metrics[f"lane{lane}_updates"] += 1
+                self.metrics["updated_ranges"] += len(payload)
+                continue
+
+            # Coalesce every queued append for this worksheet, in queue order
+            batch = [(payload, future)]
+            rest = []
+            for item in self._pending:
+                if item[2] == "append" and item[3] is worksheet and len(batch) < SHEETS_MAX_COALESCE_ROWS:
+                    batch.append((item[4], item[5]))
+                else:
+                    rest.append(item)
+            self._pending = rest
+            self.metrics[f"lane{lane}_append_calls"] += 1
+            self.metrics["appended_rows"] += len(batch)
+
+            try:
+                response = await worksheet.append_rows([row for row, _ in batch])
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+                continue
+            start = row_from_range(response)
+            for i, (_, f) in enumerate(batch):
+                if not f.done():
+                    f.set_result(start + i if start else 0)
+
+    async def _execute(self, coro, futures):
+        try:
+            result = await coro
+        except Exception as e:
+            for f in futures:
+                if not f.done():
+                    f.set_exception(e)
+            return
+        for f in futures:
+            if not f.done():
+                f.set_result(result)
+
+    def summary(self) -> str:
+        m = self.metrics
+        calls = sum(v for k, v in m.items() if k.endswith("_append_calls"))
+        return (
+            f"{m['appended_rows']} rows appended in {calls} calls "
+            f"(data {m['lane0_append_calls']}, log {m['lane1_append_calls']}), "
+            f"{m['lane0_updates'] + m['lane1_updates']} row updates ({m['updated_ranges']} cell ranges)"
+        )
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class SingleFlight:
+    """
+    Run-scoped registry of per-item work keyed by canonical URL. url_map only knows what
+    DATA_Raw held before the run, so the same article reached through two sources (an HN
+    story that is also in an RSS_DEEP feed, spri_reports and spri_research) would otherwise
+    be fetched through Jina and upserted twice. do() runs the work for the first caller;
+    callers arriving while it is in flight wait for it, and once it has written the item
+    later ones return at once.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[..., Awaitable[Any]], *args) -> tuple[Any, bool]:
+        """
+        (result, shared): fn(*args)'s result and False for the caller that ran it, the same
+        result and True for everyone else.
+
+        fn returns something truthy once the item is in DATA_Raw (an upsert status, True).
+        A falsy result (Jina failure, open circuit, text too short) or an exception means
+        nothing was written: the key is forgotten and the next caller, or a caller that was
+        waiting, runs its own fn, e.g. an RSS_DEEP feed that embeds the full article.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            # asyncio.wait, not await: a cancelled waiter must not cancel the shared future
+            await asyncio.wait({flight})
+            if flight.result():
+                self.coalesced += 1
+                return flight.result(), True
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        result = None
+        try:
+            result = await fn(*args)
+            return result, False
+        finally:
+            if not result and self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.set_result(result)
+
+    def clear(self):
+        """Starts a new run (the daemon calls this once per scheduler pass)."""
+        self._flights.clear()
+
+    def summary(self) -> str:
+        return f"{len(self._flights)} items, {self.coalesced} duplicate URLs coalesced"
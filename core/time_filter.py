@@ -1,10 +1,11 @@
 import datetime
-import pytz
-from typing import Tuple, Optional
-import feedparser
-from dateutil import parser as dateutil_parser
+from typing import List, Tuple, Optional
 
-KST = pytz.timezone('Asia/Seoul')
+from core.dates import parse_date
+
+# Korea has used a fixed +09:00 offset with no DST since 1988; a fixed tzinfo avoids
+# loading the pytz zone database on every cold start.
+KST = datetime.timezone(datetime.timedelta(hours=9), "KST")
 
 def get_collection_window(now: datetime.datetime = None) -> Tuple[datetime.datetime, datetime.datetime]:
     """
@@ -16,7 +17,7 @@ def get_collection_window(now: datetime.datetime = None) -> Tuple[datetime.datet
     Assuming this runs daily around 16:10 KST.
     """
     if now is None:
-        now = datetime.datetime.now(pytz.utc).astimezone(KST)
+        now = datetime.datetime.now(datetime.timezone.utc).astimezone(KST)
     else:
         now = now.astimezone(KST)
 
@@ -33,23 +34,46 @@ def get_collection_window(now: datetime.datetime = None) -> Tuple[datetime.datet
         
     return start_time, end_time
 
+def get_open_window(now: datetime.datetime = None) -> Tuple[datetime.datetime, datetime.datetime]:
+    """
+    Returns the daily window that contains `now` and is still open: the most recent
+    16:00 KST up to the next one. get_collection_window returns the last *closed* window.
+    """
+    # The closed window always ends at the latest 16:00 KST at or before `now`
+    _, closed_end = get_collection_window(now)
+    return closed_end, closed_end + datetime.timedelta(days=1)
+
+def get_backfill_windows(start_date: datetime.date, end_date: datetime.date) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """
+    Returns the daily windows ending at 16:00 KST on each date from start_date to end_date
+    (inclusive). The windows are contiguous, so (first start, last end) covers exactly their union.
+    """
+    windows = []
+    day = start_date
+    while day <= end_date:
+        end_time = datetime.datetime(day.year, day.month, day.day, 16, tzinfo=KST)
+        windows.append((end_time - datetime.timedelta(days=1), end_time))
+        day += datetime.timedelta(days=1)
+    return windows
+
 def parse_date_robust(date_string: str) -> Optional[datetime.datetime]:
     """
     Attempts to parse various date strings into a timezone-aware datetime object (UTC).
     """
-    if not date_string:
-        return None
-        
-    try:
-        # dateutil parser handles ISO, RFC822, etc. robustly
-        dt = dateutil_parser.parse(date_string)
-        if dt.tzinfo is None:
-            # Assume UTC if no timezone is provided, as per most feed standards
-            dt = dt.replace(tzinfo=pytz.utc)
-        return dt.astimezone(pytz.utc)
-    except Exception:
-        # fallback string manual checks if needed, but dateutil is usually enough
-        return None
+    return parse_date(date_string)
+
+def window_bounds(start_window: datetime.datetime, end_window: datetime.datetime) -> Tuple[float, float]:
+    """
+    Converts a collection window to UTC epoch seconds once, so per-entry checks
+    are plain float comparisons (see within_bounds).
+    """
+    return start_window.timestamp(), end_window.timestamp()
+
+def within_bounds(timestamp: Optional[float], bounds: Tuple[float, float]) -> bool:
+    """Epoch counterpart of is_within_window; bounds come from window_bounds."""
+    if timestamp is None:
+        return False
+    return bounds[0] <= timestamp <= bounds[1]
 
 def is_within_window(pub_date: datetime.datetime, start_window: datetime.datetime, end_window: datetime.datetime) -> bool:
     """
@@ -58,6 +82,5 @@ def is_within_window(pub_date: datetime.datetime, start_window: datetime.datetim
     if not pub_date:
         return False
     
-    # Ensure all are comparable (UTC or KST)
-    pub_date_kst = pub_date.astimezone(KST)
-    return start_window <= pub_date_kst <= end_window
+    # Epoch comparison: no tz conversion needed, any aware datetimes compare correctly
+    return start_window.timestamp() <= pub_date.timestamp() <= end_window.timestamp()
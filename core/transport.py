@@ -0,0 +1,103 @@
+import logging
+from collections import Counter
+
+import aiohttp
+
+from config import TRANSPORT_PROFILES
+
+logger = logging.getLogger("Transport")
+
+try:
+    import brotli  # noqa: F401  (aiohttp decodes br only when a brotli module is installed)
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+class Transport:
+    """
+    Owns one aiohttp session per traffic kind ("jina", "hn", "feeds"), each with its own
+    connector limits, DNS cache, keep-alive and default timeout from TRANSPORT_PROFILES,
+    and counts requests, new vs reused connections and DNS cache hits per kind.
+
+        async with Transport() as transport:
+            session = transport.session("feeds")
+    """
+
+    def __init__(self, profiles: dict = None, jina_connections: int = None):
+        self.profiles = profiles or TRANSPORT_PROFILES
+        if jina_connections and "jina" in self.profiles:
+            # Every Jina key shares the one r.jina.ai connector: size it for the whole key pool
+            # (JinaClient.max_connections), or extra keys add no throughput
+            jina = self.profiles["jina"]
+            self.profiles = dict(self.profiles, jina=dict(
+                jina,
+                limit=max(jina["limit"], jina_connections),
+                limit_per_host=max(jina["limit_per_host"], jina_connections),
+            ))
+        self.sessions: dict[str, aiohttp.ClientSession] = {}
+        self.stats: dict[str, Counter] = {}
+
+    async def __aenter__(self):
+        for kind, profile in self.profiles.items():
+            self.sessions[kind] = self._build_session(kind, profile)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+
+    def session(self, kind: str) -> aiohttp.ClientSession:
+        return self.sessions.get(kind) or self.sessions["feeds"]
+
+    def _build_session(self, kind: str, profile: dict) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=profile["limit"],
+            limit_per_host=profile["limit_per_host"],
+            ttl_dns_cache=profile["dns_ttl_sec"],
+            keepalive_timeout=profile["keepalive_sec"],
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=profile["total_timeout_sec"],
+            sock_connect=profile["connect_timeout_sec"],
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"Accept-Encoding": _ACCEPT_ENCODING},
+            trace_configs=[self._trace_config(kind)],
+        )
+
+    def _trace_config(self, kind: str) -> aiohttp.TraceConfig:
+        counter = self.stats.setdefault(kind, Counter())
+
+        def count(key):
+            async def _on_event(session, ctx, params):
+                counter[key] += 1
+            return _on_event
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(count("requests"))
+        trace.on_request_exception.append(count("errors"))
+        trace.on_connection_create_end.append(count("new_connections"))
+        trace.on_connection_reuseconn.append(count("reused_connections"))
+        trace.on_dns_cache_hit.append(count("dns_hits"))
+        trace.on_dns_cache_miss.append(count("dns_misses"))
+        return trace
+
+    def summary(self) -> str:
+        parts = []
+        for kind, c in self.stats.items():
+            if not c["requests"]:
+                continue
+            conns = c["new_connections"] + c["reused_connections"]
+            reuse = c["reused_connections"] / conns if conns else 0.0
+            parts.append(
+                f"{kind}: {c['requests']} req, {c['errors']} err, "
+                f"{c['new_connections']} new / {c['reused_connections']} reused conn ({reuse:.0%}), "
+                f"dns {c['dns_hits']} hit / {c['dns_misses']} miss"
+            )
+        return " | ".join(parts) or "no requests"
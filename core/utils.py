@@ -1,5 +1,6 @@
 import hashlib
 import re
+from functools import lru_cache
 
 def ensure_https(url: str) -> str:
     if not url:
@@ -11,22 +12,29 @@ def ensure_https(url: str) -> str:
         return "https://" + url[7:]
     return "https://" + url
 
+@lru_cache(maxsize=8192)
 def normalize_url(u: str) -> str:
+    """
+    Fetchable form of a link: https, no fragment, no utm_*/fbclid/gclid params.
+    Raw_Url and Item_UUID are derived from this, so its output must never change (even
+    "?" left behind or an upper-case HTTPS:// scheme); dedup keys come from
+    core.canonical.canonical_url. The memo is what makes it cheap.
+    """
     url = str(u).strip()
     url = re.sub(r'^http://', 'https://', url, flags=re.IGNORECASE)
     url = re.sub(r'#.*$', '', url)
-    
+
     parts = url.split("?")
     if len(parts) == 1:
         return url
-        
+
     base = parts[0]
     kept = []
     for kv in parts[1].split("&"):
         k = kv.split("=")[0].lower()
         if not (k.startswith("utm_") or k in ("fbclid", "gclid")):
             kept.append(kv)
-            
+
     if kept:
         return f"{base}?{'&'.join(kept)}"
     return base
@@ -36,20 +44,15 @@ def make_item_uuid(normalized_url: str) -> str:
     digest = hashlib.sha256(bytes_data).hexdigest()
     return "ITEM_" + digest[:8]
 
-def strip_html(html: str) -> str:
-    if not html:
-        return ""
-    text = str(html)
-    text = re.sub(r'<script[\s\S]*?</script>', ' ', text, flags=re.IGNORECASE)
-    text = re.sub(r'<style[\s\S]*?</style>', ' ', text, flags=re.IGNORECASE)
-    text = re.sub(r'<[^>]+>', ' ', text)
-    text = text.replace('&nbsp;', ' ')\
-               .replace('&amp;', '&')\
-               .replace('&lt;', '<')\
-               .replace('&gt;', '>')\
-               .replace('&#39;', "'")\
-               .replace('&quot;', '"')
-    return re.sub(r'\s+', ' ', text).strip()
+def content_hash(title: str, text: str) -> str:
+    """Short hash of an item's title and cleaned text, used to skip rewriting unchanged rows."""
+    data = f"{str(title or '').strip()}\n{str(text or '').strip()}".encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def strip_html(html: str, max_chars: int = None) -> str:
+    """Visible text of an HTML fragment; see core.html_text.html_to_text."""
+    from core.html_text import html_to_text
+    return html_to_text(html, max_chars)
     
 def extract_title_from_md(md: str) -> str:
     s = str(md or "")
@@ -100,25 +103,9 @@ def extract_urls(text: str) -> list[str]:
     return [re.sub(r'[),.\]]+$', '', u) for u in found]
 
 def extract_links(text: str) -> dict:
-    s = str(text or "")
-    link_map = {}
-    
-    md_links = re.findall(r'\[([^\]]+)\]\((https?://[^\s<>()\]]+)[^\)]*\)', s)
-    for title, url in md_links:
-        url = re.sub(r'[),.\]]+$', '', url)
-        title_clean = title.strip()
-        if re.match(r'^!\[|read more|click|here|link', title_clean, re.IGNORECASE):
-            continue
-        if url not in link_map or len(title_clean) > len(link_map.get(url, "")):
-            link_map[url] = title_clean
-            
-    bare_urls = re.findall(r'https?://[^\s<>()\]]+', s)
-    for url in bare_urls:
-        url = re.sub(r'[),.\]]+$', '', url)
-        if url not in link_map:
-            link_map[url] = ""
-            
-    return link_map
+    """{url: anchor text} for every link in the markdown; see core.md_scan.MdScan.link_map."""
+    from core.md_scan import scan_markdown
+    return scan_markdown(text).link_map
 
 def unique_preserve_order(arr: list[str]) -> list[str]:
     seen = set()
@@ -1,58 +1,38 @@
 import json
-import datetime
+from collections import Counter
 import traceback
 import re
 from typing import Dict, Any
 import asyncio
 
-from crawlers.base import BaseCrawler
+from crawlers.base import BaseCrawler, RawIndexError
+from core.health import CircuitOpenError
+from core.canonical import canonical_url
 from core.utils import ensure_https, normalize_url, make_item_uuid, extract_title_from_md
-from core.time_filter import is_within_window
-from config import MIN_TEXT_LEN, JINA_TIMEOUT_SEC, JINA_DELAY_MS
-
-HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
+from core.time_filter import window_bounds, within_bounds
+from core.relevance import parse_min_relevance
+from config import (
+    MIN_TEXT_LEN, JINA_TIMEOUT_SEC, JINA_DELAY_MS,
+    HN_DISCOVERY_BACKEND, HN_ALGOLIA_BASE, HN_FIREBASE_BASE, HN_ALGOLIA_HITS_PER_PAGE, HN_ALGOLIA_MAX_PAGES
+)
+
+HN_API_BASE = HN_FIREBASE_BASE
 MAX_ITEMS_PER_SOURCE = 30  # Increased from 15
+FIREBASE_SCAN_LIMIT = 200  # topstories checked by the Firebase backend
+
+
+class DiscoveryError(Exception):
+    pass
 
-# AI/Tech relevance keywords (case-insensitive match against title)
-RELEVANCE_KEYWORDS = [
-    # AI / ML
-    r'\bai\b', r'\bartificial.intelligence\b', r'\bmachine.learning\b', r'\bml\b',
-    r'\bdeep.learning\b', r'\bneural.net', r'\btransformer', r'\bllm\b', r'\bgpt\b',
-    r'\bchatgpt\b', r'\bopenai\b', r'\banthropic\b', r'\bclaude\b', r'\bgemini\b',
-    r'\bgemma\b', r'\bllama\b', r'\bmistral\b', r'\bdiffusion\b', r'\bstable.diffusion\b',
-    r'\bagen(t|tic)\b', r'\brag\b', r'\bfine.?tun', r'\bprompt', r'\bembedding',
-    r'\bvector.?(db|database|store|search)\b', r'\bnlp\b', r'\bcomputer.vision\b',
-    r'\breinforcement.learning\b', r'\brlhf\b', r'\bdpo\b',
-    r'\brobot', r'\bautonomous\b', r'\bself.driving\b',
-    r'\bgenerat(ive|ion)\b', r'\bfoundation.model\b', r'\bopen.?source.?model\b',
-    r'\bmultimodal\b', r'\bspeech', r'\btts\b', r'\bstt\b', r'\bocr\b',
-    r'\bimage.gen', r'\bvideo.gen', r'\btext.to',
-    # Software Engineering / Dev
-    r'\bpython\b', r'\brust\b', r'\btypescript\b', r'\bjavascript\b',
-    r'\bgolang\b', r'\bkubernetes\b', r'\bdocker\b', r'\bwasm\b',
-    r'\bapi\b', r'\bsdk\b', r'\bopen.?source\b', r'\bgithub\b',
-    r'\bcompiler\b', r'\bkernel\b', r'\blinux\b',
-    r'\bcloud\b', r'\baws\b', r'\bgcp\b', r'\bazure\b',
-    r'\bdatabase\b', r'\bpostgres', r'\bsqlite\b', r'\bredis\b',
-    r'\bgpu\b', r'\bnvidia\b', r'\bcuda\b', r'\btpu\b',
-    r'\bserverless\b', r'\bedge.comput',
-    # Tech Industry / Startups
-    r'\bstartup\b', r'\bfunding\b', r'\bseries.[a-d]\b', r'\bipo\b',
-    r'\bgoogle\b', r'\bmeta\b', r'\bmicrosoft\b', r'\bapple\b', r'\bamazon\b',
-    r'\bdeepseek\b', r'\bdeep.?mind\b', r'\bhugging.?face\b',
-    # Data / Security / Infra
-    r'\bcyber', r'\bsecurity\b', r'\bprivacy\b', r'\bencrypt',
-    r'\bdata.?(science|engineer|pipeline)\b', r'\bmlops\b',
-    r'\bscal(e|ing|ability)\b', r'\bperformance\b', r'\bbenchmark\b',
-]
-
-RELEVANCE_PATTERN = re.compile('|'.join(RELEVANCE_KEYWORDS), re.IGNORECASE)
+
+def _strip_jina_header(text: str) -> str:
+    """Removes the "Published Time:" header that Jina prepends."""
+    return re.sub(r'^Published Time:.*\n+', '', text, count=1)
 
 
 def _clean_jina_generic(text: str) -> str:
     """Universal cleaning for Jina markdown output from arbitrary external sites."""
-    # Remove "Published Time:" header that Jina prepends
-    text = re.sub(r'^Published Time:.*\n+', '', text, count=1)
+    text = _strip_jina_header(text)
 
     # Remove common nav/header patterns
     text = re.sub(r'^\[Skip to (?:main |)content\].*\n*', '', text, flags=re.MULTILINE)
@@ -77,39 +57,98 @@ def _clean_jina_generic(text: str) -> str:
 
 
 class ApiHackerNewsCrawler(BaseCrawler):
+    SESSION_KIND = "hn"
+
+    async def discover(self, bounds: tuple, min_score: int) -> list[dict]:
+        """
+        Candidate stories as Firebase-style item dicts, best first. Uses the Algolia search
+        backend unless HN_DISCOVERY_BACKEND is "firebase", falling back to Firebase if it fails.
+        """
+        if HN_DISCOVERY_BACKEND == "algolia":
+            try:
+                return await self._discover_algolia(bounds, min_score)
+            except Exception as e:
+                self.logger.warning(f"HN: Algolia discovery failed, falling back to Firebase. {e}")
+        return await self._discover_firebase()
+
+    async def _discover_algolia(self, bounds: tuple, min_score: int) -> list[dict]:
+        """Stories created in bounds with at least min_score points, in a few paged requests."""
+        start_ts, end_ts = int(bounds[0]), int(bounds[1])
+        params = {
+            "tags": "story",
+            "numericFilters": f"created_at_i>={start_ts},created_at_i<={end_ts},points>={min_score}",
+            "hitsPerPage": str(HN_ALGOLIA_HITS_PER_PAGE),
+        }
+        stories = []
+        page = 0
+        while page < HN_ALGOLIA_MAX_PAGES:
+            async with self.session.get(f"{HN_ALGOLIA_BASE}/search_by_date", params=dict(params, page=str(page))) as resp:
+                if resp.status != 200:
+                    raise DiscoveryError(f"HN Algolia HTTP {resp.status}")
+                data = await resp.json()
+            for hit in data["hits"]:
+                stories.append({
+                    "id": int(hit["objectID"]),
+                    "type": "story",
+                    "title": hit.get("title") or "",
+                    "url": hit.get("url") or "",
+                    "score": hit.get("points") or 0,
+                    "time": hit.get("created_at_i") or 0,
+                })
+            page += 1
+            if page >= data.get("nbPages", 0):
+                break
+
+        # search_by_date is newest first; the Firebase path walks topstories, so rank by score
+        stories.sort(key=lambda s: s["score"], reverse=True)
+        return stories
+
+    async def _discover_firebase(self) -> list[dict]:
+        """topstories.json plus one item request per story, for the first FIREBASE_SCAN_LIMIT."""
+        async with self.session.get(f"{HN_API_BASE}/topstories.json") as resp:
+            if resp.status != 200:
+                raise DiscoveryError(f"HN API HTTP {resp.status}")
+            story_ids = await resp.json()
+
+        sem = asyncio.Semaphore(10)
+
+        async def fetch_story(story_id):
+            async with sem:
+                try:
+                    async with self.session.get(f"{HN_API_BASE}/item/{story_id}.json") as resp:
+                        if resp.status != 200:
+                            return None
+                        return await resp.json()
+                except Exception:
+                    return None
+
+        return await asyncio.gather(*(fetch_story(sid) for sid in story_ids[:FIREBASE_SCAN_LIMIT]))
+
+    async def fetch_listing(self, source: Dict[str, Any], window: tuple) -> list[dict]:
+        min_score = int(source.get("Min_Score", 150))
+        return await self.discover(window_bounds(*window), min_score)
+
     async def crawl(self, source: Dict[str, Any], raw_index: tuple, window: tuple):
-        sheet, headers, url_map = raw_index
         start_win, end_win = window
+        bounds = window_bounds(start_win, end_win)
         source_id = source.get("Source_ID", "UNKNOWN")
         max_length = int(source.get("Max_Length", 4000))
         min_score = int(source.get("Min_Score", 150))  # Raised default from 50 to 150
+        min_relevance = parse_min_relevance(source, default=1.0)
 
         try:
-            # 1. Fetch top story IDs
-            async with self.session.get(f"{HN_API_BASE}/topstories.json") as resp:
-                if resp.status != 200:
-                    await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", f"HN API HTTP {resp.status}")
-                    return
-                story_ids = await resp.json()
+            # 1. Discover candidate stories (id, title, url, score, time) in the window
+            try:
+                results = await self.listing(source, window)
+            except DiscoveryError as e:
+                self.health.source_failed(source_id, str(e))
+                await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", str(e))
+                return
 
-            # 2. Fetch each story's metadata and filter
+            # 2. Filter
             valid_stories = []
-            sem = asyncio.Semaphore(10)
-
-            async def fetch_story(story_id):
-                async with sem:
-                    try:
-                        async with self.session.get(f"{HN_API_BASE}/item/{story_id}.json") as resp:
-                            if resp.status != 200:
-                                return None
-                            return await resp.json()
-                    except Exception:
-                        return None
-
-            # Check first 200 stories for wider coverage
-            tasks = [fetch_story(sid) for sid in story_ids[:200]]
-            results = await asyncio.gather(*tasks)
-
+            # MAX_ITEMS_PER_SOURCE applies per daily window, so a backfill fills every day
+            per_window = Counter()
             for story in results:
                 if not story or story.get("type") != "story":
                     continue
@@ -118,8 +157,7 @@ class ApiHackerNewsCrawler(BaseCrawler):
                 unix_time = story.get("time", 0)
                 if not unix_time:
                     continue
-                pub_date = datetime.datetime.fromtimestamp(unix_time, tz=datetime.timezone.utc)
-                if not is_within_window(pub_date, start_win, end_win):
+                if not within_bounds(unix_time, bounds):
                     continue
 
                 # Check score threshold
@@ -132,25 +170,30 @@ class ApiHackerNewsCrawler(BaseCrawler):
                 if not story_url:
                     continue
 
-                # Keyword relevance filter: title must match at least one AI/tech keyword
+                # Keyword relevance filter: title must score at least Min_Relevance
                 title = story.get("title", "")
-                if not RELEVANCE_PATTERN.search(title):
+                relevance = self.relevance.score(title)
+                if relevance.score < min_relevance:
                     continue
 
-                valid_stories.append(story)
-
-                if len(valid_stories) >= MAX_ITEMS_PER_SOURCE:
-                    break
+                day = self.backfill_window(unix_time)
+                if per_window[day] >= MAX_ITEMS_PER_SOURCE:
+                    continue
+                per_window[day] += 1
+                valid_stories.append((story, relevance))
 
             if not valid_stories:
                 await self.gs.log_event("Crawler", "SOURCE_EMPTY", source_id, "SKIP",
-                    f"No relevant stories (min_score={min_score}, keyword_filter=ON)")
+                    f"No relevant stories (min_score={min_score}, min_relevance={min_relevance})")
                 return
 
             self.logger.info(f"HN: {len(valid_stories)} relevant stories found (score≥{min_score})")
 
+            # Dedup needs the DATA_Raw index; only now wait for it
+            sheet, headers, url_map = await self.resolve_index(raw_index)
+
             # 3. Fetch full content via Jina for each valid story
-            async def process_story(story):
+            async def process_story(story, relevance):
                 story_url = story["url"]
                 raw_url = normalize_url(story_url)
                 item_uuid = make_item_uuid(raw_url)
@@ -160,32 +203,35 @@ class ApiHackerNewsCrawler(BaseCrawler):
 
                 try:
                     # Skip if URL already exists in DATA_Raw
-                    if raw_url in url_map:
-                        return
+                    if canonical_url(raw_url) in url_map:
+                        return True
                     
                     md_text = await self.jina.read_markdown(
                         raw_url,
-                        self.session,
+                        self.jina_session,
                         no_cache=True,
                         with_links_summary=False,
-                        timeout_sec=JINA_TIMEOUT_SEC
+                        timeout_sec=JINA_TIMEOUT_SEC,
+                        max_length=max_length
                     )
 
-                    # Apply universal cleaning
-                    text = _clean_jina_generic(md_text)
+                    # Learned per-host boilerplate once the host has enough pages, universal cleaning until then
+                    text = self.strip_boilerplate(raw_url, md_text, _strip_jina_header(md_text))
+                    if not text:
+                        text = _clean_jina_generic(md_text)
 
                     if len(text) > max_length:
                         text = text[:max_length] + "\n...[Max_Length cut]"
 
                     if len(text) < MIN_TEXT_LEN:
-                        await self.gs.log_event("Crawler", "ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {hn_title}")
+                        await self.log_item_once("ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {hn_title}")
                         return
 
                     title = hn_title or extract_title_from_md(md_text) or ""
 
                     row_obj = {
                         "Item_UUID": item_uuid,
-                        "Collected_At": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "Collected_At": self.collected_at(story.get("time")),
                         "Source_ID": source_id,
                         "Title_Org": title,
                         "Raw_Url": raw_url,
@@ -194,6 +240,8 @@ class ApiHackerNewsCrawler(BaseCrawler):
                             "mode": "API_HN",
                             "hn_id": hn_id,
                             "score": score,
+                            "relevance": relevance.score,
+                            "keywords": relevance.matched,
                             "title": title,
                             "link": raw_url,
                             "hn_url": f"https://news.ycombinator.com/item?id={hn_id}"
@@ -203,13 +251,26 @@ class ApiHackerNewsCrawler(BaseCrawler):
 
                     await self.gs.upsert_raw_by_url(sheet, headers, url_map, row_obj)
                     await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | score={score} | len={len(text)}")
+                    self.health.item_result(source_id, True)
+                    return True
+
+                except CircuitOpenError:
+                    # Host breaker is open: skip quietly, the trip is logged once per run
+                    self.health.item_result(source_id, False)
 
                 except Exception as e:
+                    self.health.item_result(source_id, False)
                     await self.gs.log_event("Crawler", "JINA_READ_FAIL", item_uuid, "FAIL", f"{source_id} | {raw_url} | {str(e)}")
 
-            await asyncio.gather(*(process_story(s) for s in valid_stories))
+            # Stories whose URL another source (or story) of this run already has are processed once
+            await asyncio.gather(*(
+                self.inflight.do(canonical_url(normalize_url(s["url"])), process_story, s, r) for s, r in valid_stories
+            ))
             await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"HackerNews | {len(valid_stories)} stories processed")
 
+        except RawIndexError:
+            raise
         except Exception as e:
             err_msg = traceback.format_exc()
+            self.health.source_failed(source_id, err_msg.splitlines()[-1] if err_msg else "")
             await self.gs.log_event("Crawler", "SOURCE_ERROR", source_id, "FAIL", err_msg[:1000])
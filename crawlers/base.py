@@ -1,14 +1,133 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Any, Optional
+import datetime
 import logging
 
+from core.relevance import RelevanceEngine
+from core.health import HealthTracker
+from core.boilerplate import BoilerplateModel
+from core.single_flight import SingleFlight
+from core.utils import get_host
+
+# Per-item log keys a crawler remembers (log_item_once); oldest are forgotten first
+LOGGED_ITEMS_MAX = 5000
+
+class RawIndexError(Exception):
+    """The DATA_Raw index a crawl was waiting for failed to load; aborts the run."""
+
 class BaseCrawler(ABC):
-    def __init__(self, gs_manager, jina_client, session):
+    # Which Transport session this crawler's own (non-Jina) requests go through
+    SESSION_KIND = "feeds"
+
+    def __init__(self, gs_manager, jina_client, transport, relevance: RelevanceEngine = None, health: HealthTracker = None,
+                 boilerplate: BoilerplateModel = None, inflight: SingleFlight = None):
         self.gs = gs_manager
         self.jina = jina_client
-        self.session = session
+        self.transport = transport
+        self.session = transport.session(self.SESSION_KIND)
+        self.jina_session = transport.session("jina")
+        self.relevance = relevance or RelevanceEngine.default()
+        self.health = health or HealthTracker()
+        self.boilerplate = boilerplate or BoilerplateModel()
+        # Shared by every crawler of a run, so a URL two sources list is processed once
+        self.inflight = inflight or SingleFlight()
         self.logger = logging.getLogger(self.__class__.__name__)
-        
+        # Backfill mode: epoch ends of the daily windows items are grouped into
+        self.backfill_ends: list[float] = []
+        self.backfill_counts = Counter()
+        # Source_ID -> task fetching that source's listing ahead of its crawl
+        self._prefetched: dict[str, asyncio.Task] = {}
+        # (event, Item_UUID) already logged by log_item_once, in insertion order
+        self._logged_items: dict[tuple, None] = {}
+
+    def set_backfill_windows(self, windows: list[tuple]):
+        self.backfill_ends = [end.timestamp() for _, end in windows]
+        self.backfill_counts.clear()
+
+    def backfill_window(self, pub_ts: Optional[float]) -> int:
+        """Index of the daily backfill window pub_ts falls in; 0 outside backfill mode."""
+        if not self.backfill_ends or pub_ts is None:
+            return 0
+        return bisect_left(self.backfill_ends, pub_ts)
+
+    def collected_at(self, pub_ts: Optional[float] = None) -> str:
+        """
+        Collected_At for a new row: the current time, or in backfill mode the end of the
+        daily window the item was published in, as if the daily run had collected it.
+        """
+        if self.backfill_ends and pub_ts is not None:
+            idx = bisect_left(self.backfill_ends, pub_ts)
+            if idx < len(self.backfill_ends):
+                end = self.backfill_ends[idx]
+                self.backfill_counts[end] += 1
+                return datetime.datetime.fromtimestamp(end).strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    async def fetch_listing(self, source: Dict[str, Any], window: tuple):
+        """
+        The network part of a source's discovery that doesn't need the DATA_Raw index (feed
+        XML, list page, HN story list). Crawlers that override it get it started early by
+        prefetch(); crawl() picks the result up with listing().
+        """
+        return None
+
+    def prefetch(self, source: Dict[str, Any], window: tuple):
+        """Starts fetch_listing in the background so it overlaps startup and earlier sources."""
+        source_id = str(source.get("Source_ID", "")).strip()
+        if source_id not in self._prefetched:
+            self._prefetched[source_id] = asyncio.create_task(self.fetch_listing(source, window))
+
+    async def listing(self, source: Dict[str, Any], window: tuple):
+        """The prefetched listing for source (raising what fetch_listing raised), or a fresh fetch."""
+        task = self._prefetched.pop(str(source.get("Source_ID", "")).strip(), None)
+        if task is None:
+            return await self.fetch_listing(source, window)
+        return await task
+
+    def cancel_prefetch(self):
+        for task in self._prefetched.values():
+            task.cancel()
+        self._prefetched.clear()
+
+    async def resolve_index(self, raw_index) -> tuple:
+        """
+        (sheet, headers, url_map) from a built index, or from the task still building it:
+        crawlers call this at the dedup step, so discovery never waits for DATA_Raw.
+        """
+        if isinstance(raw_index, tuple):
+            return raw_index
+        try:
+            return await raw_index
+        except Exception as e:
+            raise RawIndexError(str(e)) from e
+
+    async def log_item_once(self, event: str, item_uuid: str, status: str, detail: str):
+        """
+        log_event for a per-item skip or warning, once per (event, item) for this crawler's
+        lifetime. In --serve the crawler lives across polls and feeds return the same entries
+        every poll, so the LOG_History row would otherwise be appended again each time.
+        """
+        key = (event, item_uuid)
+        if key in self._logged_items:
+            return
+        self._logged_items[key] = None
+        if len(self._logged_items) > LOGGED_ITEMS_MAX:
+            del self._logged_items[next(iter(self._logged_items))]
+        await self.gs.log_event("Crawler", event, item_uuid, status, detail)
+
+    def strip_boilerplate(self, url: str, md_text: str, text: str) -> Optional[str]:
+        """
+        Learns md_text (the whole fetched page) into the host's boilerplate model, then
+        returns text without the host's repeated lines, or None until the host has enough
+        pages for the model to be trusted.
+        """
+        host = get_host(url)
+        self.boilerplate.learn(host, md_text, url)
+        return self.boilerplate.clean(host, text)
+
     @abstractmethod
     async def crawl(self, source: Dict[str, Any], raw_index: tuple, window: tuple):
         """
@@ -1,22 +1,49 @@
 import json
-import datetime
+from collections import Counter
 import traceback
 import re
 import asyncio
 from typing import Dict, Any
 
-from crawlers.base import BaseCrawler
+from crawlers.base import BaseCrawler, RawIndexError
+from core.health import CircuitOpenError
+from core.canonical import canonical_url
 from core.utils import (
     ensure_https, normalize_url, make_item_uuid, 
-    extract_urls, extract_links, unique_preserve_order, get_host, extract_title_from_md
+    extract_urls, unique_preserve_order, get_host, extract_title_from_md
 )
-from core.time_filter import parse_date_robust, is_within_window
+from core.md_scan import scan_markdown
+from core.time_filter import window_bounds, within_bounds
+from core.dates import parse_timestamp
+from core.relevance import parse_min_relevance
 from config import MIN_TEXT_LEN, JINA_TIMEOUT_SEC, JINA_DELAY_MS, CRAWLLIST_RULES
 
+RESOURCE_PATTERN = re.compile(r'\.(jpg|jpeg|png|gif|webp|svg|css|js|pdf)(\?|#|$)', re.IGNORECASE)
+NAV_PATH_PATTERN = re.compile(r'/(tag|tags|category|categories|author|about|privacy|terms|login|subscribe)\b', re.IGNORECASE)
+
+MD_DATE_PATTERN = re.compile(
+    r'(?:Published|Date|작성일|배포일)[:\-\s]*([0-9]{4}[.\-][0-9]{2}[.\-][0-9]{2}|[A-Z][a-z]{2}\s\d{1,2},?\s\d{4})'
+    r'|\b(20[2-9][0-9][.\-][0-1][0-9][.\-][0-3][0-9])\b',
+    re.IGNORECASE
+)
+
 class CrawlListCrawler(BaseCrawler):
+    SESSION_KIND = "jina"  # list and item pages both go through Jina
+
+    async def fetch_listing(self, source: Dict[str, Any], window: tuple) -> str:
+        """The list page as Jina markdown with the links summary."""
+        list_url = ensure_https(str(source.get("Target_URL", "")).strip())
+        return await self.jina.read_markdown(
+            list_url, 
+            self.jina_session, 
+            no_cache=True, 
+            with_links_summary=True,
+            timeout_sec=JINA_TIMEOUT_SEC
+        )
+
     async def crawl(self, source: Dict[str, Any], raw_index: tuple, window: tuple):
-        sheet, headers, url_map = raw_index
         start_win, end_win = window
+        bounds = window_bounds(start_win, end_win)
         source_id = str(source.get("Source_ID", "")).strip()
         max_length = int(source.get("Max_Length", 4000))
         
@@ -24,31 +51,41 @@ class CrawlListCrawler(BaseCrawler):
         rule = CRAWLLIST_RULES.get(source_id, None)
         
         try:
-            # 1. Fetch List Page via Jina with links summary
+            # 1. Fetch List Page via Jina with links summary (usually prefetched)
             try:
-                list_md = await self.jina.read_markdown(
-                    list_url, 
-                    self.session, 
-                    no_cache=True, 
-                    with_links_summary=True,
-                    timeout_sec=JINA_TIMEOUT_SEC
-                )
+                list_md = await self.listing(source, window)
             except Exception as e:
+                self.health.source_failed(source_id, f"{list_url} | {str(e)}")
                 await self.gs.log_event("Crawler", "LIST_READ_FAIL", source_id, "FAIL", f"{list_url} | {str(e)}")
                 return
             
-            # 2. Extract and Filter URLs
-            link_map = extract_links(list_md)
-            urls = unique_preserve_order(list(link_map.keys()))
+            # 2. Extract and Filter URLs (one pass; keys are already unique)
+            link_map = scan_markdown(list_md).link_map
+            urls = list(link_map)
             candidates = self._filter_candidates(source_id, list_url, urls, rule)
             
+            # Optional keyword pre-filter on list-page anchor text (untitled links are kept)
+            min_relevance = parse_min_relevance(source)
+            if min_relevance is not None:
+                candidates = [
+                    c for c in candidates
+                    if not link_map.get(c) or self.relevance.score(link_map[c]).score >= min_relevance
+                ]
+            
             if not candidates:
                 await self.gs.log_event("Crawler", "LIST_NO_CANDIDATE", source_id, "SKIP", f"0 candidates: {list_url}")
                 return
             
-            # Limit number of items per source (configurable via Google Sheets "Max_Items" column)
+            # Limit number of items per source (configurable via Google Sheets "Max_Items" column).
+            # Backfill: dates are only known after the fetch, so every candidate is read and
+            # Max_Items applies per daily window just before the upsert
             max_items = int(source.get("Max_Items", 8))
-            candidates = candidates[:max_items]
+            if not self.backfill_ends:
+                candidates = candidates[:max_items]
+            per_window = Counter()
+
+            # Dedup needs the DATA_Raw index; only now wait for it
+            sheet, headers, url_map = await self.resolve_index(raw_index)
 
             # 3. Concurrently fetch candidate articles
             async def process_candidate(raw_url):
@@ -56,25 +93,26 @@ class CrawlListCrawler(BaseCrawler):
                 list_page_title = link_map.get(raw_url, "")
                 try:
                     # Skip if URL already exists in DATA_Raw
-                    if raw_url in url_map:
-                        return
+                    if canonical_url(raw_url) in url_map:
+                        return True
                     
                     md_text = await self.jina.read_markdown(
                         raw_url, 
-                        self.session, 
+                        self.jina_session, 
                         no_cache=True, 
                         with_links_summary=False, 
-                        timeout_sec=JINA_TIMEOUT_SEC
+                        timeout_sec=JINA_TIMEOUT_SEC,
+                        max_length=max_length
                     )
                     
                     # 4. Attempt to find a date in Markdown (Fallback approach)
                     # For List Crawler, we don't have an RSS pubDate.
                     # We might search the text for a date pattern.
                     extracted_date_str = self._extract_date_from_md(md_text)
-                    pub_date = parse_date_robust(extracted_date_str)
+                    pub_ts = parse_timestamp(extracted_date_str)
                     
-                    if pub_date:
-                        if not is_within_window(pub_date, start_win, end_win):
+                    if pub_ts is not None:
+                        if not within_bounds(pub_ts, bounds):
                             return # Outside window
                     else:
                         # User preferred: Accept if date not found (Upsert will handle duplicates)
@@ -129,20 +167,31 @@ class CrawlListCrawler(BaseCrawler):
                             text = parts[1].strip()
                         # Strip footer: social share buttons, 목록, 다음글/이전글, 대표전화, etc.
                         text = re.split(r'\[트위터\]|\[페이스북\]|\[구글 플러스\]|\[인쇄\]|^목록\s*$|_\\?_다음글|_\\?_이전글|\[_TOP_\]|대표전화|개인정보처리방침', text, maxsplit=1, flags=re.MULTILINE)[0].strip()
+
+                    # Lines repeated across this host's pages (nav, share bars, footers) that the rules above missed
+                    cleaned = self.strip_boilerplate(raw_url, md_text, text)
+                    if cleaned:
+                        text = cleaned
                     
                     if len(text) > max_length:
                         text = text[:max_length] + "\n...[Max_Length cut]"
                         
                     if len(text) < MIN_TEXT_LEN:
-                        await self.gs.log_event("Crawler", "ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {raw_url}")
+                        await self.log_item_once("ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {raw_url}")
                         return
                         
+                    if self.backfill_ends:
+                        day = self.backfill_window(pub_ts) if pub_ts is not None else None
+                        if per_window[day] >= max_items:
+                            return
+                        per_window[day] += 1
+
                     md_title = extract_title_from_md(md_text)
                     title = list_page_title if list_page_title else (md_title or "")
                     
                     row_obj = {
                         "Item_UUID": item_uuid,
-                        "Collected_At": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "Collected_At": self.collected_at(pub_ts),
                         "Source_ID": source_id,
                         "Title_Org": title,
                         "Raw_Url": raw_url,
@@ -153,17 +202,29 @@ class CrawlListCrawler(BaseCrawler):
                     
                     await self.gs.upsert_raw_by_url(sheet, headers, url_map, row_obj)
                     await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | len={len(text)}")
+                    self.health.item_result(source_id, True)
+                    return True
+                    
+                except CircuitOpenError:
+                    # Host breaker is open: skip quietly, the trip is logged once per run
+                    self.health.item_result(source_id, False)
                     
                 except Exception as e:
+                    self.health.item_result(source_id, False)
                     await self.gs.log_event("Crawler", "JINA_READ_FAIL", item_uuid, "FAIL", f"{source_id} | {raw_url} | {str(e)}")
 
             # Process concurrently
-            await asyncio.gather(*(process_candidate(normalize_url(c)) for c in candidates))
+            # Also coalesces URLs shared with other list sources of this run (spri_reports / spri_research)
+            urls = [normalize_url(c) for c in candidates]
+            await asyncio.gather(*(self.inflight.do(canonical_url(u), process_candidate, u) for u in urls))
             
             await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"{source.get('Site_Name', '')} 완료")
             
+        except RawIndexError:
+            raise
         except Exception as e:
             err_msg = traceback.format_exc()
+            self.health.source_failed(source_id, err_msg.splitlines()[-1] if err_msg else "")
             await self.gs.log_event("Crawler", "SOURCE_ERROR", source_id, "FAIL", err_msg[:1000])
 
     def _filter_candidates(self, source_id: str, list_url: str, urls: list[str], rule: dict) -> list[str]:
@@ -173,7 +234,7 @@ class CrawlListCrawler(BaseCrawler):
         
         for u in urls:
             # 기본 파일 리소스 제거
-            if re.search(r'\.(jpg|jpeg|png|gif|webp|svg|css|js|pdf)(\?|#|$)', u, re.IGNORECASE):
+            if RESOURCE_PATTERN.search(u):
                 continue
                 
             h = get_host(u)
@@ -186,7 +247,7 @@ class CrawlListCrawler(BaseCrawler):
                 
             # 흔한 네비용 단어 제거 (allow_external 소스는 외부 사이트라 적용 안 함)
             if not allow_external:
-                if re.search(r'/(tag|tags|category|categories|author|about|privacy|terms|login|subscribe)\b', u, re.IGNORECASE):
+                if NAV_PATH_PATTERN.search(u):
                     continue
                 
             out.append(u)
@@ -206,14 +267,12 @@ class CrawlListCrawler(BaseCrawler):
         """
         # Very simplistic approach. In real-world, dates can be anywhere.
         # This is a best-effort fallback for CRAWL_LIST where pubDate isn't standard.
-        match = re.search(r'(?:Published|Date|작성일|배포일)[:\-\s]*([0-9]{4}[.\-][0-9]{2}[.\-][0-9]{2}|[A-Z][a-z]{2}\s\d{1,2},?\s\d{4})', md_text, re.IGNORECASE)
-        if match:
-             return match.group(1)
-             
-        # Just grab the first looking like YYYY-MM-DD or YYYY.MM.DD early in text.
-        text_head = md_text[:2000] # look in first 2000 chars
-        match2 = re.search(r'\b(20[2-9][0-9][.\-][0-1][0-9][.\-][0-3][0-9])\b', text_head)
-        if match2:
-            return match2.group(1)
-            
-        return ""
+        # One scan: a labelled date anywhere wins, otherwise the first bare
+        # YYYY-MM-DD / YYYY.MM.DD within the first 2000 chars.
+        first_bare = ""
+        for m in MD_DATE_PATTERN.finditer(md_text):
+            if m.group(1):
+                return m.group(1)
+            if not first_bare and m.end() <= 2000:
+                first_bare = m.group(2)
+        return first_bare
@@ -1,35 +1,73 @@
 import feedparser
 import json
-import datetime
 import traceback
 import re
-from typing import Dict, Any
+from collections import Counter
+from typing import Dict, Any, Optional, Tuple
 import asyncio
 
-from crawlers.base import BaseCrawler
-from core.utils import ensure_https, normalize_url, make_item_uuid, extract_title_from_md
-from core.time_filter import parse_date_robust, is_within_window
-from config import MIN_TEXT_LEN, JINA_TIMEOUT_SEC, JINA_DELAY_MS
+from crawlers.base import BaseCrawler, RawIndexError
+from core.health import CircuitOpenError
+from core.canonical import canonical_url
+from core.utils import ensure_https, normalize_url, make_item_uuid, extract_title_from_md, strip_html
+from core.time_filter import window_bounds, within_bounds
+from core.dates import parse_timestamp
+from core.relevance import parse_min_relevance
+from config import (
+    MIN_TEXT_LEN, JINA_TIMEOUT_SEC, JINA_DELAY_MS,
+    FEED_CONTENT_MIN_RATIO, FEED_CONTENT_FULL_CHARS, FEED_CONTENT_MIN_BLOCKS
+)
+
+BLOCK_TAG_PATTERN = re.compile(r'<(?:p|li|h[1-6]|blockquote|pre)[\s>]', re.IGNORECASE)
+# Excerpt feeds end the content with a "read more" link or an ellipsis
+TEASER_PATTERN = re.compile(r'(?:\[(?:…|\.\.\.|&#8230;|&hellip;)\]|…|\.\.\.|read more|continue reading|the post .{0,200} appeared first on .{0,100})\W*$', re.IGNORECASE)
+
+def feed_full_text(entry, max_length: int) -> Tuple[Optional[str], str]:
+    """
+    Returns (text, "feed") if the entry's embedded content (content:encoded / Atom content)
+    looks like the complete article, else (None, reason) so the caller falls back to Jina.
+    """
+    contents = entry.get("content") or []
+    html = max((c.get("value", "") for c in contents), key=len, default="")
+    if not html:
+        return None, "no_content"
+
+    text = strip_html(html, max_chars=max_length)
+    if len(text) < min(max_length * FEED_CONTENT_MIN_RATIO, FEED_CONTENT_FULL_CHARS):
+        return None, "short"
+    if TEASER_PATTERN.search(text[-300:]):
+        return None, "teaser"
+    if len(BLOCK_TAG_PATTERN.findall(html)) < FEED_CONTENT_MIN_BLOCKS:
+        return None, "unstructured"
+    return text, "feed"
 
 class RssDeepCrawler(BaseCrawler):
+    async def fetch_listing(self, source: Dict[str, Any], window: tuple):
+        """(HTTP status, parsed feed or None) for the source's feed."""
+        feed_url = ensure_https(str(source.get("Target_URL", "")).strip())
+        headers_req = {"User-Agent": "Mozilla/5.0 (Python Async RSS_DEEP)"}
+        async with self.session.get(feed_url, headers=headers_req) as response:
+            if response.status != 200:
+                return response.status, None
+            xml_content = await response.text()
+        return response.status, feedparser.parse(xml_content)
+
     async def crawl(self, source: Dict[str, Any], raw_index: tuple, window: tuple):
-        sheet, headers, url_map = raw_index
         start_win, end_win = window
+        bounds = window_bounds(start_win, end_win)
         source_id = source.get("Source_ID", "UNKNOWN")
         max_length = int(source.get("Max_Length", 4000))
+        min_relevance = parse_min_relevance(source)  # None = keyword filter off
         
         feed_url = ensure_https(str(source.get("Target_URL", "")).strip())
         
         try:
-            # 1. Fetch RSS XML
-            headers_req = {"User-Agent": "Mozilla/5.0 (Python Async RSS_DEEP)"}
-            async with self.session.get(feed_url, headers=headers_req) as response:
-                if response.status != 200:
-                    await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", f"HTTP {response.status} - {feed_url}")
-                    return
-                xml_content = await response.text()
-                
-            feed = feedparser.parse(xml_content)
+            # 1. Fetch RSS XML (usually prefetched while the DATA_Raw index loads)
+            status, feed = await self.listing(source, window)
+            if status != 200:
+                self.health.source_failed(source_id, f"HTTP {status} - {feed_url}")
+                await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", f"HTTP {status} - {feed_url}")
+                return
             
             # List of tasks for concurrent Jina fetching
             jina_tasks = []
@@ -46,33 +84,67 @@ class RssDeepCrawler(BaseCrawler):
                 
                 # Check date
                 pub_date_str = entry.get("published", entry.get("updated", ""))
-                pub_date = parse_date_robust(pub_date_str)
+                pub_ts = parse_timestamp(pub_date_str)
                 
-                if pub_date:
-                    if not is_within_window(pub_date, start_win, end_win):
+                if pub_ts is not None:
+                    if not within_bounds(pub_ts, bounds):
                          continue
                 else:
-                    await self.gs.log_event("Crawler", "ITEM_NO_DATE_WARN", item_uuid, "WARN", f"{source_id} | Could not parse date: {pub_date_str}")
+                    await self.log_item_once("ITEM_NO_DATE_WARN", item_uuid, "WARN", f"{source_id} | Could not parse date: {pub_date_str}")
                     # Accept anyway as fallback
+
+                # Optional keyword pre-filter on the feed title, before paying for Jina
+                title = entry.get("title", "")
+                if min_relevance is not None and title and self.relevance.score(title).score < min_relevance:
+                    continue
                 
-                valid_entries.append((entry, raw_url, item_uuid))
+                valid_entries.append((entry, raw_url, item_uuid, pub_ts))
             
             if not valid_entries:
                 return # Nothing in window
 
+            # Dedup needs the DATA_Raw index; only now wait for it
+            sheet, headers, url_map = await self.resolve_index(raw_index)
+
+            # Per-entry content decision: feed-embedded text vs Jina, with fallback reasons
+            decisions = Counter()
+
             # 3. Concurrently fetch valid entries via Jina
-            async def process_entry(entry, raw_url, item_uuid):
+            async def process_entry(entry, raw_url, item_uuid, pub_ts):
                 try:
                     # Skip if URL already exists in DATA_Raw
-                    if raw_url in url_map:
-                        return
-                    
+                    if canonical_url(raw_url) in url_map:
+                        return True
+
+                    # Hybrid: the feed may already carry the full article
+                    feed_text, decision = feed_full_text(entry, max_length)
+                    decisions[decision] += 1
+                    if feed_text:
+                        if len(feed_text) > max_length:
+                            feed_text = feed_text[:max_length] + "\n...[Max_Length cut]"
+                        title = entry.get("title", "")
+                        row_obj = {
+                            "Item_UUID": item_uuid,
+                            "Collected_At": self.collected_at(pub_ts),
+                            "Source_ID": source_id,
+                            "Title_Org": title,
+                            "Raw_Url": raw_url,
+                            "Full_Text": feed_text,
+                            "Raw_JSON": json.dumps({"mode": "RSS_DEEP_FEED", "feedUrl": feed_url, "title": title, "link": raw_url}),
+                            "Processed_YN": "N"
+                        }
+                        await self.gs.upsert_raw_by_url(sheet, headers, url_map, row_obj)
+                        await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | len={len(feed_text)} | feed")
+                        self.health.item_result(source_id, True)
+                        return True
+
                     md_text = await self.jina.read_markdown(
                         raw_url, 
-                        self.session, 
+                        self.jina_session, 
                         no_cache=True, 
                         with_links_summary=False, 
-                        timeout_sec=JINA_TIMEOUT_SEC
+                        timeout_sec=JINA_TIMEOUT_SEC,
+                        max_length=max_length
                     )
                     
                     text = re.sub(r'\n{3,}', '\n\n', md_text).strip()
@@ -129,19 +201,24 @@ class RssDeepCrawler(BaseCrawler):
                             text = parts[1].strip()
                         # Strip footer: attachments, prev/next, nav, SNS, address
                         text = re.split(r'(?m)^첨부파일|^\*\s+이전글|^\*\s+다음글|^목록\s*$|알림마당|Copyright\(C\)|Now Loading|개인정보 처리방침|KISA소개', text, maxsplit=1)[0].strip()
+
+                    # Lines repeated across this host's pages (nav, share bars, footers) that the rules above missed
+                    cleaned = self.strip_boilerplate(raw_url, md_text, text)
+                    if cleaned:
+                        text = cleaned
                     
                     if len(text) > max_length:
                         text = text[:max_length] + "\n...[Max_Length cut]"
                         
                     if len(text) < MIN_TEXT_LEN:
-                        await self.gs.log_event("Crawler", "ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {entry.get('title', '')}")
+                        await self.log_item_once("ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {entry.get('title', '')}")
                         return
                         
                     title = entry.get("title") or extract_title_from_md(md_text) or ""
                     
                     row_obj = {
                         "Item_UUID": item_uuid,
-                        "Collected_At": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "Collected_At": self.collected_at(pub_ts),
                         "Source_ID": source_id,
                         "Title_Org": title,
                         "Raw_Url": raw_url,
@@ -152,16 +229,30 @@ class RssDeepCrawler(BaseCrawler):
                     
                     await self.gs.upsert_raw_by_url(sheet, headers, url_map, row_obj)
                     await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | len={len(text)}")
+                    self.health.item_result(source_id, True)
+                    return True
+                    
+                except CircuitOpenError:
+                    # Host breaker is open: skip quietly, the trip is logged once per run
+                    self.health.item_result(source_id, False)
                     
                 except Exception as e:
+                    self.health.item_result(source_id, False)
                     await self.gs.log_event("Crawler", "JINA_READ_FAIL", item_uuid, "FAIL", f"{source_id} | {raw_url} | {str(e)}")
 
             # Run in parallel using gather (semaphore limits internal concurrent Jina calls)
-            await asyncio.gather(*(process_entry(*e) for e in valid_entries))
-            
-            await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"{source.get('Site_Name', '')} 완료")
+            # An article another source of this run already has is fetched and upserted once
+            await asyncio.gather(*(self.inflight.do(canonical_url(e[1]), process_entry, *e) for e in valid_entries))
+
+            fallbacks = ", ".join(f"{k} {v}" for k, v in decisions.items() if k != "feed")
+            stats = f"feed {decisions['feed']} / jina {sum(decisions.values()) - decisions['feed']}" + (f" ({fallbacks})" if fallbacks else "")
+            self.logger.info(f"{source_id}: {stats}")
+            await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"{source.get('Site_Name', '')} 완료 | {stats}")
 
+        except RawIndexError:
+            raise
         except Exception as e:
             err_msg = traceback.format_exc()
+            self.health.source_failed(source_id, err_msg.splitlines()[-1] if err_msg else "")
             await self.gs.log_event("Crawler", "SOURCE_ERROR", source_id, "FAIL", err_msg[:1000])
 
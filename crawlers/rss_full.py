@@ -1,40 +1,53 @@
 import feedparser
 import json
-import datetime
 import traceback
+from collections import Counter
 from typing import Dict, Any
 
-from crawlers.base import BaseCrawler
+from crawlers.base import BaseCrawler, RawIndexError
+from core.canonical import canonical_url
 from core.utils import ensure_https, normalize_url, make_item_uuid, strip_html
-from core.time_filter import parse_date_robust, is_within_window
+from core.time_filter import window_bounds, within_bounds
+from core.dates import parse_timestamp
 from config import MIN_TEXT_LEN
 
 class RssFullCrawler(BaseCrawler):
+    async def fetch_listing(self, source: Dict[str, Any], window: tuple):
+        """(HTTP status, parsed feed or None) for the source's feed."""
+        feed_url = ensure_https(str(source.get("Target_URL", "")).strip())
+        # Using aiohttp to fetch RSS xml is possible, but feedparser.parse can also take a URL.
+        # However, feedparser is blocking on network if passed a URL directly.
+        # Best practice: fetch raw text async, then pass to feedparser.
+        headers_req = {"User-Agent": "Mozilla/5.0 (Python Async RSS_FULL)"}
+        async with self.session.get(feed_url, headers=headers_req) as response:
+            if response.status != 200:
+                return response.status, None
+            xml_content = await response.text()
+        return response.status, feedparser.parse(xml_content)
+
     async def crawl(self, source: Dict[str, Any], raw_index: tuple, window: tuple):
-        sheet, headers, url_map = raw_index
         start_win, end_win = window
+        bounds = window_bounds(start_win, end_win)
         source_id = source.get("Source_ID", "UNKNOWN")
         max_length = int(source.get("Max_Length", 4000))
         
         feed_url = ensure_https(str(source.get("Target_URL", "")).strip())
         
         try:
-            # Using aiohttp to fetch RSS xml is possible, but feedparser.parse can also take a URL.
-            # However, feedparser is blocking on network if passed a URL directly.
-            # Best practice: fetch raw text async, then pass to feedparser.
-            headers_req = {"User-Agent": "Mozilla/5.0 (Python Async RSS_FULL)"}
-            async with self.session.get(feed_url, headers=headers_req) as response:
-                if response.status != 200:
-                    await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", f"HTTP {response.status} - {feed_url}")
-                    return
-                xml_content = await response.text()
-                
-            feed = feedparser.parse(xml_content)
+            status, feed = await self.listing(source, window)
+            if status != 200:
+                self.health.source_failed(source_id, f"HTTP {status} - {feed_url}")
+                await self.gs.log_event("Crawler", "SOURCE_HTTP_FAIL", source_id, "FAIL", f"HTTP {status} - {feed_url}")
+                return
             
             if feed.bozo and getattr(feed.bozo_exception, 'getMessage', lambda: '')() != 'unknown encoding':
                  # Not strictly throwing error, bozo is set often on valid feeds with minor standard violations
                  pass
                  
+            # Every entry goes through the upsert, so wait for the DATA_Raw index here
+            sheet, headers, url_map = await self.resolve_index(raw_index)
+
+            statuses = Counter()
             for entry in feed.entries:
                 link = entry.get("link", entry.get("id", ""))
                 if not link:
@@ -45,17 +58,17 @@ class RssFullCrawler(BaseCrawler):
                 
                 # Extract and parse date
                 pub_date_str = entry.get("published", entry.get("updated", ""))
-                pub_date = parse_date_robust(pub_date_str)
+                pub_ts = parse_timestamp(pub_date_str)
                 
-                if pub_date:
-                    if not is_within_window(pub_date, start_win, end_win):
+                if pub_ts is not None:
+                    if not within_bounds(pub_ts, bounds):
                         # print(f"Skipping {item_uuid} due to date {pub_date_str}")
                         continue
                 else:
                     # If we can't parse a date, we could skip it or include it.
                     # As a conservative fallback for full-extraction, we might include it or log it.
                     # Let's log and process it; the upsert will prevent infinite duplication anyway.
-                    await self.gs.log_event("Crawler", "ITEM_NO_DATE_WARN", item_uuid, "WARN", f"{source_id} | Could not parse date: {pub_date_str}")
+                    await self.log_item_once("ITEM_NO_DATE_WARN", item_uuid, "WARN", f"{source_id} | Could not parse date: {pub_date_str}")
                 
                 # Extract text
                 # We look at content (Atom) or description (RSS)
@@ -67,20 +80,21 @@ class RssFullCrawler(BaseCrawler):
                 elif hasattr(entry, 'description'):
                     text = entry.description
                     
-                text = strip_html(text)
+                # Stops parsing once past Max_Length; the cut below still applies
+                text = strip_html(text, max_chars=max_length)
                 
                 if len(text) > max_length:
                     text = text[:max_length] + " ...[Max_Length cut]"
                     
                 if len(text) < MIN_TEXT_LEN:
-                    await self.gs.log_event("Crawler", "ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {entry.get('title', '')}")
+                    await self.log_item_once("ITEM_SKIP_SHORT", item_uuid, "SKIP", f"{source_id} | {entry.get('title', '')}")
                     continue
                     
                 title = entry.get("title", "")
                 
                 row_obj = {
                     "Item_UUID": item_uuid,
-                    "Collected_At": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "Collected_At": self.collected_at(pub_ts),
                     "Source_ID": source_id,
                     "Title_Org": title,
                     "Raw_Url": raw_url,
@@ -89,12 +103,26 @@ class RssFullCrawler(BaseCrawler):
                     "Processed_YN": "N"
                 }
                 
-                await self.gs.upsert_raw_by_url(sheet, headers, url_map, row_obj)
-                await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | len={len(text)}")
+                # Feeds repeat their recent entries every run; unchanged ones cost no Sheets write
+                status, shared = await self.inflight.do(
+                    canonical_url(raw_url), self.gs.upsert_raw_by_url, sheet, headers, url_map, row_obj
+                )
+                if shared:
+                    # Already upserted this run by another source listing the same article
+                    statuses["duplicate"] += 1
+                    continue
+                statuses[status] += 1
+                if status != "unchanged":
+                    await self.gs.log_event("Crawler", "ITEM_UPSERT", item_uuid, "OK", f"{source_id} | len={len(text)} | {status}")
+                self.health.item_result(source_id, True)
                 
-            await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"{source.get('Site_Name', '')} 완료")
+            counts = ", ".join(f"{k} {statuses[k]}" for k in ("new", "changed", "unchanged", "duplicate"))
+            await self.gs.log_event("Crawler", "SOURCE_DONE", source_id, "OK", f"{source.get('Site_Name', '')} 완료 ({counts})")
             
+        except RawIndexError:
+            raise
         except Exception as e:
             err_msg = traceback.format_exc()
+            self.health.source_failed(source_id, err_msg.splitlines()[-1] if err_msg else "")
             await self.gs.log_event("Crawler", "SOURCE_ERROR", source_id, "FAIL", err_msg[:1000])
 
@@ -1,79 +1,387 @@
+import argparse
 import asyncio
-import aiohttp
+import datetime
+import importlib
 import logging
-from config import TARGET_PHASE
+import os
+import signal
+import time
+from collections import Counter
+from config import (
+    TARGET_PHASE, STATE_DIR,
+    DAEMON_SOURCES_REFRESH_MIN, DAEMON_INDEX_REFRESH_HOURS,
+    SHEET_RAW, SHEET_LOG, ARCHIVE_BACKEND,
+    ARCHIVE_RAW_RETENTION_DAYS, ARCHIVE_LOG_RETENTION_DAYS, ROW_LOCK_PATH
+)
 
 from core.gsheets import GoogleSheetsManager
+from core.health import HealthTracker
+from core.single_flight import SingleFlight
+from crawlers.base import RawIndexError
+from core.boilerplate import BoilerplateModel
 from core.jina_client import JinaClient
-from core.time_filter import get_collection_window, KST
-
-from crawlers.rss_full import RssFullCrawler
-from crawlers.rss_deep import RssDeepCrawler
-from crawlers.crawl_list import CrawlListCrawler
-from crawlers.api_hackernews import ApiHackerNewsCrawler
+from core.relevance import load_relevance_engine
+from core.transport import Transport
+from core.time_filter import get_collection_window, get_open_window, get_backfill_windows, KST
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Main")
 
-async def main():
+# Fetch_Type -> (module, class). Crawler modules are imported only for the fetch types
+# present in CONF_Sources, so e.g. feedparser is never loaded on a run without RSS sources.
+CRAWLER_REGISTRY = {
+    "RSS_FULL": ("crawlers.rss_full", "RssFullCrawler"),
+    "RSS_DEEP": ("crawlers.rss_deep", "RssDeepCrawler"),
+    "CRAWL_LIST": ("crawlers.crawl_list", "CrawlListCrawler"),
+    "API": ("crawlers.api_hackernews", "ApiHackerNewsCrawler"),
+}
+
+def load_crawler_class(fetch_type: str):
+    entry = CRAWLER_REGISTRY.get(fetch_type)
+    if not entry:
+        return None
+    module_name, class_name = entry
+    return getattr(importlib.import_module(module_name), class_name)
+
+def fetch_type_of(source: dict) -> str:
+    return str(source.get("Fetch_Type", "")).strip().upper()
+
+def select_targets(sources: list[dict]) -> list[dict]:
+    return [
+        s for s in sources
+        if str(s.get("Status", "")).lower() == "active"
+        and int(s.get("Phase", 999)) <= TARGET_PHASE
+    ]
+
+def build_crawlers(targets: list[dict], crawler_map: dict, gs, jina, transport, relevance, health, boilerplate=None,
+                   inflight=None) -> dict:
+    """Adds a crawler to crawler_map for every Fetch_Type in targets that doesn't have one yet."""
+    for fetch_type in {fetch_type_of(s) for s in targets}:
+        if fetch_type in crawler_map:
+            continue
+        crawler_cls = load_crawler_class(fetch_type)
+        if crawler_cls:
+            crawler_map[fetch_type] = crawler_cls(gs, jina, transport, relevance, health, boilerplate, inflight)
+    return crawler_map
+
+async def crawl_source(crawler_map: dict, source: dict, raw_index, window: tuple, health: HealthTracker, profiler=None):
+    fetch_type = fetch_type_of(source)
+    crawler = crawler_map.get(fetch_type)
+    source_id = str(source.get("Source_ID", "")).strip()
+
+    if not crawler:
+        logger.warning(f"Unknown Fetch_Type '{fetch_type}' for source {source_id}")
+        return
+
+    skip, reason = health.should_skip(source_id)
+    if skip:
+        logger.info(f"Skipping source {source_id}: {reason}")
+        await crawler.gs.log_event("Crawler", "SOURCE_BACKOFF", source_id, "SKIP", reason)
+        return
+
+    logger.info(f"Crawling source {source_id} ({source.get('Site_Name')}) using {fetch_type}")
+    started = time.monotonic()
+    if profiler:
+        async with profiler.profile(source_id):
+            await crawler.crawl(source, raw_index, window)
+    else:
+        await crawler.crawl(source, raw_index, window)
+    health.finish_source(source_id, time.monotonic() - started)
+
+async def report_health(gs: GoogleSheetsManager, health: HealthTracker):
+    """Logs tripped host breakers, persists health state and updates the CONF_Sources Health column."""
+    for host, error in health.tripped.items():
+        await gs.log_event("Crawler", "CIRCUIT_OPEN", host, "FAIL", error)
+    health.save()
+    try:
+        await gs.write_source_health(health.summaries())
+    except Exception as e:
+        logger.error(f"Failed to write source health. {e}")
+
+def log_backfill_counts(crawler_map: dict, day_windows: list):
+    counts = Counter()
+    for crawler in crawler_map.values():
+        counts.update(crawler.backfill_counts)
+    for _, end in day_windows:
+        logger.info(f"Backfill window ending {end.strftime('%Y-%m-%d %H:%M KST')}: {counts[end.timestamp()]} items")
+
+async def main(profile_dir: str = None, backfill_dates: tuple = None):
     logger.info("Initializing Crawler System...")
-    
+
+    profiler = None
+    if profile_dir:
+        from core.profiling import SourceProfiler
+        profiler = SourceProfiler(profile_dir)
+
     gs = GoogleSheetsManager()
     await gs.init()
-    
-    jina = JinaClient()
-    
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    health = HealthTracker(os.path.join(STATE_DIR, "health.json"))
+    boilerplate = BoilerplateModel(os.path.join(STATE_DIR, "boilerplate.json"))
+    inflight = SingleFlight()
+    jina = JinaClient(health=health)
+
     # Calculate time window
-    start_win, end_win = get_collection_window()
+    if backfill_dates:
+        # Backfill: crawl the union of the daily windows once; each item is then
+        # assigned to the single daily window it was published in (BaseCrawler.collected_at)
+        day_windows = get_backfill_windows(*backfill_dates)
+        start_win, end_win = day_windows[0][0], day_windows[-1][1]
+        logger.info(f"Backfilling {len(day_windows)} daily windows")
+    else:
+        day_windows = None
+        start_win, end_win = get_collection_window()
     logger.info(f"Time Window: {start_win.strftime('%Y-%m-%d %H:%M KST')} to {end_win.strftime('%Y-%m-%d %H:%M KST')}")
     window = (start_win, end_win)
 
-    # 1. Read sources and get target ones
-    sources = await gs.read_sources()
-    targets = [
-        s for s in sources 
-        if str(s.get("Status", "")).lower() == "active" 
-        and int(s.get("Phase", 999)) <= TARGET_PHASE
-    ]
-    
-    if not targets:
-        logger.info("No active sources found.")
+    # Startup runs as a dependency graph rather than in sequence: the DATA_Raw index only
+    # needs the spreadsheet, so it downloads while sources and keywords are read and every
+    # source's listing (feed XML, list page, HN stories) is fetched. Crawlers wait for the
+    # index only at their dedup step (BaseCrawler.resolve_index).
+    index_task = asyncio.create_task(gs.build_raw_url_index())
+    crawler_map = {}
+    try:
+        # 1. Read sources and get target ones
+        sources, relevance = await asyncio.gather(gs.read_sources(), load_relevance_engine(gs))
+        targets = select_targets(sources)
+
+        if not targets:
+            logger.info("No active sources found.")
+            return
+
+        logger.info(f"Start processing {len(targets)} sources.")
+
+        # Purpose-specific pooled sessions (Jina / HN API / feeds), shared by all crawlers
+        async with Transport(jina_connections=jina.max_connections) as transport:
+            # Initialize only the crawlers this run needs
+            crawler_map = build_crawlers(targets, {}, gs, jina, transport, relevance, health, boilerplate, inflight)
+            if day_windows:
+                for crawler in crawler_map.values():
+                    crawler.set_backfill_windows(day_windows)
+
+            # 2. Start every active source's listing fetch; the raw index is still loading.
+            # Not under --profile: cProfile would charge them to whichever source is being profiled
+            if not profiler:
+                for source in targets:
+                    crawler = crawler_map.get(fetch_type_of(source))
+                    if crawler and not health.should_skip(str(source.get("Source_ID", "")).strip())[0]:
+                        crawler.prefetch(source, window)
+
+            # 3. Process Sources
+            # To avoid overloading Sheets API with too many concurrent upserts/logs across ALL sources,
+            # we can process sources sequentially, but *items within a source* are processed concurrently.
+            try:
+                for source in targets:
+                    await crawl_source(crawler_map, source, index_task, window, health, profiler)
+            finally:
+                for crawler in crawler_map.values():
+                    crawler.cancel_prefetch()
+
+            logger.info(f"HTTP transport: {transport.summary()}")
+            logger.info(f"Jina keys: {jina.summary()}")
+            logger.info(f"In-flight items: {inflight.summary()}")
+    except RawIndexError as e:
+        # Earlier sources may already have queued rows and logs: still flush and save below
+        logger.error(f"Failed to build raw index. Check Google Sheets setup. {e}")
+    finally:
+        # Awaited, not only cancelled, so the index download does not outlive the run; its
+        # exception is retrieved here (crawlers that needed the index already reported it)
+        if not index_task.done():
+            index_task.cancel()
+        await asyncio.gather(index_task, return_exceptions=True)
+
+        # Whatever ended the run, queued rows and logs are written and run state is saved
+        await gs.flush()
+        logger.info(f"Sheets quota: {gs.quota_summary()}")
+
+        if day_windows:
+            log_backfill_counts(crawler_map, day_windows)
+        await report_health(gs, health)
+        boilerplate.save()
+        logger.info(f"Boilerplate model: {boilerplate.summary()}")
+
+    if profiler:
+        logger.info(f"Profile report ({profiler.out_dir}/report.txt):\n{profiler.report()}")
+    logger.info("Crawler run finished.")
+
+async def serve():
+    """
+    Long-running service mode. Sessions, the relevance engine and the DATA_Raw index stay
+    warm; each source is polled on its own adaptive schedule (core.poll_schedule).
+
+    Each poll covers the last closed daily window plus the currently open one, so items
+    published just before 16:00 KST are still picked up after the boundary, and dedup
+    against the warm url_map keeps them from being written twice. Rows keep the batch
+    DATA_Raw contract; Collected_At is the emit time, which places every item in the
+    daily window it was collected in.
+    """
+    from core.poll_schedule import PollScheduler
+    from core.archive import RowLock, RowLockHeld
+
+    logger.info("Starting crawler service...")
+    os.makedirs(STATE_DIR, exist_ok=True)
+    # The warm url_map holds row numbers, which an --archive run would shift
+    row_lock = RowLock(ROW_LOCK_PATH, "serve")
+    try:
+        row_lock.acquire()
+    except RowLockHeld as e:
+        logger.error(f"Cannot start service: {e}")
         return
-        
-    logger.info(f"Start processing {len(targets)} sources.")
 
     try:
-        # 2. Build Raw URL Index
-        raw_index = await gs.build_raw_url_index()
-    except Exception as e:
-        logger.error(f"Failed to build raw index. Check Google Sheets setup. {e}")
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+
+        gs = GoogleSheetsManager()
+        await gs.init()
+        health = HealthTracker(os.path.join(STATE_DIR, "health.json"))
+        boilerplate = BoilerplateModel(os.path.join(STATE_DIR, "boilerplate.json"))
+        inflight = SingleFlight()
+        jina = JinaClient(health=health)
+        relevance = await load_relevance_engine(gs)
+        scheduler = PollScheduler(os.path.join(STATE_DIR, "poll_schedule.json"))
+
+        targets_by_id: dict[str, dict] = {}
+        raw_index = None
+        sources_loaded_at = index_built_at = 0.0
+
+        async with Transport(jina_connections=jina.max_connections) as transport:
+            crawler_map = {}
+            while not stop.is_set():
+                now = time.time()
+
+                if now - sources_loaded_at >= DAEMON_SOURCES_REFRESH_MIN * 60:
+                    if sources_loaded_at:
+                        # Report this period's health, then give open breakers a half-open retry
+                        await report_health(gs, health)
+                        health.reset_breakers()
+                        boilerplate.save()
+                    try:
+                        targets = select_targets(await gs.read_sources())
+                        targets_by_id = {str(s.get("Source_ID", "")).strip(): s for s in targets}
+                        scheduler.sync(list(targets_by_id))
+                        build_crawlers(targets, crawler_map, gs, jina, transport, relevance, health, boilerplate, inflight)
+                        sources_loaded_at = now
+                    except Exception as e:
+                        logger.error(f"Failed to read sources, keeping previous list. {e}")
+
+                if raw_index is None or now - index_built_at >= DAEMON_INDEX_REFRESH_HOURS * 3600:
+                    try:
+                        raw_index = await gs.build_raw_url_index()
+                        index_built_at = now
+                    except Exception as e:
+                        logger.error(f"Failed to build raw index. {e}")
+                        if raw_index is None:
+                            await _sleep_or_stop(stop, 60)
+                            continue
+
+                _, open_end = get_open_window()
+                closed_start, _ = get_collection_window()
+                window = (closed_start, open_end)
+
+                # Each pass is one run: a URL met again in a later pass is deduped by url_map
+                inflight.clear()
+                for source_id in scheduler.due():
+                    if stop.is_set():
+                        break
+                    source = targets_by_id.get(source_id)
+                    if not source:
+                        continue
+                    url_map = raw_index[2]
+                    before = len(url_map)
+                    await crawl_source(crawler_map, source, raw_index, window, health)
+                    scheduler.record(source_id, len(url_map) - before)
+
+                await _sleep_or_stop(stop, min(scheduler.seconds_until_next(), 60))
+
+            logger.info(f"HTTP transport: {transport.summary()}")
+            logger.info(f"Jina keys: {jina.summary()}")
+
+        await gs.flush()
+        logger.info(f"Sheets quota: {gs.quota_summary()}")
+
+        await report_health(gs, health)
+        boilerplate.save()
+        logger.info(f"Boilerplate model: {boilerplate.summary()}")
+    finally:
+        row_lock.release()
+    logger.info("Crawler service stopped.")
+
+async def archive(raw_days: int = ARCHIVE_RAW_RETENTION_DAYS, log_days: int = ARCHIVE_LOG_RETENTION_DAYS):
+    """
+    Moves DATA_Raw rows older than raw_days and LOG_History rows older than log_days into
+    monthly partitions (core.archive) and records archived URLs in the dedup index.
+    """
+    from core.archive import RowLock, RowLockHeld
+
+    row_lock = RowLock(ROW_LOCK_PATH, "archive")
+    try:
+        row_lock.acquire()
+    except RowLockHeld as e:
+        logger.error(f"Not archiving: deleting rows would shift the row numbers a running service writes to. {e}")
         return
 
-    # Use a single aiohttp session for connection pooling
-    async with aiohttp.ClientSession() as session:
-        # Initialize Crawlers
-        crawler_map = {
-            "RSS_FULL": RssFullCrawler(gs, jina, session),
-            "RSS_DEEP": RssDeepCrawler(gs, jina, session),
-            "CRAWL_LIST": CrawlListCrawler(gs, jina, session),
-            "API": ApiHackerNewsCrawler(gs, jina, session)
-        }
-        
-        # 3. Process Sources
-        # To avoid overloading Sheets API with too many concurrent upserts/logs across ALL sources,
-        # we can process sources sequentially, but *items within a source* are processed concurrently.
-        for source in targets:
-            fetch_type = str(source.get("Fetch_Type", "")).strip().upper()
-            crawler = crawler_map.get(fetch_type)
-            
-            if not crawler:
-                logger.warning(f"Unknown Fetch_Type '{fetch_type}' for source {source.get('Source_ID')}")
-                continue
-                
-            logger.info(f"Crawling source {source.get('Source_ID')} ({source.get('Site_Name')}) using {fetch_type}")
-            await crawler.crawl(source, raw_index, window)
+    try:
+        logger.info("Starting archival...")
+        gs = GoogleSheetsManager()
+        await gs.init()
+        partitions = await gs.archive_partitions()
+        index = await gs.load_archive_index(partitions)
 
-    logger.info("Crawler run finished.")
+        # Collected_At and Timestamp are naive local times, so compare against naive now
+        now = datetime.datetime.now()
+        before = len(index)
+        raw_rows = await gs.archive_sheet(SHEET_RAW, "Collected_At", now - datetime.timedelta(days=raw_days),
+                                          partitions, index)
+        log_rows = await gs.archive_sheet(SHEET_LOG, "Timestamp", now - datetime.timedelta(days=log_days), partitions)
+
+        logger.info(
+            f"Archived {len(raw_rows)} {SHEET_RAW} rows (+{len(index) - before} URLs, index {len(index)}) "
+            f"and {len(log_rows)} {SHEET_LOG} rows to {ARCHIVE_BACKEND} partitions"
+        )
+    finally:
+        row_lock.release()
+
+async def _sleep_or_stop(stop: asyncio.Event, seconds: float):
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KBrain AI news crawler")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a long-lived service with adaptive per-source polling")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="profile each source's crawl and write pstats/collapsed stacks to DIR (default: profiles)")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), type=datetime.date.fromisoformat,
+                        help="collect the daily windows ending 16:00 KST on START..END (YYYY-MM-DD), "
+                             "fetching each feed and item once")
+    parser.add_argument("--archive", action="store_true",
+                        help=f"move {SHEET_RAW} rows older than {ARCHIVE_RAW_RETENTION_DAYS} days and {SHEET_LOG} rows "
+                             f"older than {ARCHIVE_LOG_RETENTION_DAYS} days into monthly partitions, then exit")
+    args = parser.parse_args()
+    if args.archive and (args.serve or args.backfill or args.profile):
+        parser.error("--archive runs on its own")
+    if args.backfill:
+        start, end = args.backfill
+        if start > end:
+            parser.error("--backfill START must not be after END")
+        if end > get_collection_window()[1].date():
+            parser.error(f"--backfill END must be a closed window (latest: {get_collection_window()[1].date()})")
+        if args.serve:
+            parser.error("--backfill cannot be combined with --serve")
+    return args
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.archive:
+        asyncio.run(archive())
+    else:
+        asyncio.run(serve() if args.serve else main(profile_dir=args.profile, backfill_dates=args.backfill))